@@ -6,11 +6,13 @@ DEBUG = False
 SECRET_KEY = os.environ.get('SECRET_KEY', 'REPLACE_ME_WITH_A_SECURE_KEY')
 ALLOWED_HOSTS = os.environ.get('ALLOWED_HOSTS', 'yourdomain.com').split(',')
 
-# Database (Render provides DATABASE_URL)
-import dj_database_url
+# Database (Render provides DATABASE_URL); DB_POOL and friends select
+# the connection pooling mode, see portfolio/db/__init__.py
+from portfolio.db import database_config, replica_databases
 DATABASES = {
-    'default': dj_database_url.config(conn_max_age=600, ssl_require=True)
+    'default': database_config()
 }
+DATABASES.update(replica_databases())
 
 # Security settings
 SECURE_HSTS_SECONDS = 31536000
@@ -23,21 +25,62 @@ SECURE_BROWSER_XSS_FILTER = True
 SECURE_CONTENT_TYPE_NOSNIFF = True
 X_FRAME_OPTIONS = 'DENY'
 
-# Static files with WhiteNoise
-MIDDLEWARE.insert(1, 'whitenoise.middleware.WhiteNoiseMiddleware')
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+# Static files with WhiteNoise, right after SecurityMiddleware so static
+# responses still get HSTS, nosniff and the SSL redirect
+MIDDLEWARE.insert(
+    MIDDLEWARE.index('django.middleware.security.SecurityMiddleware') + 1,
+    'whitenoise.middleware.WhiteNoiseMiddleware',
+)
+# Minified, hashed, gzip/brotli-precompressed; served with immutable
+# Cache-Control by WhiteNoise (see portfolio/staticfiles.py)
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'portfolio.staticfiles.PortfolioStaticFilesStorage',
+    },
+}
 
 # Logging (optional, production-ready)
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
+    'formatters': {
+        # portfolio.requests / portfolio.slow_queries already emit JSON
+        'json_lines': {
+            'format': '%(message)s',
+        },
+    },
     'handlers': {
         'console': {
             'class': 'logging.StreamHandler',
         },
+        'json_console': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'json_lines',
+        },
     },
     'root': {
         'handlers': ['console'],
         'level': 'INFO',
     },
-} 
\ No newline at end of file
+    'loggers': {
+        'portfolio.requests': {
+            'handlers': ['json_console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'portfolio.slow_queries': {
+            'handlers': ['json_console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+
+# Sample 10% of queries slower than 200ms into portfolio.slow_queries
+PORTFOLIO_SLOW_QUERY_MS = float(os.environ.get('PORTFOLIO_SLOW_QUERY_MS', 200))
+PORTFOLIO_SLOW_QUERY_SAMPLE_RATE = float(
+    os.environ.get('PORTFOLIO_SLOW_QUERY_SAMPLE_RATE', 0.1)
+)
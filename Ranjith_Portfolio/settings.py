@@ -38,7 +38,8 @@ ALLOWED_HOSTS = [
 # Application definition
 
 INSTALLED_APPS = [
-    'django.contrib.admin',
+    # No autodiscover at startup; Ranjith_Portfolio/urls.py loads the admin
+    'django.contrib.admin.apps.SimpleAdminConfig',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
@@ -47,21 +48,28 @@ INSTALLED_APPS = [
     'portfolio',  # Portfolio app
 ]
 
+# The PublicPath* classes are Django's session, CSRF, auth and messages
+# middleware, skipped for public GET requests (PORTFOLIO_LEAN_PUBLIC_PATH).
 MIDDLEWARE = [
+    'portfolio.middleware.PerformanceMiddleware',
+    'portfolio.compression.CompressionMiddleware',
+    'portfolio.middleware.PublicCacheMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'portfolio.middleware.PublicPathSessionMiddleware',
     'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
+    'portfolio.middleware.PublicPathCsrfViewMiddleware',
+    'portfolio.middleware.PublicPathAuthenticationMiddleware',
+    'portfolio.middleware.PublicPathMessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'portfolio.middleware.ReplicaMiddleware',
 ]
 
 ROOT_URLCONF = 'Ranjith_Portfolio.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates, plus render timing for PerformanceMiddleware
+        'BACKEND': 'portfolio.instrumentation.InstrumentedDjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -81,10 +89,11 @@ WSGI_APPLICATION = 'Ranjith_Portfolio.wsgi.application'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
 # Use PostgreSQL if DATABASE_URL is set, otherwise default to SQLite
+# (pooling and connection options: see portfolio/db/__init__.py)
 if 'DATABASE_URL' in os.environ:
-    import dj_database_url
+    from portfolio.db import database_config
     DATABASES = {
-        'default': dj_database_url.config(conn_max_age=600, ssl_require=True)
+        'default': database_config()
     }
 else:
     DATABASES = {
@@ -94,6 +103,24 @@ else:
         }
     }
 
+# Read replicas: one per DATABASE_URL_<NAME> variable, alias replica_<name>.
+# Public GET requests read from them (portfolio/db/router.py).
+from portfolio.db import replica_databases
+DATABASES.update(replica_databases())
+DATABASE_ROUTERS = ['portfolio.db.router.ReplicaRouter']
+# Read from the primary for this long after a content change
+PORTFOLIO_REPLICA_PIN_SECONDS = int(
+    os.environ.get('DB_REPLICA_PIN_SECONDS', '10')
+)
+# Seconds between health checks of each replica, per process
+PORTFOLIO_REPLICA_CHECK_INTERVAL = 5
+# Skip a PostgreSQL replica more than this many seconds behind
+PORTFOLIO_REPLICA_MAX_LAG = int(os.environ.get('DB_REPLICA_MAX_LAG', '30'))
+
+# Unfiltered admin changelists over PostgreSQL tables with more rows than
+# this use the planner's estimate instead of COUNT(*) (portfolio/db/counts.py)
+PORTFOLIO_ESTIMATED_COUNT_THRESHOLD = 10000
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -137,9 +164,135 @@ STATICFILES_DIRS = [
 
 # Media files (User uploaded files)
 MEDIA_URL = '/media/'
-MEDIA_ROOT = BASE_DIR / 'media'
+MEDIA_ROOT = os.environ.get('MEDIA_ROOT') or BASE_DIR / 'media'
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Portfolio caching
+# Rendered pages and API snapshots are keyed on a content version that is
+# bumped whenever portfolio content is saved or deleted, so these timeouts
+# are only an upper bound.
+PORTFOLIO_PAGE_CACHE_TIMEOUT = 60 * 60 * 24
+PORTFOLIO_SNAPSHOT_TIMEOUT = 60 * 60 * 24
+# Expired entries are kept this much longer and served while one request
+# rebuilds them; on a miss, other requests wait up to LOCK_WAIT seconds
+# for the request holding the rebuild lock.
+PORTFOLIO_CACHE_STALE_TTL = 60 * 5
+PORTFOLIO_CACHE_LOCK_TIMEOUT = 30
+PORTFOLIO_CACHE_LOCK_WAIT = 5
+
+# Share the cache between workers through Redis when REDIS_URL is set, with
+# a per-process tier for versioned portfolio entries in front of it (see
+# portfolio/cache_backends.py). Without it each process has a locmem cache,
+# which only suits a single web worker: the content version that invalidates
+# cached pages is kept in the cache (see portfolio/cache.py).
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'portfolio.cache_backends.TieredCache',
+            'LOCATION': 'shared',
+            'OPTIONS': {
+                'L1_MAX_ENTRIES': int(os.environ.get('PORTFOLIO_L1_MAX_ENTRIES', 256)),
+                'L1_TIMEOUT': int(os.environ.get('PORTFOLIO_L1_TIMEOUT', 300)),
+            },
+        },
+        'shared': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+            'KEY_PREFIX': 'ranjith',
+        },
+    }
+elif os.environ.get('PORTFOLIO_DISABLE_CACHE') == '1':
+    # Every lookup misses; manage.py loadtest uses it to measure the
+    # uncached path
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+        },
+    }
+
+# Identifies the deployed code in ETags, so a deploy that changes templates
+# also changes validators for unchanged content.
+PORTFOLIO_BUILD_ID = os.environ.get('RENDER_GIT_COMMIT', '')
+
+# Resume downloads are streamed from disk by default. Set to
+# 'x-accel-redirect' (nginx, with an internal location at
+# PORTFOLIO_SENDFILE_PREFIX aliased to MEDIA_ROOT) or 'x-sendfile'
+# (Apache/lighttpd) to let the front proxy send the bytes instead.
+PORTFOLIO_SENDFILE = os.environ.get('PORTFOLIO_SENDFILE') or None
+PORTFOLIO_SENDFILE_PREFIX = '/protected-media/'
+
+# Widths (px) of the responsive derivatives generated for uploaded images
+PORTFOLIO_IMAGE_WIDTHS = (320, 640, 960, 1280)
+
+# Route the homepage and API through the async views in
+# portfolio/async_views.py. Enable when serving Ranjith_Portfolio.asgi
+# under uvicorn; under a WSGI server it only adds overhead.
+PORTFOLIO_ASYNC_VIEWS = os.environ.get('PORTFOLIO_ASYNC_VIEWS', '') == '1'
+
+# Render only the hero and about sections in the homepage response and let
+# main.js fetch the others as fragments when they near the viewport.
+PORTFOLIO_LAZY_SECTIONS = os.environ.get('PORTFOLIO_LAZY_SECTIONS', '') == '1'
+
+# Send a homepage that isn't cached yet as it renders: head and hero first,
+# then each section as its queries finish (portfolio/streaming.py).
+PORTFOLIO_STREAM_HOME = os.environ.get('PORTFOLIO_STREAM_HOME', '') == '1'
+
+# Lean public path (portfolio/middleware.py): public GET requests skip the
+# session, CSRF, auth and messages middleware and are sent with
+# Cache-Control for shared caches. Browsers revalidate every time
+# (max-age); CDNs keep a copy for s-maxage seconds and may serve it stale
+# while they refetch.
+PORTFOLIO_LEAN_PUBLIC_PATH = (
+    os.environ.get('PORTFOLIO_LEAN_PUBLIC_PATH', '1') == '1'
+)
+PORTFOLIO_PUBLIC_MAX_AGE = 0
+PORTFOLIO_PUBLIC_S_MAXAGE = int(os.environ.get('PORTFOLIO_PUBLIC_S_MAXAGE', '300'))
+PORTFOLIO_PUBLIC_STALE_WHILE_REVALIDATE = 60 * 60 * 24
+
+# br/zstd/gzip for public HTML and JSON (portfolio/compression.py); the
+# compressed bytes are cached per content version
+PORTFOLIO_COMPRESSION = os.environ.get('PORTFOLIO_COMPRESSION', '1') == '1'
+PORTFOLIO_COMPRESS_MIN_SIZE = 512
+
+# Background jobs (portfolio/jobs.py): snapshot rebuilds and image
+# derivatives run in `manage.py run_jobs` instead of the admin request
+# that saved the content. Due jobs are signalled through Redis when it is
+# configured; the Job table is the queue either way. The worker fills the
+# cache the web workers read, so this needs REDIS_URL (portfolio.E002).
+PORTFOLIO_BACKGROUND_JOBS = os.environ.get('PORTFOLIO_BACKGROUND_JOBS', '') == '1'
+PORTFOLIO_JOB_REDIS_URL = os.environ.get('REDIS_URL') or None
+PORTFOLIO_JOB_COALESCE_SECONDS = 2
+PORTFOLIO_JOB_MAX_ATTEMPTS = 5
+# Retry after 10s, 20s, 40s, ... at most an hour
+PORTFOLIO_JOB_RETRY_BACKOFF = 10
+PORTFOLIO_JOB_RETRY_MAX_BACKOFF = 60 * 60
+# A job running this long is presumed lost with its worker
+PORTFOLIO_JOB_TIMEOUT = 10 * 60
+PORTFOLIO_JOB_SWEEP_SECONDS = 30
+PORTFOLIO_JOB_KEEP_SECONDS = 7 * 24 * 60 * 60
+
+# Cold start (portfolio/startup.py, gunicorn.conf.py)
+# Compile templates and prime the caches when the application loads.
+PORTFOLIO_WARM_START = os.environ.get('PORTFOLIO_WARM_START', '') == '1'
+# Serve only the public site: the admin URLs (and admin modules) are
+# never loaded. For workers behind a separate admin service.
+PORTFOLIO_PUBLIC_ONLY = os.environ.get('PORTFOLIO_PUBLIC_ONLY', '') == '1'
+# benchmark_cold_start fails when the median time to first response
+# exceeds this.
+PORTFOLIO_COLD_START_BUDGET_MS = int(
+    os.environ.get('PORTFOLIO_COLD_START_BUDGET_MS', '3000')
+)
+
+# Request instrumentation (portfolio.middleware.PerformanceMiddleware)
+# Server-Timing exposes db/template/cache/total timings to the browser.
+PORTFOLIO_SERVER_TIMING = True
+# Log queries slower than this (ms) with their SQL; None disables.
+PORTFOLIO_SLOW_QUERY_MS = None
+PORTFOLIO_SLOW_QUERY_SAMPLE_RATE = 1.0
+
+# Output directory of `manage.py bake` (static export of the public site)
+PORTFOLIO_BAKE_DIR = BASE_DIR / 'baked'
@@ -21,10 +21,15 @@ from django.conf import settings
 from django.conf.urls.static import static
 
 urlpatterns = [
-    path('admin/', admin.site.urls),
     path('', include('portfolio.urls')),  # Include portfolio URLs
 ]
 
+# The admin is registered here rather than at startup (INSTALLED_APPS uses
+# SimpleAdminConfig), so public-only processes never import it.
+if not getattr(settings, 'PORTFOLIO_PUBLIC_ONLY', False):
+    admin.autodiscover()
+    urlpatterns.insert(0, path('admin/', admin.site.urls))
+
 # Serve static files during development
 if settings.DEBUG:
     urlpatterns += static(
@@ -14,3 +14,12 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "Ranjith_Portfolio.settings")
 
 application = get_wsgi_application()
+
+from django.conf import settings  # noqa: E402
+
+if getattr(settings, 'PORTFOLIO_WARM_START', False):
+    # Compile templates and fill caches before the first request (under
+    # gunicorn --preload, once in the master; see portfolio/startup.py)
+    from portfolio.startup import warm
+
+    warm()
@@ -0,0 +1,22 @@
+"""Gunicorn settings; gunicorn reads this file from the working directory.
+
+With ``preload_app`` the master imports Django and the application once
+(and, with ``PORTFOLIO_WARM_START=1``, compiles the templates and primes
+the caches; see ``portfolio/startup.py``) before forking the workers, so
+a worker starts serving straight away instead of repeating that work.
+``GUNICORN_PRELOAD=0`` turns it off, e.g. to reload code with HUP.
+"""
+import os
+
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') == '1'
+
+
+def pre_fork(server, worker):
+    if not preload_app:
+        return
+    # Connections (and psycopg pools) opened while loading the app belong
+    # to the master; a socket shared by forked workers would interleave
+    # their queries.
+    from portfolio.startup import close_connections
+
+    close_connections()
@@ -1,6 +1,23 @@
+import io
+
+from django import forms
 from django.contrib import admin
 from django.conf import settings
-from .models import PersonalInfo, Experience, SkillCategory, Skill, Project
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
+from .db.counts import EstimatedCountPaginator
+from .jobs import requeue
+from .models import (
+    PersonalInfo, Experience, SkillCategory, Skill, Project, Technology, Job,
+)
+from .search import matching_ids
+from .transfer import (
+    FORMATS, SPECS, ImportDataError, export_records, guess_format,
+    import_records, spec_name,
+)
 
 # Customize admin site
 admin.site.site_header = getattr(
@@ -14,14 +31,153 @@ admin.site.index_title = getattr(
 )
 
 
+class FullTextSearchMixin:
+    """Answer changelist searches from the full-text index.
+
+    Uses the same documents, stemming and prefix matching as
+    ``/api/search/``; ``search_fields`` only enables the search box.
+    """
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        ids = matching_ids(self.model, search_term)
+        return queryset.filter(pk__in=ids), False
+
+
+def export_action(format_name):
+    """Admin action downloading the selected objects in ``format_name``"""
+    @admin.action(description=f"Export selected as {format_name.upper()}")
+    def export(modeladmin, request, queryset):
+        content_format = FORMATS[format_name]
+        name = spec_name(modeladmin.model)
+        stream = io.StringIO()
+        content_format.write(export_records({name: queryset}), stream)
+        response = HttpResponse(
+            stream.getvalue(), content_type=content_format.content_type
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{name}.{format_name}"'
+        )
+        return response
+
+    export.__name__ = f'export_{format_name}'
+    return export
+
+
+class ImportForm(forms.Form):
+    file = forms.FileField()
+    format = forms.ChoiceField(
+        choices=[('', "From the file extension")]
+        + [(name, name.upper()) for name in FORMATS],
+        required=False,
+    )
+    prune = forms.BooleanField(
+        required=False,
+        help_text="Delete objects missing from the file, for the models it "
+                  "has records of",
+    )
+    dry_run = forms.BooleanField(
+        required=False, help_text="Report what would change without saving",
+    )
+
+
+def can_import(user, prune: bool) -> bool:
+    """An import may touch every content model, so check them all"""
+    actions = ['add', 'change'] + (['delete'] if prune else [])
+    return user.has_perms([
+        f'{spec.model._meta.app_label}.{action}_{spec.model._meta.model_name}'
+        for spec in SPECS.values()
+        for action in actions
+    ])
+
+
+class TransferAdminMixin:
+    """Export actions and an "Import" page for portfolio content.
+
+    Both use ``portfolio.transfer``, the same code as the
+    ``export_portfolio`` and ``import_portfolio`` commands.
+    """
+
+    actions = [
+        export_action('json'), export_action('yaml'), export_action('csv'),
+    ]
+    change_list_template = 'admin/portfolio/transfer_change_list.html'
+
+    def get_urls(self):
+        opts = self.model._meta
+        return [
+            path(
+                'import/', self.admin_site.admin_view(self.import_view),
+                name=f'{opts.app_label}_{opts.model_name}_import',
+            ),
+            *super().get_urls(),
+        ]
+
+    def import_view(self, request):
+        if not can_import(request.user, prune=False):
+            raise PermissionDenied
+        opts = self.model._meta
+        form = ImportForm(request.POST or None, request.FILES or None)
+        if request.method == 'POST' and form.is_valid():
+            upload = form.cleaned_data['file']
+            prune = form.cleaned_data['prune']
+            if prune and not can_import(request.user, prune=True):
+                raise PermissionDenied
+            read = FORMATS[
+                form.cleaned_data['format'] or guess_format(upload.name)
+            ].read
+            stream = io.TextIOWrapper(
+                upload.file, encoding='utf-8-sig', newline=''
+            )
+            try:
+                report = import_records(
+                    read(stream), prune=prune,
+                    dry_run=form.cleaned_data['dry_run'],
+                )
+            except (ImportDataError, UnicodeDecodeError) as exc:
+                form.add_error('file', str(exc))
+            else:
+                prefix = "Dry run: " if form.cleaned_data['dry_run'] else ""
+                for line in report.lines() or ["Nothing to import"]:
+                    self.message_user(request, prefix + line)
+                return redirect(reverse(
+                    f'admin:{opts.app_label}_{opts.model_name}_changelist'
+                ))
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': opts,
+            'form': form,
+            'title': "Import portfolio content",
+        }
+        return TemplateResponse(
+            request, 'admin/portfolio/import.html', context
+        )
+
+
+class LargeTableAdminMixin:
+    """Changelist settings for tables that grow to thousands of rows.
+
+    Pagination counts are estimated on PostgreSQL for unfiltered lists
+    (``portfolio.db.counts``). The second ``COUNT(*)`` over the whole
+    table, shown next to filtered results, is skipped.
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
 @admin.register(PersonalInfo)
-class PersonalInfoAdmin(admin.ModelAdmin):
+class PersonalInfoAdmin(TransferAdminMixin, admin.ModelAdmin):
     list_display = ["name", "title", "email"]
     search_fields = ["name", "title", "email"]
 
 
 @admin.register(Experience)
-class ExperienceAdmin(admin.ModelAdmin):
+class ExperienceAdmin(
+    TransferAdminMixin, LargeTableAdminMixin, FullTextSearchMixin,
+    admin.ModelAdmin,
+):
     list_display = [
         "title",
         "company",
@@ -36,22 +192,71 @@ class ExperienceAdmin(admin.ModelAdmin):
 
 
 @admin.register(SkillCategory)
-class SkillCategoryAdmin(admin.ModelAdmin):
+class SkillCategoryAdmin(
+    TransferAdminMixin, LargeTableAdminMixin, admin.ModelAdmin
+):
     list_display = ["name", "order"]
+    # Also what the category autocomplete on skills searches
+    search_fields = ["name"]
     ordering = ["order"]
 
 
 @admin.register(Skill)
-class SkillAdmin(admin.ModelAdmin):
+class SkillAdmin(
+    TransferAdminMixin, LargeTableAdminMixin, FullTextSearchMixin,
+    admin.ModelAdmin,
+):
     list_display = ["name", "category", "proficiency", "order"]
+    list_select_related = ["category"]
     list_filter = ["category"]
+    autocomplete_fields = ["category"]
     search_fields = ["name"]
     ordering = ["category__order", "order"]
 
 
 @admin.register(Project)
-class ProjectAdmin(admin.ModelAdmin):
+class ProjectAdmin(
+    TransferAdminMixin, LargeTableAdminMixin, FullTextSearchMixin,
+    admin.ModelAdmin,
+):
     list_display = ["title", "is_featured", "order"]
     list_filter = ["is_featured"]
     search_fields = ["title", "description"]
     ordering = ["order"]
+
+
+@admin.register(Technology)
+class TechnologyAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = ["name", "key"]
+    search_fields = ["name"]
+    ordering = ["key"]
+
+
+@admin.register(Job)
+class JobAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = [
+        "task",
+        "key",
+        "status",
+        "attempts",
+        "coalesced",
+        "run_at",
+        "finished_at",
+    ]
+    list_filter = ["status", "task"]
+    search_fields = ["key"]
+    readonly_fields = [
+        "task", "args", "key", "status", "run_at", "attempts",
+        "max_attempts", "coalesced", "last_error", "created_at",
+        "started_at", "finished_at",
+    ]
+    actions = ["run_again"]
+
+    def has_add_permission(self, request):
+        # Jobs are queued by the code that needs them
+        return False
+
+    @admin.action(description="Run selected jobs again now")
+    def run_again(self, request, queryset):
+        requeued = sum(requeue(job) for job in queryset)
+        self.message_user(request, f"{requeued} job(s) queued")
@@ -0,0 +1,145 @@
+"""Async versions of the public portfolio views.
+
+Served when ``PORTFOLIO_ASYNC_VIEWS`` is enabled, which only pays off under
+an ASGI server (see "ASGI deployment" in the README). Behaviour and
+responses match ``portfolio.views``.
+"""
+from typing import Any, Dict, Optional
+
+from django.http import Http404, HttpResponse, JsonResponse
+from django.template.loader import render_to_string
+
+from . import queries
+from .cache import (
+    aget_content_version, aget_or_build, apeek, page_cache_key,
+    page_cache_timeout,
+)
+from .compression import repeats
+from .conditional import conditional_content
+from .fragments import (
+    LAZY_SECTIONS, SECTIONS, aget_fragment, lazy_sections_enabled,
+)
+from .pagination import PaginationError, aget_page, wants_page
+from .search import aget_results, parse_limit
+from .snapshots import (
+    SNAPSHOT_MODELS, aget_projects_with_technology, aget_snapshot,
+)
+from .streaming import astream_page, render_shell, streaming_enabled
+from .views import fallback_home
+
+
+@conditional_content(*SNAPSHOT_MODELS['portfolio'])
+async def portfolio_home(request):
+    """Main portfolio view that renders the complete portfolio page"""
+    lazy = lazy_sections_enabled(request)
+    cache_key = page_cache_key(
+        request, await aget_content_version(), variant='lazy' if lazy else ''
+    )
+
+    if streaming_enabled(lazy):
+        html: Optional[str] = await apeek(cache_key)
+        if html is not None:
+            return repeats(HttpResponse(html))
+        try:
+            context = await queries.ahome_context(lazy=True)
+            head, tail = render_shell(request, context)
+        except Exception:
+            return fallback_home(request)
+        return astream_page(head, tail, cache_key)
+
+    async def render_page() -> str:
+        context: Dict[str, Any] = await queries.ahome_context(lazy=lazy)
+        if lazy:
+            context['lazy_sections'] = LAZY_SECTIONS
+        # Every queryset is already evaluated, so rendering is pure CPU.
+        return render_to_string('portfolio/portfolio.html', context, request)
+
+    try:
+        html = await aget_or_build(
+            cache_key, render_page, page_cache_timeout()
+        )
+    except Exception:
+        return fallback_home(request)
+    return repeats(HttpResponse(html))
+
+
+@conditional_content(*SNAPSHOT_MODELS['portfolio'])
+async def section_fragment(request, section):
+    """HTML of one below-the-fold section, loaded by main.js"""
+    if section not in SECTIONS:
+        raise Http404('Unknown section')
+    return repeats(HttpResponse(await aget_fragment(section)))
+
+
+async def api_page(resource_name, params):
+    """Keyset-paginated, field-selected list response"""
+    try:
+        data = await aget_page(resource_name, params)
+    except PaginationError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+    return HttpResponse(data, content_type='application/json')
+
+
+@conditional_content(*SNAPSHOT_MODELS['personal_info'])
+async def api_personal_info(request):
+    """API endpoint for personal information"""
+    data: Optional[bytes] = await aget_snapshot('personal_info')
+    if data:
+        return repeats(HttpResponse(data, content_type='application/json'))
+    return JsonResponse({'error': 'Personal info not found'}, status=404)
+
+
+@conditional_content(*SNAPSHOT_MODELS['experiences'])
+async def api_experiences(request):
+    """API endpoint for experience data"""
+    if wants_page(request.GET):
+        return await api_page('experiences', request.GET)
+    return repeats(HttpResponse(
+        await aget_snapshot('experiences'), content_type='application/json'
+    ))
+
+
+@conditional_content(*SNAPSHOT_MODELS['skills'])
+async def api_skills(request):
+    """API endpoint for skills data"""
+    return repeats(HttpResponse(
+        await aget_snapshot('skills'), content_type='application/json'
+    ))
+
+
+@conditional_content(*SNAPSHOT_MODELS['projects'])
+async def api_projects(request):
+    """API endpoint for projects data, optionally filtered by ``?tech=``"""
+    if wants_page(request.GET):
+        return await api_page('projects', request.GET)
+    tech = request.GET.get('tech', '').strip()
+    if tech:
+        data = await aget_projects_with_technology(tech)
+    else:
+        data = await aget_snapshot('projects')
+    return repeats(HttpResponse(data, content_type='application/json'))
+
+
+@conditional_content(*SNAPSHOT_MODELS['technologies'])
+async def api_technologies(request):
+    """API endpoint for technology tag counts (tag cloud)"""
+    return repeats(HttpResponse(
+        await aget_snapshot('technologies'), content_type='application/json'
+    ))
+
+
+@conditional_content(*SNAPSHOT_MODELS['portfolio'])
+async def api_portfolio(request):
+    """API endpoint returning every portfolio payload in one response"""
+    return repeats(HttpResponse(
+        await aget_snapshot('portfolio'), content_type='application/json'
+    ))
+
+
+@conditional_content(*SNAPSHOT_MODELS['portfolio'])
+async def api_search(request):
+    """Full-text search over projects, experience and skills (``?q=``)"""
+    data = await aget_results(
+        request.GET.get('q', '').strip(), parse_limit(request.GET.get('limit'))
+    )
+    return HttpResponse(data, content_type='application/json')
@@ -0,0 +1,177 @@
+"""Static export of the public portfolio.
+
+Renders the homepage and every JSON API payload to files, copies the
+collected static files and media next to them and writes precompressed
+``.gz``/``.br`` siblings, so the result can be served by a CDN or any
+static host without Python on the request path.
+
+Exports are incremental: a manifest records, for every rendered output,
+the conditional-GET validator of the tables it was built from (and for
+copied files their size and mtime), and unchanged outputs are skipped.
+"""
+import gzip
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from .conditional import content_state
+from .snapshots import SNAPSHOT_MODELS
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+MANIFEST_NAME = '.bake-manifest.json'
+
+# (route, snapshot whose tables the output is built from)
+PAGES: List[Tuple[str, str]] = [
+    ('portfolio:home', 'portfolio'),
+    ('portfolio:api_personal_info', 'personal_info'),
+    ('portfolio:api_experiences', 'experiences'),
+    ('portfolio:api_skills', 'skills'),
+    ('portfolio:api_projects', 'projects'),
+    ('portfolio:api_technologies', 'technologies'),
+    ('portfolio:api_portfolio', 'portfolio'),
+]
+
+COMPRESSIBLE = {
+    '.html', '.json', '.css', '.js', '.svg', '.txt', '.xml', '.map',
+}
+MIN_COMPRESS_SIZE = 256
+
+
+@dataclass
+class BakeReport:
+    written: List[str] = field(default_factory=list)
+    skipped: int = 0
+    # (URL, status) of pages that didn't render with a 200
+    failed: List[Tuple[str, int]] = field(default_factory=list)
+
+
+def output_path(route: str) -> str:
+    """File for a route: ``/`` is index.html, ``/api/x/`` is index.json"""
+    path = reverse(route).strip('/')
+    name = 'index.json' if path.startswith('api/') else 'index.html'
+    return f'{path}/{name}' if path else name
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def write_compressed(path: Path, data: bytes) -> None:
+    """Write gzip (and brotli, when installed) siblings of ``path``"""
+    if path.suffix not in COMPRESSIBLE or len(data) < MIN_COMPRESS_SIZE:
+        return
+    # mtime=0 keeps the .gz byte-identical across exports
+    path.with_name(path.name + '.gz').write_bytes(
+        gzip.compress(data, compresslevel=9, mtime=0)
+    )
+    if brotli is not None:
+        path.with_name(path.name + '.br').write_bytes(brotli.compress(data))
+
+
+class Baker:
+    def __init__(self, output_dir, base_url: str = 'https://localhost',
+                 force: bool = False):
+        self.output_dir = Path(output_dir)
+        self.base_url = urlsplit(base_url)
+        self.force = force
+        self.manifest_path = self.output_dir / MANIFEST_NAME
+        self.manifest: Dict[str, Dict] = {}
+        if not force and self.manifest_path.exists():
+            self.manifest = json.loads(self.manifest_path.read_text())
+        self.report = BakeReport()
+
+    def bake(self) -> BakeReport:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.render_pages()
+        if settings.STATIC_ROOT and Path(settings.STATIC_ROOT).is_dir():
+            self.copy_tree(Path(settings.STATIC_ROOT), settings.STATIC_URL)
+        if settings.MEDIA_ROOT and Path(settings.MEDIA_ROOT).is_dir():
+            self.copy_tree(Path(settings.MEDIA_ROOT), settings.MEDIA_URL)
+        self.manifest_path.write_text(json.dumps(self.manifest, indent=1))
+        return self.report
+
+    def render_pages(self) -> None:
+        host = self.base_url.netloc or 'localhost'
+        client = Client(
+            HTTP_HOST=host, headers={'Accept-Encoding': 'identity'},
+        )
+        secure = self.base_url.scheme == 'https'
+        # A static host can't serve the fragment endpoints, so export the
+        # fully rendered homepage, as one response rather than a stream.
+        with override_settings(
+            ALLOWED_HOSTS=[host.split(':')[0]], PORTFOLIO_LAZY_SECTIONS=False,
+            PORTFOLIO_STREAM_HOME=False,
+        ):
+            for route, snapshot in PAGES:
+                relpath = output_path(route)
+                source, _ = content_state(*SNAPSHOT_MODELS[snapshot])
+                if self.is_current(relpath, source):
+                    continue
+                url = reverse(route)
+                response = client.get(url, secure=secure)
+                if response.status_code != 200:
+                    # e.g. SECURE_SSL_REDIRECT answering an http base URL
+                    # with a 301: the export would silently lack the page
+                    self.report.failed.append((url, response.status_code))
+                    continue
+                self.write(relpath, response.content, source)
+
+    def copy_tree(self, root: Path, url: str) -> None:
+        prefix = urlsplit(url).path.strip('/')
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                src = Path(dirpath) / filename
+                if src.suffix in ('.gz', '.br'):
+                    continue  # regenerated below
+                relpath = '/'.join(
+                    filter(None, [prefix, src.relative_to(root).as_posix()])
+                )
+                stat = src.stat()
+                source = f'{stat.st_size}-{stat.st_mtime_ns}'
+                if self.is_current(relpath, source):
+                    continue
+                self.write(relpath, src.read_bytes(), source)
+
+    def is_current(self, relpath: str, source: str) -> bool:
+        entry: Optional[Dict] = self.manifest.get(relpath)
+        if entry and entry['source'] == source and (
+            self.output_dir / relpath
+        ).exists():
+            self.report.skipped += 1
+            return True
+        return False
+
+    def write(self, relpath: str, data: bytes, source: str) -> None:
+        digest = _digest(data)
+        entry = self.manifest.get(relpath)
+        path = self.output_dir / relpath
+        self.manifest[relpath] = {'source': source, 'sha256': digest}
+        if entry and entry['sha256'] == digest and path.exists():
+            # Source changed but the output didn't: keep the file (and
+            # its mtime, which CDNs and rsync key on) as is.
+            self.report.skipped += 1
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + '.tmp')
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        write_compressed(path, data)
+        self.report.written.append(relpath)
+
+
+def bake(output_dir, base_url: str = 'https://localhost',
+         force: bool = False) -> BakeReport:
+    return Baker(output_dir, base_url=base_url, force=force).bake()
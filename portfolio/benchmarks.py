@@ -0,0 +1,172 @@
+"""Seed data and measurements for the route benchmark suite.
+
+Used by the ``benchmark_routes`` management command (timings and sizes)
+and by the query-budget tests in ``portfolio.tests``, which fail when a
+route's query count exceeds its budget or grows with the data size.
+"""
+import datetime
+import statistics
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .models import (
+    PersonalInfo, Experience, SkillCategory, Skill, Project,
+    sync_technology_tags,
+)
+from .search import rebuild_index
+
+# Maximum queries per route on a cold cache. Warm requests must issue none.
+QUERY_BUDGETS: Dict[str, int] = {
+    'portfolio:home': 10,
+    'portfolio:section_fragment': 10,
+    'portfolio:download_resume': 1,
+    'portfolio:api_personal_info': 16,
+    'portfolio:api_experiences': 16,
+    'portfolio:api_skills': 16,
+    'portfolio:api_projects': 16,
+    'portfolio:api_technologies': 16,
+    'portfolio:api_portfolio': 16,
+    'portfolio:api_search': 8,
+}
+
+# URL arguments and query strings for routes that need them
+ROUTE_KWARGS: Dict[str, Dict[str, str]] = {
+    'portfolio:section_fragment': {'section': 'skills'},
+}
+ROUTE_QUERIES: Dict[str, str] = {
+    'portfolio:api_search': '?q=django',
+}
+
+# Maximum queries per admin changelist page, with or without the given
+# filter, whatever the table size: session, user, the list, its count and
+# the choices of a related-object or distinct-value filter
+ADMIN_QUERY_BUDGETS: Dict[str, Tuple[int, str]] = {
+    'admin:portfolio_personalinfo_changelist': (5, '?q=owner'),
+    'admin:portfolio_experience_changelist': (4, '?is_current__exact=0'),
+    'admin:portfolio_skillcategory_changelist': (4, '?q=category'),
+    'admin:portfolio_skill_changelist': (5, '?category__id__exact=1'),
+    'admin:portfolio_project_changelist': (4, '?is_featured__exact=1'),
+    'admin:portfolio_technology_changelist': (4, '?q=django'),
+    'admin:portfolio_job_changelist': (5, '?status__exact=failed'),
+}
+
+# Routes that are served from the page or snapshot cache once warm
+CACHED_ROUTES = [name for name in QUERY_BUDGETS if name != 'portfolio:download_resume']
+
+
+@dataclass
+class RouteResult:
+    route: str
+    status: int
+    cold_queries: int
+    warm_queries: int
+    size: int
+    cold_p50_ms: float
+    cold_p95_ms: float
+    warm_p50_ms: float
+    warm_p95_ms: float
+
+
+def seed_portfolio(experiences: int = 40, categories: int = 30,
+                   skills_per_category: int = 10, projects: int = 300) -> None:
+    """Create a realistically large portfolio with bulk inserts"""
+    PersonalInfo.objects.create(
+        name='Benchmark Owner', title='Engineer',
+        description='Seeded for benchmarks. ' * 20,
+        email='owner@example.com',
+    )
+    start = datetime.date(2000, 1, 1)
+    Experience.objects.bulk_create(
+        Experience(
+            title=f'Role {i}', company=f'Company {i}',
+            description='Delivered things. ' * 40,
+            start_date=start + datetime.timedelta(days=120 * i),
+            order=i,
+        )
+        for i in range(experiences)
+    )
+    category_objs = SkillCategory.objects.bulk_create(
+        SkillCategory(name=f'Category {i}', order=i) for i in range(categories)
+    )
+    Skill.objects.bulk_create(
+        Skill(category=category, name=f'Skill {c}.{i}',
+              proficiency=(i * 7) % 100, order=i)
+        for c, category in enumerate(category_objs)
+        for i in range(skills_per_category)
+    )
+    technologies = ['Django', 'Python', 'PostgreSQL', 'Redis', 'JavaScript',
+                    'React', 'Docker', 'AWS', 'Celery', 'GraphQL']
+    project_objs = Project.objects.bulk_create(
+        Project(
+            title=f'Project {i}', description='A project. ' * 30,
+            technologies=', '.join(technologies[i % 5:i % 5 + 5]),
+            technology_list=technologies[i % 5:i % 5 + 5],
+            order=i,
+        )
+        for i in range(projects)
+    )
+    sync_technology_tags(project_objs)
+    # bulk_create skips the signals that maintain the search documents
+    rebuild_index()
+
+
+def route_url(route: str) -> str:
+    return (
+        reverse(route, kwargs=ROUTE_KWARGS.get(route))
+        + ROUTE_QUERIES.get(route, '')
+    )
+
+
+def count_queries(client: Client, url: str) -> int:
+    with CaptureQueriesContext(connection) as queries:
+        client.get(url)
+    return len(queries)
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if len(samples) == 1:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method='inclusive')[pct - 1]
+
+
+def _time(client: Client, url: str, iterations: int, cold: bool) -> List[float]:
+    samples = []
+    for _ in range(iterations):
+        if cold:
+            cache.clear()
+        started = time.perf_counter()
+        client.get(url)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def benchmark_route(client: Client, route: str, iterations: int) -> RouteResult:
+    url = route_url(route)
+    cache.clear()
+    cold_queries = count_queries(client, url)
+    warm_queries = count_queries(client, url)
+    response = client.get(url)
+    if response.streaming:
+        size = sum(len(chunk) for chunk in response.streaming_content)
+    else:
+        size = len(response.content)
+    cold = _time(client, url, iterations, cold=True)
+    warm = _time(client, url, iterations, cold=False)
+    return RouteResult(
+        route=route,
+        status=response.status_code,
+        cold_queries=cold_queries,
+        warm_queries=warm_queries,
+        size=size,
+        cold_p50_ms=percentile(cold, 50),
+        cold_p95_ms=percentile(cold, 95),
+        warm_p50_ms=percentile(warm, 50),
+        warm_p95_ms=percentile(warm, 95),
+    )
@@ -0,0 +1,291 @@
+"""Content-versioned caching for the portfolio app.
+
+Every cached artefact (rendered pages, API payloads, ...) is keyed on the
+current content version. Saving or deleting portfolio content bumps the
+version, so stale entries are never read again and simply age out of the
+cache backend.
+
+Artefacts are read through ``get_or_build``, which protects the database
+from cache stampedes:
+
+* Entries are stored as an ``Entry`` that records when they go stale, and
+  kept ``PORTFOLIO_CACHE_STALE_TTL`` seconds past that. One request
+  refreshes a stale entry while the others keep serving it.
+* On a miss, only the request holding the key's lock builds the value;
+  the others poll for up to ``PORTFOLIO_CACHE_LOCK_WAIT`` seconds for it
+  to appear before giving up and building it themselves.
+
+Because a versioned key never changes meaning, versioned entries can also
+be held in a per-process tier (``portfolio.cache_backends.TieredCache``).
+
+The content version itself lives in the default cache, so every process
+that serves or changes content must share that cache (Redis via
+``REDIS_URL``). With a per-process cache, a bump only reaches the process
+that made it; ``portfolio.checks`` rejects that setup for more than one
+web worker.
+"""
+import asyncio
+import hashlib
+import re
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+
+from .instrumentation import record_cache
+
+VERSION_KEY = 'portfolio:content-version'
+LOCK_PREFIX = 'portfolio:lock:'
+POLL_INTERVAL = 0.05
+
+_VERSIONED_KEY = re.compile(r'portfolio:[^:]*:\d+:')
+
+LOCAL_CACHE_WARNING = (
+    "The default cache is local to this process, so the running site "
+    "won't see this change until its cached pages expire. Set REDIS_URL "
+    "to share the cache between processes."
+)
+
+
+def is_shared_cache() -> bool:
+    """Whether the default cache is seen by every process"""
+    backend = caches['default']
+    # TieredCache: the per-process tier only holds versioned entries
+    backend = getattr(backend, 'shared', backend)
+    return not isinstance(backend, LocMemCache)
+
+
+def get_content_version() -> int:
+    """Return the current content version, initialising it if missing"""
+    version: Optional[int] = cache.get(VERSION_KEY)
+    if version is None:
+        # Seed from the clock rather than 1 so that a flushed or evicted
+        # version can never collide with keys written before the flush.
+        version = time.time_ns()
+        if not cache.add(VERSION_KEY, version, timeout=None):
+            version = cache.get(VERSION_KEY, version)
+    return version
+
+
+async def aget_content_version() -> int:
+    """Async ``get_content_version``"""
+    version: Optional[int] = await cache.aget(VERSION_KEY)
+    if version is None:
+        version = time.time_ns()
+        if not await cache.aadd(VERSION_KEY, version, timeout=None):
+            version = await cache.aget(VERSION_KEY, version)
+    return version
+
+
+def bump_content_version() -> int:
+    """Invalidate every versioned entry by moving to a new content version"""
+    try:
+        return cache.incr(VERSION_KEY)
+    except ValueError:
+        version = time.time_ns()
+        cache.set(VERSION_KEY, version, timeout=None)
+        return version
+
+
+def versioned_key(*parts: str, version: Optional[int] = None) -> str:
+    """Build a cache key scoped to a content version and code build"""
+    if version is None:
+        version = get_content_version()
+    build = getattr(settings, 'PORTFOLIO_BUILD_ID', '')
+    return ':'.join(['portfolio', build, str(version), *parts])
+
+
+def page_cache_key(request, version: Optional[int] = None,
+                   variant: str = '') -> str:
+    """Cache key for a full rendered page.
+
+    The rendered HTML embeds the page's URL (structured data in
+    ``base.html``), so scheme, host and path are part of the key. The query
+    string is not: the page doesn't render it, and keying on it would let
+    ``/?x=<random>`` fill the cache. ``variant`` separates the renderings a
+    known parameter selects (lazy and full homepage).
+    """
+    uri = hashlib.md5(
+        request.build_absolute_uri(request.path).encode(),
+        usedforsecurity=False,
+    ).hexdigest()
+    return versioned_key('page', uri, *filter(None, [variant]), version=version)
+
+
+def is_versioned_key(key: str) -> bool:
+    """Whether ``key`` was built by ``versioned_key`` (so never changes)"""
+    return _VERSIONED_KEY.match(key) is not None
+
+
+def page_cache_timeout() -> Optional[int]:
+    return getattr(settings, 'PORTFOLIO_PAGE_CACHE_TIMEOUT', 60 * 60 * 24)
+
+
+def stale_ttl() -> int:
+    return getattr(settings, 'PORTFOLIO_CACHE_STALE_TTL', 60 * 5)
+
+
+def lock_timeout() -> int:
+    return getattr(settings, 'PORTFOLIO_CACHE_LOCK_TIMEOUT', 30)
+
+
+def lock_wait() -> float:
+    return getattr(settings, 'PORTFOLIO_CACHE_LOCK_WAIT', 5)
+
+
+class Entry(NamedTuple):
+    value: Any
+    # time.time() after which the entry is stale; None never goes stale
+    fresh_until: Optional[float]
+
+    def is_fresh(self) -> bool:
+        return self.fresh_until is None or time.time() < self.fresh_until
+
+
+def _entry(value, timeout: Optional[int]):
+    if timeout is None:
+        return Entry(value, None), None
+    return Entry(value, time.time() + timeout), timeout + stale_ttl()
+
+
+def store(key: str, value, timeout: Optional[int]) -> None:
+    """Cache ``value`` for ``get_or_build``, fresh for ``timeout`` seconds"""
+    entry, ttl = _entry(value, timeout)
+    cache.set(key, entry, ttl)
+
+
+def store_many(values: Dict[str, Any], timeout: Optional[int]) -> None:
+    entries = {}
+    ttl = None
+    for key, value in values.items():
+        entries[key], ttl = _entry(value, timeout)
+    cache.set_many(entries, ttl)
+
+
+async def astore(key: str, value, timeout: Optional[int]) -> None:
+    entry, ttl = _entry(value, timeout)
+    await cache.aset(key, entry, ttl)
+
+
+def peek(key: str):
+    """Cached value of ``key`` whether fresh or stale; None on a miss.
+
+    For callers that can't wait on ``get_or_build`` (a streamed page is
+    built while it is being sent).
+    """
+    entry: Optional[Entry] = cache.get(key)
+    record_cache(entry is not None)
+    return None if entry is None else entry.value
+
+
+async def apeek(key: str):
+    """Async ``peek``"""
+    entry: Optional[Entry] = await cache.aget(key)
+    record_cache(entry is not None)
+    return None if entry is None else entry.value
+
+
+def _acquire(key: str) -> Optional[str]:
+    token = uuid.uuid4().hex
+    if cache.add(LOCK_PREFIX + key, token, lock_timeout()):
+        return token
+    return None
+
+
+def _release(key: str, token: str) -> None:
+    if cache.get(LOCK_PREFIX + key) == token:
+        cache.delete(LOCK_PREFIX + key)
+
+
+async def _aacquire(key: str) -> Optional[str]:
+    token = uuid.uuid4().hex
+    if await cache.aadd(LOCK_PREFIX + key, token, lock_timeout()):
+        return token
+    return None
+
+
+async def _arelease(key: str, token: str) -> None:
+    if await cache.aget(LOCK_PREFIX + key) == token:
+        await cache.adelete(LOCK_PREFIX + key)
+
+
+def _refresh(key: str, token: str, build: Callable[[], Any],
+             timeout: Optional[int]):
+    try:
+        # Another request may have stored it between our miss and the lock
+        entry: Optional[Entry] = cache.get(key)
+        if entry is not None and entry.is_fresh():
+            return entry.value
+        value = build()
+        store(key, value, timeout)
+        return value
+    finally:
+        _release(key, token)
+
+
+def get_or_build(key: str, build: Callable[[], Any],
+                 timeout: Optional[int]):
+    """Cached value of ``key``, building it at most once across workers"""
+    entry: Optional[Entry] = cache.get(key)
+    if entry is not None:
+        record_cache(True)
+        if not entry.is_fresh():
+            token = _acquire(key)
+            if token:
+                return _refresh(key, token, build, timeout)
+        return entry.value
+    record_cache(False)
+    deadline = time.monotonic() + lock_wait()
+    while True:
+        token = _acquire(key)
+        if token:
+            return _refresh(key, token, build, timeout)
+        if time.monotonic() >= deadline:
+            # The lock holder is slow or died; don't keep the user waiting
+            return build()
+        time.sleep(POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry.value
+
+
+async def _arefresh(key: str, token: str,
+                    build: Callable[[], Awaitable[Any]],
+                    timeout: Optional[int]):
+    try:
+        entry: Optional[Entry] = await cache.aget(key)
+        if entry is not None and entry.is_fresh():
+            return entry.value
+        value = await build()
+        await astore(key, value, timeout)
+        return value
+    finally:
+        await _arelease(key, token)
+
+
+async def aget_or_build(key: str, build: Callable[[], Awaitable[Any]],
+                        timeout: Optional[int]):
+    """Async ``get_or_build``; ``build`` is a coroutine function"""
+    entry: Optional[Entry] = await cache.aget(key)
+    if entry is not None:
+        record_cache(True)
+        if not entry.is_fresh():
+            token = await _aacquire(key)
+            if token:
+                return await _arefresh(key, token, build, timeout)
+        return entry.value
+    record_cache(False)
+    deadline = time.monotonic() + lock_wait()
+    while True:
+        token = await _aacquire(key)
+        if token:
+            return await _arefresh(key, token, build, timeout)
+        if time.monotonic() >= deadline:
+            return await build()
+        await asyncio.sleep(POLL_INTERVAL)
+        entry = await cache.aget(key)
+        if entry is not None:
+            return entry.value
@@ -0,0 +1,209 @@
+"""Two-tier cache: a small in-process LRU in front of a shared cache.
+
+Configure the shared cache (Redis) under its own alias and point
+``TieredCache`` at it with ``LOCATION``::
+
+    CACHES = {
+        'default': {
+            'BACKEND': 'portfolio.cache_backends.TieredCache',
+            'LOCATION': 'shared',
+            'OPTIONS': {'L1_MAX_ENTRIES': 256, 'L1_TIMEOUT': 300},
+        },
+        'shared': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': 'redis://localhost:6379/1',
+        },
+    }
+
+Only versioned keys (``portfolio.cache.versioned_key``) are held in the
+local tier: their value never changes, so there's nothing to invalidate
+across processes. Bumping the content version moves every reader to new
+keys, and the old local entries are evicted as the LRU fills. Everything
+else (the content version, locks, sessions, ...) goes straight to the
+shared cache.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.utils.functional import cached_property
+
+from .cache import Entry, is_versioned_key
+
+_MISSING = object()
+
+
+class TieredCache(BaseCache):
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self.shared_alias = location
+        self.l1_max_entries = int(options.get('L1_MAX_ENTRIES', 256))
+        self.l1_timeout = float(options.get('L1_TIMEOUT', 300))
+        self._l1: 'OrderedDict[str, Tuple[float, Any]]' = OrderedDict()
+        self._l1_lock = threading.Lock()
+
+    @cached_property
+    def shared(self) -> BaseCache:
+        return caches[self.shared_alias]
+
+    # Local tier
+
+    def _local_key(self, key, version) -> Optional[str]:
+        if not isinstance(key, str) or not is_versioned_key(key):
+            return None
+        return self.make_and_validate_key(key, version=version)
+
+    def _local_expiry(self, value, timeout) -> Optional[float]:
+        now = time.time()
+        expires = now + self.l1_timeout
+        if timeout is not DEFAULT_TIMEOUT and timeout is not None:
+            expires = min(expires, now + timeout)
+        if isinstance(value, Entry):
+            # A stale entry must reach the shared tier, where one request
+            # takes the lock and refreshes it.
+            if value.fresh_until is not None:
+                expires = min(expires, value.fresh_until)
+        return expires if expires > now else None
+
+    def _local_get(self, local_key):
+        with self._l1_lock:
+            item = self._l1.get(local_key)
+            if item is None:
+                return _MISSING
+            expires, value = item
+            if expires <= time.time():
+                del self._l1[local_key]
+                return _MISSING
+            self._l1.move_to_end(local_key)
+            return value
+
+    def _local_set(self, local_key, value, timeout=DEFAULT_TIMEOUT) -> None:
+        expires = self._local_expiry(value, timeout)
+        with self._l1_lock:
+            if expires is None:
+                self._l1.pop(local_key, None)
+                return
+            self._l1[local_key] = (expires, value)
+            self._l1.move_to_end(local_key)
+            while len(self._l1) > self.l1_max_entries:
+                self._l1.popitem(last=False)
+
+    def _local_delete(self, local_key) -> None:
+        with self._l1_lock:
+            self._l1.pop(local_key, None)
+
+    # Cache API
+
+    def get(self, key, default=None, version=None):
+        local_key = self._local_key(key, version)
+        if local_key is not None:
+            value = self._local_get(local_key)
+            if value is not _MISSING:
+                return value
+        value = self.shared.get(key, _MISSING, version=version)
+        if value is _MISSING:
+            return default
+        if local_key is not None:
+            self._local_set(local_key, value)
+        return value
+
+    async def aget(self, key, default=None, version=None):
+        local_key = self._local_key(key, version)
+        if local_key is not None:
+            value = self._local_get(local_key)
+            if value is not _MISSING:
+                return value
+        value = await self.shared.aget(key, _MISSING, version=version)
+        if value is _MISSING:
+            return default
+        if local_key is not None:
+            self._local_set(local_key, value)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.shared.set(key, value, timeout, version=version)
+        local_key = self._local_key(key, version)
+        if local_key is not None:
+            self._local_set(local_key, value, timeout)
+
+    async def aset(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        await self.shared.aset(key, value, timeout, version=version)
+        local_key = self._local_key(key, version)
+        if local_key is not None:
+            self._local_set(local_key, value, timeout)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.shared.add(key, value, timeout, version=version)
+
+    async def aadd(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        return await self.shared.aadd(key, value, timeout, version=version)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.shared.touch(key, timeout, version=version)
+
+    def delete(self, key, version=None):
+        local_key = self._local_key(key, version)
+        if local_key is not None:
+            self._local_delete(local_key)
+        return self.shared.delete(key, version=version)
+
+    async def adelete(self, key, version=None):
+        local_key = self._local_key(key, version)
+        if local_key is not None:
+            self._local_delete(local_key)
+        return await self.shared.adelete(key, version=version)
+
+    def get_many(self, keys, version=None):
+        found = {}
+        remote = []
+        for key in keys:
+            local_key = self._local_key(key, version)
+            value = _MISSING if local_key is None else self._local_get(local_key)
+            if value is _MISSING:
+                remote.append(key)
+            else:
+                found[key] = value
+        if remote:
+            fetched = self.shared.get_many(remote, version=version)
+            for key, value in fetched.items():
+                local_key = self._local_key(key, version)
+                if local_key is not None:
+                    self._local_set(local_key, value)
+            found.update(fetched)
+        return found
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = self.shared.set_many(data, timeout, version=version)
+        for key, value in data.items():
+            local_key = self._local_key(key, version)
+            if local_key is not None and key not in failed:
+                self._local_set(local_key, value, timeout)
+        return failed
+
+    def delete_many(self, keys, version=None):
+        for key in keys:
+            local_key = self._local_key(key, version)
+            if local_key is not None:
+                self._local_delete(local_key)
+        return self.shared.delete_many(keys, version=version)
+
+    def has_key(self, key, version=None):
+        local_key = self._local_key(key, version)
+        if local_key is not None and self._local_get(local_key) is not _MISSING:
+            return True
+        return self.shared.has_key(key, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        return self.shared.incr(key, delta, version=version)
+
+    def decr(self, key, delta=1, version=None):
+        return self.shared.decr(key, delta, version=version)
+
+    def clear(self):
+        with self._l1_lock:
+            self._l1.clear()
+        return self.shared.clear()
@@ -0,0 +1,40 @@
+"""System checks for deployment settings the portfolio app relies on"""
+import os
+
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+from .cache import is_shared_cache
+
+
+def web_concurrency() -> int:
+    """Web worker processes, as gunicorn reads them from the environment"""
+    try:
+        return int(os.environ.get('WEB_CONCURRENCY', 1))
+    except ValueError:
+        return 1
+
+
+@register(Tags.caches, deploy=False)
+def check_shared_cache(app_configs, **kwargs):
+    errors = []
+    if web_concurrency() > 1 and not is_shared_cache():
+        errors.append(Error(
+            "WEB_CONCURRENCY runs several web workers, but the default "
+            "cache is local to each process.",
+            hint="Set REDIS_URL. The content version that invalidates "
+                 "cached pages lives in the cache, so with a per-process "
+                 "cache an edit only reaches the worker that saved it.",
+            id='portfolio.E001',
+        ))
+    if getattr(settings, 'PORTFOLIO_BACKGROUND_JOBS', False) and \
+            not is_shared_cache():
+        errors.append(Error(
+            "PORTFOLIO_BACKGROUND_JOBS is on, but the default cache is "
+            "local to each process.",
+            hint="Set REDIS_URL. Jobs run in manage.py run_jobs, so the "
+                 "snapshots they build and the versions they bump would "
+                 "never reach the web workers.",
+            id='portfolio.E002',
+        ))
+    return errors
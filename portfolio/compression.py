@@ -0,0 +1,278 @@
+"""Compression of the dynamic public responses.
+
+WhiteNoise serves precompressed static files. ``CompressionMiddleware``
+does the same for the HTML and JSON produced by the public views:
+
+* The encoding is negotiated from ``Accept-Encoding``: ``br``, ``zstd``
+  or ``gzip``, in that order of preference at equal quality. Brotli and
+  zstd are used when their packages are installed.
+* Bodies under ``PORTFOLIO_COMPRESS_MIN_SIZE`` bytes, already encoded
+  bodies, range responses and content types that don't compress
+  (images, PDFs) are sent as they are.
+* Page and snapshot bodies, which views mark with ``repeats()``, are
+  cached compressed under the content version and a digest of the body.
+  Each is compressed once per encoding and version, and repeat requests
+  reuse the result. One-off bodies (search results, paginated pages,
+  errors) are compressed inline at a faster level, without a cache
+  round trip.
+* Streamed responses are compressed chunk by chunk at a faster level,
+  flushing after each chunk so the browser still gets every section as
+  soon as it is rendered.
+
+Only public requests are compressed. The admin embeds CSRF tokens next to
+user input, which is what BREACH-style attacks on compressed HTTPS
+responses need.
+"""
+import gzip
+import hashlib
+import re
+import zlib
+from typing import AsyncIterator, Iterable, Iterator, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+from .cache import (
+    aget_content_version, aget_or_build, get_or_build, page_cache_timeout,
+    versioned_key,
+)
+from .instrumentation import timed
+from .middleware import AsyncCapableMiddleware, is_public_request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+# Preferred first
+ENCODINGS = ('br', 'zstd', 'gzip')
+
+# Cached bodies are compressed once per content version, so they get a
+# thorough level; streamed chunks and one-off bodies are compressed on
+# every request.
+LEVELS = {'br': 9, 'zstd': 12, 'gzip': 9}
+FAST_LEVELS = {'br': 4, 'zstd': 3, 'gzip': 6}
+
+COMPRESSIBLE_TYPE = re.compile(
+    r'^(text/|application/(json|javascript|xml|[\w.+-]*\+(json|xml))|'
+    r'image/svg\+xml)'
+)
+
+
+def available_encodings():
+    return [
+        encoding for encoding in ENCODINGS
+        if encoding == 'gzip'
+        or (encoding == 'br' and brotli is not None)
+        or (encoding == 'zstd' and zstandard is not None)
+    ]
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """The best encoding ``Accept-Encoding`` allows, or None for identity"""
+    weights = {}
+    for item in accept_encoding.split(','):
+        coding, _, params = item.partition(';')
+        coding = coding.strip().lower()
+        weight = 1.0
+        for param in params.split(';'):
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        if coding:
+            weights[coding] = weight
+    best, best_weight = None, 0.0
+    for encoding in available_encodings():
+        weight = weights.get(encoding, weights.get('*', 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def repeats(response):
+    """Mark ``response`` as a cached page or snapshot body.
+
+    Only such bodies come back on later requests, so only they are worth
+    keeping compressed in the cache.
+    """
+    response._portfolio_repeats = True
+    return response
+
+
+def compress(data: bytes, encoding: str, levels=LEVELS) -> bytes:
+    level = levels[encoding]
+    if encoding == 'br':
+        return brotli.compress(data, quality=level)
+    if encoding == 'zstd':
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def _compressed_key(data: bytes, encoding: str,
+                    version: Optional[int] = None) -> str:
+    digest = hashlib.md5(data, usedforsecurity=False).hexdigest()
+    return versioned_key('compressed', encoding, digest, version=version)
+
+
+def compressed(data: bytes, encoding: str) -> bytes:
+    """``compress(data, encoding)``, cached for the content version"""
+    return get_or_build(
+        _compressed_key(data, encoding),
+        lambda: compress(data, encoding), page_cache_timeout(),
+    )
+
+
+async def acompressed(data: bytes, encoding: str) -> bytes:
+    """Async ``compressed``; compressing runs off the event loop"""
+    version = await aget_content_version()
+    return await aget_or_build(
+        _compressed_key(data, encoding, version),
+        lambda: sync_to_async(compress, thread_sensitive=False)(
+            data, encoding
+        ),
+        page_cache_timeout(),
+    )
+
+
+class StreamCompressor:
+    """Compress a stream, flushing after every chunk"""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        level = FAST_LEVELS[encoding]
+        if encoding == 'br':
+            self.compressor = brotli.Compressor(quality=level)
+        elif encoding == 'zstd':
+            self.compressor = zstandard.ZstdCompressor(level=level).compressobj()
+        else:
+            self.compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        if self.encoding == 'br':
+            return self.compressor.process(data) + self.compressor.flush()
+        if self.encoding == 'zstd':
+            return self.compressor.compress(data) + self.compressor.flush(
+                zstandard.COMPRESSOBJ_FLUSH_BLOCK
+            )
+        return self.compressor.compress(data) + self.compressor.flush(
+            zlib.Z_SYNC_FLUSH
+        )
+
+    def finish(self) -> bytes:
+        if self.encoding == 'br':
+            return self.compressor.finish()
+        return self.compressor.flush()
+
+
+def compress_stream(chunks: Iterable[bytes], encoding: str) -> Iterator[bytes]:
+    compressor = StreamCompressor(encoding)
+    for chunk in chunks:
+        data = compressor.chunk(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+async def acompress_stream(chunks: AsyncIterator[bytes],
+                           encoding: str) -> AsyncIterator[bytes]:
+    compressor = StreamCompressor(encoding)
+    async for chunk in chunks:
+        data = compressor.chunk(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+def min_size() -> int:
+    return getattr(settings, 'PORTFOLIO_COMPRESS_MIN_SIZE', 512)
+
+
+class CompressionMiddleware(AsyncCapableMiddleware):
+    """Compress public responses; see the module docstring"""
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        response = self.get_response(request)
+        encoding = self.encoding_for(request, response)
+        if encoding is None:
+            return response
+        if response.streaming:
+            return self.compress_streaming(response, encoding)
+        with timed('compress'):
+            if getattr(response, '_portfolio_repeats', False):
+                body = compressed(response.content, encoding)
+            else:
+                body = compress(response.content, encoding, FAST_LEVELS)
+        return self.replace_content(response, body, encoding)
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        encoding = self.encoding_for(request, response)
+        if encoding is None:
+            return response
+        if response.streaming:
+            return self.compress_streaming(response, encoding)
+        with timed('compress'):
+            if getattr(response, '_portfolio_repeats', False):
+                body = await acompressed(response.content, encoding)
+            else:
+                body = compress(response.content, encoding, FAST_LEVELS)
+        return self.replace_content(response, body, encoding)
+
+    @staticmethod
+    def encoding_for(request, response) -> Optional[str]:
+        """The encoding to compress ``response`` with, or None to leave it"""
+        if (
+            not getattr(settings, 'PORTFOLIO_COMPRESSION', False)
+            or not is_public_request(request)
+            # Content-Encoding would apply to the byte range, not the file
+            or response.status_code == 206
+            or response.has_header('Content-Range')
+            or response.has_header('Content-Encoding')
+            or not COMPRESSIBLE_TYPE.match(response.get('Content-Type', ''))
+        ):
+            return None
+        # Caches must keep the variants apart, compressed or not
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if not response.streaming and len(response.content) < min_size():
+            return None
+        return negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+
+    def compress_streaming(self, response, encoding: str):
+        if response.is_async:
+            response.streaming_content = acompress_stream(
+                response.streaming_content, encoding
+            )
+        else:
+            response.streaming_content = compress_stream(
+                response.streaming_content, encoding
+            )
+        del response['Content-Length']
+        return self.mark_encoded(response, encoding)
+
+    def replace_content(self, response, body: bytes, encoding: str):
+        if len(body) >= len(response.content):
+            return response
+        response.content = body
+        response['Content-Length'] = str(len(body))
+        return self.mark_encoded(response, encoding)
+
+    @staticmethod
+    def mark_encoded(response, encoding: str):
+        # The bytes differ per encoding; a weak ETag still validates the
+        # same content (If-None-Match uses weak comparison)
+        etag = response.get('ETag')
+        if etag and not etag.startswith('W/'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,126 @@
+"""Conditional GET support (ETag / Last-Modified / 304) for portfolio views.
+
+Validators are derived from the content tables a view reads: the row count
+and latest ``updated_at`` of each table. The result is cached under the
+current content version, so a revalidation normally costs one cache
+lookup and never reaches the view body.
+"""
+import datetime
+import hashlib
+from functools import wraps
+from inspect import iscoroutinefunction
+from typing import Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .cache import (
+    aget_content_version, aget_or_build, get_or_build, page_cache_timeout,
+    versioned_key,
+)
+
+ContentState = Tuple[str, Optional[datetime.datetime]]
+
+
+def _state_key(models, version: Optional[int] = None) -> str:
+    labels = sorted(model._meta.label_lower for model in models)
+    return versioned_key('state', *labels, version=version)
+
+
+def content_state(*models, version: Optional[int] = None) -> ContentState:
+    """Return the (ETag, Last-Modified) pair for a set of content tables"""
+    return get_or_build(
+        _state_key(models, version), lambda: _compute_state(models),
+        page_cache_timeout(),
+    )
+
+
+def _compute_state(models) -> ContentState:
+    parts = [getattr(settings, 'PORTFOLIO_BUILD_ID', '')]
+    last_modified: Optional[datetime.datetime] = None
+    for model in sorted(models, key=lambda m: m._meta.label_lower):
+        table = model._default_manager.aggregate(
+            latest=Max('updated_at'), count=Count('pk')
+        )
+        latest = table['latest']
+        parts.append(
+            f"{model._meta.label_lower}:{table['count']}:"
+            f"{latest.isoformat() if latest else ''}"
+        )
+        if latest and (last_modified is None or latest > last_modified):
+            last_modified = latest
+    digest = hashlib.md5(
+        '|'.join(parts).encode(), usedforsecurity=False
+    ).hexdigest()
+    return (f'"{digest}"', last_modified)
+
+
+async def acontent_state(*models) -> ContentState:
+    """Async ``content_state``; only a cold validator leaves the event loop"""
+    version = await aget_content_version()
+    return await aget_or_build(
+        _state_key(models, version),
+        lambda: sync_to_async(_compute_state)(models),
+        page_cache_timeout(),
+    )
+
+
+def conditional_content(*models):
+    """Answer If-None-Match / If-Modified-Since for views over ``models``.
+
+    A matching request gets a 304 without running the view; otherwise the
+    view runs and its response is stamped with ETag and Last-Modified.
+    Responses marked ``no-store`` (such as error fallbacks) and streamed
+    responses (which may end in an error notice) are left alone.
+    """
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def inner(request, *args, **kwargs):
+                if request.method not in ('GET', 'HEAD'):
+                    return await view_func(request, *args, **kwargs)
+                state = await acontent_state(*models)
+                response = _not_modified(request, state)
+                if response is None:
+                    response = await view_func(request, *args, **kwargs)
+                return _add_validators(response, state)
+        else:
+            @wraps(view_func)
+            def inner(request, *args, **kwargs):
+                if request.method not in ('GET', 'HEAD'):
+                    return view_func(request, *args, **kwargs)
+                state = content_state(*models)
+                response = _not_modified(request, state)
+                if response is None:
+                    response = view_func(request, *args, **kwargs)
+                return _add_validators(response, state)
+        return inner
+    return decorator
+
+
+def _timestamp(last_modified: Optional[datetime.datetime]) -> Optional[int]:
+    return int(last_modified.timestamp()) if last_modified else None
+
+
+def _not_modified(request, state: ContentState):
+    etag, last_modified = state
+    return get_conditional_response(
+        request, etag=etag, last_modified=_timestamp(last_modified)
+    )
+
+
+def _add_validators(response, state: ContentState):
+    etag, last_modified = state
+    if (
+        not response.streaming
+        and 'no-store' not in response.get('Cache-Control', '')
+    ):
+        response.headers.setdefault('ETag', etag)
+        if last_modified and not response.has_header('Last-Modified'):
+            response.headers['Last-Modified'] = http_date(
+                _timestamp(last_modified)
+            )
+    return response
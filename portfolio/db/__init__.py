@@ -0,0 +1,110 @@
+"""Database connection settings.
+
+``database_config`` turns ``DATABASE_URL`` plus a few environment variables
+into a ``DATABASES`` entry for one of three connection modes
+(``DB_POOL``):
+
+``persistent`` (default)
+    Each worker thread keeps its own connection for ``DB_CONN_MAX_AGE``
+    seconds, health-checked before reuse. Fine for a handful of sync
+    workers. Under ASGI every thread that runs sync code holds a
+    connection, so prefer ``psycopg`` there.
+``psycopg``
+    A psycopg connection pool per worker process (Django 5.1+), sized by
+    ``DB_POOL_MIN_SIZE``/``DB_POOL_MAX_SIZE``. Connections go back to the
+    pool at the end of each request, so WSGI and ASGI workers alike stay
+    under ``workers * DB_POOL_MAX_SIZE`` server connections. Requests wait
+    up to ``DB_POOL_TIMEOUT`` seconds for a free one.
+``pgbouncer``
+    For a pgbouncer in transaction pooling mode in front of Postgres:
+    short-lived client connections, no server-side cursors and no
+    prepared statements.
+
+PostgreSQL connections use ``portfolio.db.backends.postgresql``, which
+reports the time spent acquiring a connection (pool wait, or TCP and TLS
+handshake) as ``db_connect`` in ``Server-Timing`` and the request log.
+
+Each ``DATABASE_URL_<NAME>`` variable adds a read replica, the alias
+``replica_<name>``, configured the same way (``replica_databases``).
+``portfolio.db.router`` sends public reads to them.
+"""
+import os
+from typing import Any, Dict, Mapping, Optional
+
+import dj_database_url
+from django.core.exceptions import ImproperlyConfigured
+
+POSTGRESQL_ENGINE = 'portfolio.db.backends.postgresql'
+
+MODES = ('persistent', 'psycopg', 'pgbouncer')
+
+REPLICA_URL_PREFIX = 'DATABASE_URL_'
+REPLICA_PREFIX = 'replica_'
+
+
+def _int(environ: Mapping[str, str], name: str, default: int) -> int:
+    value = environ.get(name)
+    if value in (None, ''):
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ImproperlyConfigured(f"{name} must be an integer, not {value!r}")
+
+
+def database_config(url: Optional[str] = None,
+                    environ: Mapping[str, str] = os.environ) -> Dict[str, Any]:
+    """``DATABASES['default']`` for ``url`` (default: ``DATABASE_URL``)"""
+    if url is None:
+        url = environ.get('DATABASE_URL')
+    if not url:
+        return {}
+    mode = environ.get('DB_POOL', 'persistent')
+    if mode not in MODES:
+        raise ImproperlyConfigured(
+            f"DB_POOL must be one of {', '.join(MODES)}, not {mode!r}"
+        )
+    config = dj_database_url.parse(
+        url,
+        conn_max_age=_int(environ, 'DB_CONN_MAX_AGE', 600),
+        # Checked before reuse rather than failing the first query after
+        # Postgres (or the network) dropped the connection. With a pool
+        # this turns on the pool's own check on checkout.
+        conn_health_checks=True,
+        ssl_require=environ.get('DB_SSL_REQUIRE', '1') == '1',
+    )
+    if config['ENGINE'] != 'django.db.backends.postgresql':
+        return config
+    config['ENGINE'] = POSTGRESQL_ENGINE
+    options = config.setdefault('OPTIONS', {})
+    if mode == 'psycopg':
+        # The pool owns connection lifetimes
+        config['CONN_MAX_AGE'] = 0
+        options['pool'] = {
+            'min_size': _int(environ, 'DB_POOL_MIN_SIZE', 1),
+            'max_size': _int(environ, 'DB_POOL_MAX_SIZE', 4),
+            'timeout': _int(environ, 'DB_POOL_TIMEOUT', 10),
+            'max_idle': _int(environ, 'DB_POOL_MAX_IDLE', 300),
+            'max_lifetime': _int(environ, 'DB_POOL_MAX_LIFETIME', 1800),
+        }
+    elif mode == 'pgbouncer':
+        config['CONN_MAX_AGE'] = _int(environ, 'DB_CONN_MAX_AGE', 0)
+        config['DISABLE_SERVER_SIDE_CURSORS'] = True
+        options['prepare_threshold'] = None
+    return config
+
+
+def replica_databases(
+    environ: Mapping[str, str] = os.environ,
+) -> Dict[str, Dict[str, Any]]:
+    """``DATABASES`` entries for each ``DATABASE_URL_<NAME>`` variable"""
+    databases = {}
+    for name, url in sorted(environ.items()):
+        if not name.startswith(REPLICA_URL_PREFIX) or not url:
+            continue
+        alias = REPLICA_PREFIX + name[len(REPLICA_URL_PREFIX):].lower()
+        config = database_config(url, environ)
+        # Tests read "replicas" through the primary's test database
+        config['TEST'] = {'MIRROR': 'default'}
+        databases[alias] = config
+    return databases
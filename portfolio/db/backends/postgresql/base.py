@@ -0,0 +1,13 @@
+from django.db.backends.postgresql import base
+
+from portfolio.instrumentation import timed
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """PostgreSQL backend that reports connection acquisition time"""
+
+    def get_new_connection(self, conn_params):
+        # With a pool this is the wait for a free connection; without one
+        # it is the TCP and TLS handshake.
+        with timed('db_connect'):
+            return super().get_new_connection(conn_params)
@@ -0,0 +1,147 @@
+"""Route reads of the public site to read replicas.
+
+``ReplicaMiddleware`` picks a replica for each GET/HEAD request to a
+``portfolio:`` URL (the homepage, fragments and API). ``ReplicaRouter``
+then sends that request's reads to it. Everything else, including every
+write and the whole admin, uses ``default``.
+
+* Read your writes: committing a content change pins public reads to the
+  primary for ``PORTFOLIO_REPLICA_PIN_SECONDS`` on every process (through
+  the shared cache). Editors see their change straight away, and a lagging
+  replica can't put old rows into caches keyed by the new content
+  version.
+* Failover: a replica is checked at most every
+  ``PORTFOLIO_REPLICA_CHECK_INTERVAL`` seconds per process. It is skipped
+  while it can't be reached, lags more than ``PORTFOLIO_REPLICA_MAX_LAG``
+  seconds (PostgreSQL), or has just failed a request. When no replica is
+  healthy, reads go to the primary.
+"""
+import contextvars
+import logging
+import random
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+from . import REPLICA_PREFIX
+
+logger = logging.getLogger(__name__)
+
+PIN_KEY = 'portfolio:replica-pin'
+
+# SQL returning the replay lag in seconds; 0 when fully caught up (an idle
+# primary replays nothing, so the last replay time alone would look stale)
+POSTGRESQL_LAG_SQL = """
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(
+            EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0
+        )
+    END
+"""
+
+_replica: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    'portfolio_replica', default=None
+)
+
+# alias -> (monotonic time of the check, healthy)
+_health: Dict[str, Tuple[float, bool]] = {}
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        # None falls through to the default database
+        return _replica.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get the schema through replication
+        return not db.startswith(REPLICA_PREFIX)
+
+
+def replica_aliases() -> List[str]:
+    return [
+        alias for alias in settings.DATABASES
+        if alias.startswith(REPLICA_PREFIX)
+    ]
+
+
+def current_replica() -> Optional[str]:
+    return _replica.get()
+
+
+@contextmanager
+def reading_from(alias: Optional[str]):
+    """Send reads inside the block to ``alias`` (None: the primary)"""
+    token = _replica.set(alias)
+    try:
+        yield
+    finally:
+        _replica.reset(token)
+
+
+def pin_seconds() -> int:
+    return getattr(settings, 'PORTFOLIO_REPLICA_PIN_SECONDS', 10)
+
+
+def pin_primary() -> None:
+    """Read public content from the primary for the next few seconds"""
+    if replica_aliases() and pin_seconds() > 0:
+        cache.set(PIN_KEY, True, pin_seconds())
+
+
+def primary_pinned() -> bool:
+    return bool(cache.get(PIN_KEY))
+
+
+def check_replica(alias: str) -> bool:
+    """Whether ``alias`` answers and isn't lagging too far behind"""
+    connection = connections[alias]
+    max_lag = getattr(settings, 'PORTFOLIO_REPLICA_MAX_LAG', 30)
+    try:
+        connection.ensure_connection()
+        if connection.vendor == 'postgresql' and max_lag is not None:
+            with connection.cursor() as cursor:
+                cursor.execute(POSTGRESQL_LAG_SQL)
+                lag = float(cursor.fetchone()[0])
+            if lag > max_lag:
+                logger.warning("Replica %s is %.1fs behind", alias, lag)
+                return False
+    except DatabaseError:
+        logger.warning("Replica %s is unreachable", alias, exc_info=True)
+        return False
+    return True
+
+
+def is_healthy(alias: str) -> bool:
+    interval = getattr(settings, 'PORTFOLIO_REPLICA_CHECK_INTERVAL', 5)
+    checked_at, healthy = _health.get(alias, (None, True))
+    if checked_at is not None and time.monotonic() - checked_at < interval:
+        return healthy
+    healthy = check_replica(alias)
+    _health[alias] = (time.monotonic(), healthy)
+    return healthy
+
+
+def mark_unhealthy(alias: str) -> None:
+    """Skip ``alias`` until its next check is due"""
+    _health[alias] = (time.monotonic(), False)
+
+
+def choose_replica() -> Optional[str]:
+    """A healthy replica for a public read, or None for the primary"""
+    aliases = replica_aliases()
+    if not aliases or primary_pinned():
+        return None
+    healthy = [alias for alias in aliases if is_healthy(alias)]
+    return random.choice(healthy) if healthy else None
@@ -0,0 +1,132 @@
+"""Streaming file downloads with Range, ETag and proxy offload support.
+
+Files are never read into memory: full downloads go through
+``FileResponse`` (and so ``wsgi.file_wrapper``/sendfile where the server
+provides it), partial downloads are streamed in fixed-size chunks, and the
+optional offload modes hand the transfer to the front proxy entirely.
+"""
+import mimetypes
+import os
+import re
+from typing import Iterator, Optional, Tuple
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date
+
+CHUNK_SIZE = 64 * 1024
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single-range ``Range`` header into inclusive byte offsets.
+
+    Returns None when the header should be ignored (malformed or
+    multi-range, which we answer with the full file) and raises
+    RangeNotSatisfiable when the range lies outside the file.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the final N bytes. An empty file has none.
+        length = int(last)
+        if length == 0 or size == 0:
+            raise RangeNotSatisfiable
+        return max(size - length, 0), size - 1
+    start = int(first)
+    if start >= size:
+        raise RangeNotSatisfiable
+    end = int(last) if last else size - 1
+    if start > end:
+        return None
+    return start, min(end, size - 1)
+
+
+def file_range_iterator(path: str, start: int, length: int) -> Iterator[bytes]:
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def file_etag(stat: os.stat_result) -> str:
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def serve_file(request, path: str, filename: Optional[str] = None,
+               media_url: Optional[str] = None) -> HttpResponse:
+    """Serve ``path`` as an attachment.
+
+    ``media_url`` is the file's URL below ``MEDIA_URL`` and is used by the
+    ``x-accel-redirect`` offload mode (see ``PORTFOLIO_SENDFILE``).
+    """
+    stat = os.stat(path)
+    filename = filename or os.path.basename(path)
+    etag = file_etag(stat)
+    last_modified = int(stat.st_mtime)
+
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if response is not None:
+        return response
+
+    content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    mode = getattr(settings, 'PORTFOLIO_SENDFILE', None)
+    range_header = request.headers.get('Range')
+    if_range = request.headers.get('If-Range')
+    if if_range and if_range not in (etag, http_date(last_modified)):
+        # The client's partial copy is of an older version: send it all.
+        range_header = None
+
+    if mode == 'x-accel-redirect' and media_url:
+        # nginx serves the bytes (and any Range) from an internal location.
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = (
+            getattr(settings, 'PORTFOLIO_SENDFILE_PREFIX', '/protected-media/')
+            + media_url.lstrip('/')
+        )
+    elif mode == 'x-sendfile':
+        # Apache (mod_xsendfile) and lighttpd read the file from disk.
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = path
+    elif range_header:
+        try:
+            byte_range = parse_range(range_header, stat.st_size)
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{stat.st_size}'
+            return response
+        if byte_range is None:
+            response = FileResponse(open(path, 'rb'), content_type=content_type)
+        else:
+            start, end = byte_range
+            length = end - start + 1
+            response = StreamingHttpResponse(
+                file_range_iterator(path, start, length),
+                status=206, content_type=content_type,
+            )
+            response['Content-Length'] = str(length)
+            response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+    else:
+        response = FileResponse(open(path, 'rb'), content_type=content_type)
+
+    response['Content-Disposition'] = content_disposition_header(True, filename)
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    return response
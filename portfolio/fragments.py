@@ -0,0 +1,64 @@
+"""Below-the-fold sections of the portfolio page as separate fragments.
+
+With ``PORTFOLIO_LAZY_SECTIONS`` enabled the homepage renders only the
+hero and about sections. Every other section is a placeholder that
+``main.js`` swaps for ``/fragments/<section>/`` once it nears the
+viewport. Each fragment is cached on its own under the content version.
+Without JavaScript, the placeholder links to ``/?full=1``, which renders
+the whole page as before.
+"""
+from typing import List, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.template.loader import render_to_string
+
+from . import queries
+from .cache import (
+    aget_content_version, aget_or_build, get_content_version, get_or_build,
+    page_cache_timeout, versioned_key,
+)
+
+# (section, heading) of the sections loaded lazily, in page order
+LAZY_SECTIONS: List[Tuple[str, str]] = [
+    ('experience', 'Experience'),
+    ('skills', 'Skills'),
+    ('projects', 'Featured Projects'),
+    ('resume', 'Resume'),
+]
+
+SECTIONS = {name for name, _ in LAZY_SECTIONS}
+
+
+def lazy_sections_enabled(request) -> bool:
+    """Whether ``request`` gets the homepage with deferred sections"""
+    return (
+        getattr(settings, 'PORTFOLIO_LAZY_SECTIONS', False)
+        and not request.GET.get('full')
+    )
+
+
+def render_fragment(section: str) -> str:
+    return render_to_string(
+        f'portfolio/sections/{section}.html', queries.section_context(section)
+    )
+
+
+def _fragment_key(section: str, version: int) -> str:
+    return versioned_key('fragment', section, version=version)
+
+
+def get_fragment(section: str) -> str:
+    """Rendered HTML of ``section``, cached per content version"""
+    return get_or_build(
+        _fragment_key(section, get_content_version()),
+        lambda: render_fragment(section), page_cache_timeout(),
+    )
+
+
+async def aget_fragment(section: str) -> str:
+    """Async ``get_fragment``"""
+    return await aget_or_build(
+        _fragment_key(section, await aget_content_version()),
+        lambda: sync_to_async(render_fragment)(section), page_cache_timeout(),
+    )
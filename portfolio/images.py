@@ -0,0 +1,124 @@
+"""Responsive image derivatives for uploaded portfolio images.
+
+For each source image we write resized AVIF/WebP/JPEG variants at several
+widths under a content-hashed directory (so they can be cached forever)
+and a tiny blurred placeholder inlined as a data URI. The resulting
+manifest is stored on the model and rendered by the ``responsive_image``
+template tag.
+"""
+import base64
+import hashlib
+import io
+from typing import Any, Dict, List, Tuple
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from PIL import Image, ImageFilter, ImageOps, features
+
+# (format, extension, mime type, save options), best compression first.
+FORMATS: List[Tuple[str, str, str, Dict[str, Any]]] = [
+    ('AVIF', 'avif', 'image/avif', {'quality': 50}),
+    ('WEBP', 'webp', 'image/webp', {'quality': 75, 'method': 6}),
+    ('JPEG', 'jpg', 'image/jpeg', {'quality': 80, 'optimize': True,
+                                   'progressive': True}),
+]
+
+PLACEHOLDER_WIDTH = 16
+
+
+def derivative_widths(source_width: int) -> List[int]:
+    """Target widths for a source image, never upscaling"""
+    widths = getattr(settings, 'PORTFOLIO_IMAGE_WIDTHS', (320, 640, 960, 1280))
+    return sorted({w for w in widths if w < source_width} | {source_width})
+
+
+def _available_formats():
+    for fmt in FORMATS:
+        if fmt[0] == 'AVIF' and not features.check('avif'):
+            continue
+        yield fmt
+
+
+def _encode(image: Image.Image, fmt: str, options: Dict[str, Any]) -> bytes:
+    if fmt == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    buffer = io.BytesIO()
+    image.save(buffer, fmt, **options)
+    return buffer.getvalue()
+
+
+def placeholder_data_uri(image: Image.Image) -> str:
+    """A blurred ~16px JPEG, small enough to inline in the page"""
+    thumb = image.convert('RGB')
+    thumb.thumbnail((PLACEHOLDER_WIDTH, PLACEHOLDER_WIDTH))
+    thumb = thumb.filter(ImageFilter.GaussianBlur(1))
+    data = _encode(thumb, 'JPEG', {'quality': 40})
+    return 'data:image/jpeg;base64,' + base64.b64encode(data).decode()
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def generate_derivatives(field_file, storage=default_storage) -> Dict[str, Any]:
+    """Write the derivatives of ``field_file`` and return their manifest"""
+    field_file.open('rb')
+    try:
+        data = field_file.read()
+    finally:
+        field_file.close()
+    digest = content_hash(data)
+
+    image = ImageOps.exif_transpose(Image.open(io.BytesIO(data)))
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+    width, height = image.size
+
+    sources: Dict[str, List[Tuple[str, int]]] = {}
+    for target in derivative_widths(width):
+        resized = image if target == width else image.resize(
+            (target, max(1, round(height * target / width))),
+            Image.Resampling.LANCZOS,
+        )
+        for fmt, ext, mime, options in _available_formats():
+            name = f'derivatives/{digest}/{target}.{ext}'
+            if not storage.exists(name):
+                storage.save(name, ContentFile(_encode(resized, fmt, options)))
+            sources.setdefault(mime, []).append((name, target))
+
+    return {
+        'source': field_file.name,
+        'width': width,
+        'height': height,
+        'placeholder': placeholder_data_uri(image),
+        'sources': sources,
+    }
+
+
+def update_derivatives(instance, field_name: str, variants_field: str,
+                       force: bool = False) -> bool:
+    """Regenerate the manifest on ``instance`` if its image changed.
+
+    Saves with ``update()`` so the content signals don't fire again, but
+    bumps ``updated_at``: the page now renders differently, and the
+    conditional-GET validators are derived from it.
+    """
+    field_file = getattr(instance, field_name)
+    variants = getattr(instance, variants_field) or {}
+    if field_file:
+        if not force and variants.get('source') == field_file.name:
+            return False
+        variants = generate_derivatives(field_file)
+    elif variants:
+        # Image cleared: drop the stale manifest.
+        variants = {}
+    else:
+        return False
+    setattr(instance, variants_field, variants)
+    instance.updated_at = timezone.now()
+    type(instance)._default_manager.filter(pk=instance.pk).update(
+        updated_at=instance.updated_at, **{variants_field: variants}
+    )
+    return True
@@ -0,0 +1,100 @@
+"""Per-request performance metrics.
+
+``PerformanceMiddleware`` opens a ``RequestMetrics`` for every request. It
+records database queries, template rendering (through
+``InstrumentedDjangoTemplates``) and portfolio cache lookups (through
+``record_cache``). At the end of the request the metrics are emitted as a
+``Server-Timing`` header and as a JSON line on the ``portfolio.requests``
+logger.
+"""
+import contextvars
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+from django.template.backends.django import DjangoTemplates
+
+_current: contextvars.ContextVar[Optional['RequestMetrics']] = (
+    contextvars.ContextVar('portfolio_request_metrics', default=None)
+)
+
+
+@dataclass
+class RequestMetrics:
+    db_queries: int = 0
+    db_ms: float = 0.0
+    template_ms: float = 0.0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    timings: Dict[str, float] = field(default_factory=dict)
+
+
+def current_metrics() -> Optional[RequestMetrics]:
+    return _current.get()
+
+
+def start_request() -> Tuple[RequestMetrics, contextvars.Token]:
+    metrics = RequestMetrics()
+    return metrics, _current.set(metrics)
+
+
+def end_request(token: contextvars.Token) -> None:
+    _current.reset(token)
+
+
+def record_cache(hit: bool) -> None:
+    """Count a portfolio cache lookup against the current request"""
+    metrics = _current.get()
+    if metrics is None:
+        return
+    if hit:
+        metrics.cache_hits += 1
+    else:
+        metrics.cache_misses += 1
+
+
+@contextmanager
+def timed(name: str):
+    """Add the wall time of the block to ``timings[name]``"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics = _current.get()
+        if metrics is not None:
+            elapsed = (time.perf_counter() - started) * 1000
+            metrics.timings[name] = metrics.timings.get(name, 0.0) + elapsed
+
+
+class InstrumentedTemplate:
+    """Proxy for a backend template that times ``render()``"""
+
+    def __init__(self, template):
+        self.template = template
+
+    def __getattr__(self, name):
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None):
+        started = time.perf_counter()
+        try:
+            return self.template.render(context, request)
+        finally:
+            metrics = _current.get()
+            if metrics is not None:
+                metrics.template_ms += (time.perf_counter() - started) * 1000
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """DjangoTemplates backend that reports render time to RequestMetrics.
+
+    Only top-level renders are timed; includes and extends render inside
+    them and are not counted twice.
+    """
+
+    def from_string(self, template_code):
+        return InstrumentedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return InstrumentedTemplate(super().get_template(template_name))
@@ -0,0 +1,294 @@
+"""Background jobs for derived-data work.
+
+With ``PORTFOLIO_BACKGROUND_JOBS`` enabled, expensive work that follows a
+content change is queued instead of running in the admin request that
+saved the content. That covers rebuilding the API snapshots and
+generating image derivatives. ``manage.py run_jobs`` runs the queued work
+in a separate, lower-priority process.
+
+* Every job is a ``Job`` row. The rows are the queue, and the admin shows
+  their status, attempts and last error.
+* With ``PORTFOLIO_JOB_REDIS_URL`` set, due job ids are also kept in a
+  Redis sorted set. Workers poll Redis instead of the database, and sweep
+  the table every ``PORTFOLIO_JOB_SWEEP_SECONDS`` for anything Redis lost.
+* Deduplication: jobs with the same ``key`` do the same work. While one
+  is queued, ``enqueue`` merges further requests into it. A
+  ``PORTFOLIO_JOB_COALESCE_SECONDS`` delay lets a burst of saves end up
+  as one rebuild.
+* Retries: a failing job is queued again after
+  ``PORTFOLIO_JOB_RETRY_BACKOFF * 2 ** (attempt - 1)`` seconds, capped at
+  ``PORTFOLIO_JOB_RETRY_MAX_BACKOFF``. It is marked failed after
+  ``max_attempts`` attempts. Jobs running longer than
+  ``PORTFOLIO_JOB_TIMEOUT`` are treated as failed attempts, such as a
+  worker that died.
+* A job is claimed with a conditional ``UPDATE``, so several workers never
+  run the same job.
+"""
+import datetime
+import functools
+import logging
+import os
+import socket
+import time
+import traceback
+from typing import Callable, Dict, Iterator, Optional
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - optional dependency
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+TASKS: Dict[str, Callable[..., None]] = {}
+
+
+def task(name: str):
+    """Register the decorated function as the job task ``name``"""
+    def decorator(func):
+        TASKS[name] = func
+        return func
+    return decorator
+
+
+def jobs_enabled() -> bool:
+    return getattr(settings, 'PORTFOLIO_BACKGROUND_JOBS', False)
+
+
+def coalesce_seconds() -> float:
+    return getattr(settings, 'PORTFOLIO_JOB_COALESCE_SECONDS', 2)
+
+
+def backoff(attempts: int) -> float:
+    """Seconds to wait before retrying after ``attempts`` failed attempts"""
+    base = getattr(settings, 'PORTFOLIO_JOB_RETRY_BACKOFF', 10)
+    cap = getattr(settings, 'PORTFOLIO_JOB_RETRY_MAX_BACKOFF', 60 * 60)
+    return min(base * 2 ** (attempts - 1), cap)
+
+
+class DatabaseQueue:
+    """Due jobs straight from the ``Job`` table"""
+
+    def push(self, job: Job) -> None:
+        pass  # The row is the queue entry
+
+    def due_ids(self, limit: int = 10) -> Iterator[int]:
+        yield from Job.objects.filter(
+            status=Job.STATUS_QUEUED, run_at__lte=timezone.now(),
+        ).order_by('run_at', 'id').values_list('pk', flat=True)[:limit]
+
+
+class RedisQueue:
+    """Job ids in a Redis sorted set scored by when they are due"""
+
+    KEY = 'portfolio:jobs'
+
+    def __init__(self, client):
+        self.client = client
+
+    def push(self, job: Job) -> None:
+        self.client.zadd(self.KEY, {str(job.pk): job.run_at.timestamp()})
+
+    def due_ids(self, limit: int = 10) -> Iterator[int]:
+        due = self.client.zrangebyscore(
+            self.KEY, '-inf', time.time(), start=0, num=limit,
+        )
+        for job_id in due:
+            # Whoever removes the id owns it
+            if self.client.zrem(self.KEY, job_id):
+                yield int(job_id)
+
+
+@functools.lru_cache(maxsize=None)
+def _redis_queue(url: str) -> RedisQueue:
+    return RedisQueue(redis.Redis.from_url(url))
+
+
+def get_queue():
+    url = getattr(settings, 'PORTFOLIO_JOB_REDIS_URL', None)
+    if url and redis is not None:
+        return _redis_queue(url)
+    return DatabaseQueue()
+
+
+def _push_on_commit(job: Job) -> None:
+    # The worker can't see the row before the enqueuing transaction commits
+    transaction.on_commit(lambda: get_queue().push(job))
+
+
+def enqueue(task_name: str, *args, key: str = '', delay: float = 0,
+            max_attempts: Optional[int] = None) -> Optional[Job]:
+    """Queue ``task_name(*args)``.
+
+    Returns the new job, or None when the request was merged into a
+    queued job with the same ``key``.
+    """
+    if task_name not in TASKS:
+        raise KeyError(f"Unknown job task {task_name!r}")
+    if max_attempts is None:
+        max_attempts = getattr(settings, 'PORTFOLIO_JOB_MAX_ATTEMPTS', 5)
+    while True:
+        if key and Job.objects.filter(
+            key=key, status=Job.STATUS_QUEUED,
+        ).update(coalesced=F('coalesced') + 1):
+            return None
+        try:
+            with transaction.atomic():
+                job = Job.objects.create(
+                    task=task_name, args=list(args), key=key,
+                    run_at=timezone.now() + datetime.timedelta(seconds=delay),
+                    max_attempts=max_attempts,
+                )
+        except IntegrityError:
+            continue  # Another process queued it first; merge into that
+        _push_on_commit(job)
+        return job
+
+
+def claim(job_id: int) -> Optional[Job]:
+    """Mark a due job as running; None if it isn't due or someone has it"""
+    now = timezone.now()
+    claimed = Job.objects.filter(
+        pk=job_id, status=Job.STATUS_QUEUED, run_at__lte=now,
+    ).update(
+        status=Job.STATUS_RUNNING, started_at=now, finished_at=None,
+        attempts=F('attempts') + 1,
+    )
+    return Job.objects.get(pk=job_id) if claimed else None
+
+
+def _finish(job: Job, status: str, error: str = '') -> None:
+    Job.objects.filter(pk=job.pk).update(
+        status=status, finished_at=timezone.now(), last_error=error,
+    )
+
+
+def retry_or_fail(job: Job, error: str) -> None:
+    """Queue ``job`` again after its backoff, or fail it for good"""
+    if job.attempts >= job.max_attempts:
+        _finish(job, Job.STATUS_FAILED, error)
+        return
+    job.run_at = timezone.now() + datetime.timedelta(
+        seconds=backoff(job.attempts)
+    )
+    try:
+        with transaction.atomic():
+            Job.objects.filter(pk=job.pk).update(
+                status=Job.STATUS_QUEUED, run_at=job.run_at, last_error=error,
+            )
+    except IntegrityError:
+        # A newer job with the same key is queued and will do this work
+        _finish(job, Job.STATUS_FAILED, error)
+        return
+    _push_on_commit(job)
+
+
+def requeue(job: Job) -> bool:
+    """Queue a finished job to run again now with fresh attempts.
+
+    False when it is running, or when a job with its key is already
+    queued.
+    """
+    job.run_at = timezone.now()
+    try:
+        with transaction.atomic():
+            requeued = Job.objects.filter(pk=job.pk).exclude(
+                status__in=[Job.STATUS_QUEUED, Job.STATUS_RUNNING],
+            ).update(
+                status=Job.STATUS_QUEUED, run_at=job.run_at, attempts=0,
+                started_at=None, finished_at=None,
+            )
+    except IntegrityError:
+        return False
+    if requeued:
+        _push_on_commit(job)
+    return bool(requeued)
+
+
+def run_job(job: Job) -> bool:
+    """Run a claimed job; returns whether it succeeded"""
+    try:
+        TASKS[job.task](*job.args)
+    except Exception:
+        logger.exception("Job %s (%s) failed", job.pk, job.task)
+        retry_or_fail(job, traceback.format_exc())
+        return False
+    _finish(job, Job.STATUS_SUCCEEDED)
+    return True
+
+
+def requeue_stale() -> int:
+    """Retry or fail jobs whose worker stopped without finishing them"""
+    timeout = getattr(settings, 'PORTFOLIO_JOB_TIMEOUT', 10 * 60)
+    cutoff = timezone.now() - datetime.timedelta(seconds=timeout)
+    stale = Job.objects.filter(
+        status=Job.STATUS_RUNNING, started_at__lt=cutoff,
+    )
+    for job in stale:
+        retry_or_fail(job, f"Still running after {timeout}s; worker lost")
+    return len(stale)
+
+
+def prune_finished() -> int:
+    """Delete succeeded jobs older than ``PORTFOLIO_JOB_KEEP_SECONDS``"""
+    keep = getattr(settings, 'PORTFOLIO_JOB_KEEP_SECONDS', 7 * 24 * 60 * 60)
+    deleted, _ = Job.objects.filter(
+        status=Job.STATUS_SUCCEEDED,
+        finished_at__lt=timezone.now() - datetime.timedelta(seconds=keep),
+    ).delete()
+    return deleted
+
+
+class Worker:
+    """Claims and runs due jobs one at a time"""
+
+    def __init__(self, queue=None):
+        self.queue = queue or get_queue()
+        self.name = f'{socket.gethostname()}:{os.getpid()}'
+        self.swept_at = None
+
+    def candidates(self) -> Iterator[int]:
+        yield from self.queue.due_ids()
+        sweep = getattr(settings, 'PORTFOLIO_JOB_SWEEP_SECONDS', 30)
+        if self.swept_at is None or time.monotonic() - self.swept_at >= sweep:
+            self.swept_at = time.monotonic()
+            requeue_stale()
+            prune_finished()
+            if not isinstance(self.queue, DatabaseQueue):
+                yield from DatabaseQueue().due_ids()
+
+    def run_once(self) -> Optional[Job]:
+        """Run the next due job, if any, and return it"""
+        close_old_connections()
+        try:
+            for job_id in self.candidates():
+                job = claim(job_id)
+                if job is not None:
+                    logger.info(
+                        "%s running job %s (%s)", self.name, job.pk, job.task
+                    )
+                    run_job(job)
+                    return job
+            return None
+        finally:
+            close_old_connections()
+
+    def run(self, burst: bool = False, sleep: float = 1.0,
+            max_jobs: Optional[int] = None) -> int:
+        """Run jobs until stopped (or, with ``burst``, none are due)"""
+        done = 0
+        while max_jobs is None or done < max_jobs:
+            if self.run_once() is not None:
+                done += 1
+            elif burst:
+                break
+            else:
+                time.sleep(sleep)
+        return done
@@ -0,0 +1,284 @@
+"""Load tests of the deployment profiles, entirely on localhost.
+
+Used by the ``loadtest`` management command. For each combination of
+profile (worker class), cache mode and database, it does the following:
+
+* prepare the database: a seeded SQLite file in a temporary directory, or
+  a local PostgreSQL database given by URL (migrated, and seeded with
+  ``seed_portfolio`` when empty);
+* start gunicorn with ``gunicorn.conf.py`` on a free port;
+* drive a scripted traffic mix from ``concurrency`` client threads, each
+  with a seeded random generator, so the same options replay the same
+  request sequence;
+* record throughput, latency percentiles and errors, then the resident
+  and peak memory of every worker (from ``/proc``, Linux only).
+
+The client runs on the same machine as the server. Compare profiles
+against each other rather than reading the numbers as production
+capacity.
+"""
+import http.client
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+from .benchmarks import percentile, route_url
+
+
+@dataclass(frozen=True)
+class Profile:
+    name: str
+    application: str
+    gunicorn_args: Tuple[str, ...] = ()
+    env: Tuple[Tuple[str, str], ...] = ()
+
+
+PROFILES: Dict[str, Profile] = {
+    profile.name: profile for profile in (
+        Profile('sync', 'Ranjith_Portfolio.wsgi:application'),
+        Profile('gthread', 'Ranjith_Portfolio.wsgi:application',
+                ('--worker-class', 'gthread')),
+        Profile('uvicorn', 'Ranjith_Portfolio.asgi:application',
+                ('--worker-class', 'uvicorn_worker.UvicornWorker'),
+                (('PORTFOLIO_ASYNC_VIEWS', '1'),)),
+    )
+}
+
+# Route name -> relative weight
+MIXES: Dict[str, Dict[str, int]] = {
+    # A visitor: mostly the homepage, some API calls, the odd resume
+    'browse': {
+        'portfolio:home': 60,
+        'portfolio:api_portfolio': 10,
+        'portfolio:api_projects': 10,
+        'portfolio:api_skills': 5,
+        'portfolio:api_search': 5,
+        'portfolio:download_resume': 10,
+    },
+    'api': {
+        'portfolio:api_portfolio': 25,
+        'portfolio:api_personal_info': 10,
+        'portfolio:api_experiences': 15,
+        'portfolio:api_skills': 15,
+        'portfolio:api_projects': 15,
+        'portfolio:api_technologies': 10,
+        'portfolio:api_search': 10,
+    },
+    'resume': {
+        'portfolio:download_resume': 100,
+    },
+}
+
+# Run in a fresh interpreter against the target database
+SEED = r'''
+import os
+import django
+django.setup()
+from django.core.files.base import ContentFile
+from portfolio.benchmarks import seed_portfolio
+from portfolio.models import PersonalInfo
+if not PersonalInfo.objects.exists():
+    seed_portfolio()
+    PersonalInfo.objects.get().resume_file.save(
+        'resume.pdf', ContentFile(os.urandom(256 * 1024)), save=True,
+    )
+'''
+
+
+def mix_urls(mix: str) -> List[Tuple[str, int]]:
+    return [(route_url(route), weight) for route, weight in MIXES[mix].items()]
+
+
+@dataclass
+class LoadResult:
+    duration: float
+    latencies_ms: List[float] = field(default_factory=list)
+    # Status code, or 0 for a connection error or timeout
+    statuses: Counter = field(default_factory=Counter)
+
+    @property
+    def requests(self) -> int:
+        return sum(self.statuses.values())
+
+    @property
+    def errors(self) -> int:
+        return sum(
+            count for status, count in self.statuses.items()
+            if status == 0 or status >= 400
+        )
+
+    def summary(self) -> Dict[str, float]:
+        latencies = self.latencies_ms or [0.0]
+        return {
+            'requests': self.requests,
+            'throughput': self.requests / self.duration,
+            'p50_ms': percentile(latencies, 50),
+            'p90_ms': percentile(latencies, 90),
+            'p99_ms': percentile(latencies, 99),
+            'max_ms': max(latencies),
+            'error_rate': self.errors / self.requests if self.requests else 0.0,
+        }
+
+
+def _client(host: str, port: int, urls: Sequence[Tuple[str, int]],
+            headers: Mapping[str, str], rng: random.Random,
+            measure_from: float, until: float, result: LoadResult,
+            lock: threading.Lock) -> None:
+    paths = [url for url, _ in urls]
+    weights = [weight for _, weight in urls]
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    connection = http.client.HTTPConnection(host, port, timeout=30)
+    try:
+        while True:
+            path = rng.choices(paths, weights)[0]
+            started = time.perf_counter()
+            if started >= until:
+                break
+            try:
+                connection.request('GET', path, headers=dict(headers))
+                response = connection.getresponse()
+                response.read()
+                status = response.status
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                status = 0
+            if started >= measure_from:
+                latencies.append((time.perf_counter() - started) * 1000)
+                statuses[status] += 1
+    finally:
+        connection.close()
+    with lock:
+        result.latencies_ms.extend(latencies)
+        result.statuses.update(statuses)
+
+
+def run_load(host: str, port: int, urls: Sequence[Tuple[str, int]],
+             concurrency: int, duration: float, warmup: float = 0,
+             seed: int = 0,
+             headers: Optional[Mapping[str, str]] = None) -> LoadResult:
+    """Closed-loop load: each client sends its next request on a response.
+
+    Requests started during the first ``warmup`` seconds aren't counted.
+    """
+    started = time.perf_counter()
+    measure_from = started + warmup
+    until = measure_from + duration
+    result = LoadResult(duration=duration)
+    lock = threading.Lock()
+    clients = [
+        threading.Thread(target=_client, args=(
+            host, port, urls, headers or {}, random.Random(seed + index),
+            measure_from, until, result, lock,
+        ))
+        for index in range(concurrency)
+    ]
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    return result
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def server_command(profile: Profile, port: int, workers: int,
+                   threads: int) -> List[str]:
+    command = [
+        'gunicorn', '-c', 'gunicorn.conf.py', '--workers', str(workers),
+        '--bind', f'127.0.0.1:{port}', *profile.gunicorn_args,
+    ]
+    if profile.name == 'gthread':
+        command += ['--threads', str(threads)]
+    return [*command, profile.application]
+
+
+def wait_for_server(port: int, server: subprocess.Popen, host: str,
+                    timeout: float = 60) -> None:
+    """Wait until the application answers a request (any status counts)"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError("gunicorn exited during startup")
+        connection = http.client.HTTPConnection(
+            '127.0.0.1', port, timeout=timeout
+        )
+        try:
+            connection.request('GET', '/', headers={'Host': host})
+            connection.getresponse().read()
+            return
+        except (OSError, http.client.HTTPException):
+            time.sleep(0.05)
+        finally:
+            connection.close()
+    raise RuntimeError(f"gunicorn didn't answer within {timeout:.0f}s")
+
+
+def database_label(url: str) -> str:
+    return urllib.parse.urlparse(url).scheme.split('+')[0]
+
+
+def prepare_database(env: Mapping[str, str], cwd) -> None:
+    """Migrate the database in ``env`` and seed it if it has no content"""
+    for args in (['manage.py', 'migrate', '--noinput', '-v', '0'],
+                 ['-c', SEED]):
+        completed = subprocess.run(
+            [sys.executable, *args], env=dict(env), cwd=cwd,
+            capture_output=True, text=True,
+        )
+        if completed.returncode:
+            raise RuntimeError(completed.stderr.strip())
+
+
+def _proc_status(pid: int) -> Dict[str, int]:
+    """The ``kB`` fields of ``/proc/<pid>/status``"""
+    fields = {}
+    try:
+        lines = Path(f'/proc/{pid}/status').read_text().splitlines()
+    except OSError:
+        return fields
+    for line in lines:
+        name, _, value = line.partition(':')
+        if value.strip().endswith(' kB'):
+            fields[name] = int(value.split()[0])
+    return fields
+
+
+def child_pids(pid: int) -> List[int]:
+    children = []
+    for entry in Path('/proc').glob('[0-9]*/stat'):
+        try:
+            stat = entry.read_text()
+        except OSError:
+            continue
+        # The command name may contain spaces; fields follow its ")"
+        parent = int(stat.rpartition(')')[2].split()[1])
+        if parent == pid:
+            children.append(int(entry.parent.name))
+    return sorted(children)
+
+
+def worker_memory(master_pid: int) -> List[Dict[str, float]]:
+    """Resident and peak resident memory (MiB) of each gunicorn worker"""
+    workers = []
+    for pid in child_pids(master_pid):
+        status = _proc_status(pid)
+        if 'VmRSS' in status:
+            workers.append({
+                'pid': pid,
+                'rss_mb': status['VmRSS'] / 1024,
+                'peak_rss_mb': status.get('VmHWM', status['VmRSS']) / 1024,
+            })
+    return workers
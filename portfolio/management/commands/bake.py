@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from portfolio.bake import bake
+
+
+class Command(BaseCommand):
+    help = (
+        "Export the homepage, API payloads, static files and media to a "
+        "directory that can be served without Python"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output', default=getattr(settings, 'PORTFOLIO_BAKE_DIR', 'baked'),
+            help="Output directory (default: PORTFOLIO_BAKE_DIR)",
+        )
+        parser.add_argument(
+            '--base-url', default='https://localhost',
+            help="Public URL of the site, used for absolute links "
+                 "(default: https://localhost)",
+        )
+        parser.add_argument(
+            '--force', action='store_true',
+            help="Rewrite every output instead of only changed ones",
+        )
+
+    def handle(self, *args, **options):
+        report = bake(
+            options['output'], base_url=options['base_url'],
+            force=options['force'],
+        )
+        for relpath in report.written:
+            self.stdout.write(f"wrote {relpath}")
+        if report.failed:
+            raise CommandError("Not exported: " + ', '.join(
+                f"{url} ({status})" for url, status in report.failed
+            ))
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(report.written)} written, {report.skipped} unchanged"
+        ))
@@ -0,0 +1,219 @@
+import json
+import os
+import re
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from portfolio.startup import local_host
+
+# Run in a fresh interpreter: times each startup phase up to the end of
+# the first response, which goes through the real WSGI handler.
+CHILD = r'''
+import json, sys, time
+marks = [('start', time.perf_counter())]
+import django
+django.setup()
+marks.append(('setup', time.perf_counter()))
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+marks.append(('application', time.perf_counter()))
+if sys.argv[1] == 'warm':
+    from portfolio.startup import warm
+    warm()
+marks.append(('warm', time.perf_counter()))
+from wsgiref.util import setup_testing_defaults
+from django.conf import settings
+from portfolio.startup import local_host
+environ = {'HTTP_HOST': local_host(), 'PATH_INFO': '/'}
+if getattr(settings, 'SECURE_SSL_REDIRECT', False):
+    environ['wsgi.url_scheme'] = 'https'
+setup_testing_defaults(environ)
+statuses = []
+body = b''.join(application(environ, lambda s, h, e=None: statuses.append(s)))
+marks.append(('first_response', time.perf_counter()))
+phases = {
+    name: (at - marks[i][1]) * 1000 for i, (name, at) in enumerate(marks[1:])
+}
+print(json.dumps({'status': statuses[0], 'bytes': len(body), **phases}))
+'''
+
+PHASES = ['interpreter', 'setup', 'application', 'warm', 'first_response']
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure cold start: import/setup time and time to first response "
+        "of a fresh process, with and without the warm-up"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5)
+        parser.add_argument(
+            '--server', action='store_true',
+            help="Also time gunicorn from launch to its first response",
+        )
+        parser.add_argument(
+            '--imports', type=int, default=0, metavar='N',
+            help="List the N slowest top-level imports (python -X importtime)",
+        )
+        parser.add_argument(
+            '--budget-ms', type=float,
+            default=getattr(settings, 'PORTFOLIO_COLD_START_BUDGET_MS', None),
+            help="Fail when the median time to first response of the warmed "
+                 "process (or gunicorn, with --server) exceeds this "
+                 "(default: PORTFOLIO_COLD_START_BUDGET_MS)",
+        )
+        parser.add_argument(
+            '--json', action='store_true', help="Print results as JSON",
+        )
+
+    def handle(self, *args, **options):
+        results = {
+            mode: self.measure(mode, options['runs'])
+            for mode in ('plain', 'warm')
+        }
+        if options['server']:
+            results['gunicorn'] = self.measure_server(options['runs'])
+        imports = self.slowest_imports(options['imports'])
+
+        if options['json']:
+            self.stdout.write(json.dumps(
+                {'results': results, 'imports': imports}, indent=2
+            ))
+        else:
+            self.report(results, imports)
+
+        # The budget applies to the deployed setup: preloaded and warmed
+        budget = options['budget_ms']
+        total = results.get('gunicorn', results['warm'])['total']
+        if budget and total > budget:
+            raise CommandError(
+                f"Time to first response {total:.0f}ms exceeds the "
+                f"{budget:.0f}ms budget"
+            )
+
+    def child_env(self):
+        env = dict(os.environ)
+        env.setdefault('DJANGO_SETTINGS_MODULE', settings.SETTINGS_MODULE)
+        # The child decides about warming itself
+        env.pop('PORTFOLIO_WARM_START', None)
+        return env
+
+    def measure(self, mode, runs):
+        samples = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            completed = subprocess.run(
+                [sys.executable, '-c', CHILD, mode], capture_output=True,
+                text=True, env=self.child_env(), cwd=settings.BASE_DIR,
+            )
+            wall = (time.perf_counter() - started) * 1000
+            if completed.returncode:
+                raise CommandError(completed.stderr.strip())
+            sample = json.loads(completed.stdout.strip().splitlines()[-1])
+            # Whatever the child didn't time itself: interpreter startup
+            sample['interpreter'] = wall - sum(
+                sample[phase] for phase in PHASES[1:]
+            )
+            sample['total'] = wall
+            samples.append(sample)
+        result = {
+            key: statistics.median(sample[key] for sample in samples)
+            for key in [*PHASES, 'total']
+        }
+        result['status'] = samples[-1]['status']
+        return result
+
+    def measure_server(self, runs):
+        if not shutil.which('gunicorn'):
+            raise CommandError("gunicorn isn't installed")
+        totals = []
+        for _ in range(runs):
+            port = _free_port()
+            started = time.perf_counter()
+            server = subprocess.Popen(
+                ['gunicorn', '-c', 'gunicorn.conf.py', '--workers', '1',
+                 '--bind', f'127.0.0.1:{port}',
+                 'Ranjith_Portfolio.wsgi:application'],
+                env={**self.child_env(), 'PORTFOLIO_WARM_START': '1'},
+                cwd=settings.BASE_DIR, stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            try:
+                totals.append(self.first_response(port, started, server))
+            finally:
+                server.terminate()
+                server.wait()
+        return {'total': statistics.median(totals)}
+
+    def first_response(self, port, started, server, timeout=60):
+        request = urllib.request.Request(
+            f'http://127.0.0.1:{port}/',
+            headers={'Host': local_host()},
+        )
+        while time.perf_counter() - started < timeout:
+            if server.poll() is not None:
+                raise CommandError("gunicorn exited during startup")
+            try:
+                with urllib.request.urlopen(request, timeout=timeout) as resp:
+                    resp.read()
+            except urllib.error.HTTPError:
+                pass  # Any HTTP response counts: the app answered
+            except OSError:
+                time.sleep(0.01)
+                continue
+            return (time.perf_counter() - started) * 1000
+        raise CommandError("gunicorn didn't answer within a minute")
+
+    def slowest_imports(self, count):
+        if not count:
+            return []
+        completed = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', CHILD, 'plain'],
+            capture_output=True, text=True, env=self.child_env(),
+            cwd=settings.BASE_DIR,
+        )
+        # "import time: self [us] | cumulative | imported package", with
+        # nested imports indented under their parent
+        top_level = []
+        for line in completed.stderr.splitlines():
+            match = re.match(r'import time:\s+\d+ \|\s+(\d+) \| (\S.*)', line)
+            if match:
+                top_level.append((int(match.group(1)) / 1000, match.group(2)))
+        top_level.sort(reverse=True)
+        return [
+            {'module': name, 'cumulative_ms': ms}
+            for ms, name in top_level[:count]
+        ]
+
+    def report(self, results, imports):
+        header = f"{'mode':<10}" + ''.join(
+            f"{name:>16}" for name in [*PHASES, 'total']
+        )
+        self.stdout.write(header)
+        for mode, result in results.items():
+            self.stdout.write(f"{mode:<10}" + ''.join(
+                f"{result[name]:>16.1f}" if name in result else f"{'':>16}"
+                for name in [*PHASES, 'total']
+            ))
+        if imports:
+            self.stdout.write("\nslowest imports (cumulative ms)")
+            for entry in imports:
+                self.stdout.write(
+                    f"{entry['cumulative_ms']:>10.1f}  {entry['module']}"
+                )
@@ -0,0 +1,103 @@
+import json
+import os
+import shutil
+import tempfile
+from dataclasses import asdict
+
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import (
+    override_settings, setup_test_environment, teardown_test_environment,
+)
+
+from portfolio.benchmarks import QUERY_BUDGETS, benchmark_route, seed_portfolio
+from portfolio.models import PersonalInfo
+
+
+BENCHMARK_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'portfolio-benchmark',
+    },
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway test database and report query count, latency "
+        "percentiles and response size for every public route"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--experiences', type=int, default=40)
+        parser.add_argument('--categories', type=int, default=30)
+        parser.add_argument('--skills-per-category', type=int, default=10)
+        parser.add_argument('--projects', type=int, default=300)
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument(
+            '--json', action='store_true', help="Print results as JSON",
+        )
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0)
+        media_root = tempfile.mkdtemp()
+        try:
+            # The benchmark clears the cache between runs; never the
+            # configured one, which may be the site's shared Redis
+            with override_settings(
+                MEDIA_ROOT=media_root, CACHES=BENCHMARK_CACHES,
+            ):
+                results = self.run(options)
+        finally:
+            shutil.rmtree(media_root)
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        if options['json']:
+            self.stdout.write(json.dumps([asdict(r) for r in results], indent=2))
+        else:
+            self.report(results)
+        over_budget = [
+            r.route for r in results if r.cold_queries > QUERY_BUDGETS[r.route]
+        ]
+        if over_budget:
+            raise CommandError(
+                f"Over the query budget: {', '.join(over_budget)}"
+            )
+
+    def report(self, results):
+        header = (
+            f"{'route':<30}{'status':>7}{'queries':>9}{'warm q':>8}"
+            f"{'bytes':>10}{'cold p50':>10}{'cold p95':>10}"
+            f"{'warm p50':>10}{'warm p95':>10}"
+        )
+        self.stdout.write(header)
+        for r in results:
+            line = (
+                f"{r.route:<30}{r.status:>7}{r.cold_queries:>9}"
+                f"{r.warm_queries:>8}{r.size:>10}{r.cold_p50_ms:>10.2f}"
+                f"{r.cold_p95_ms:>10.2f}{r.warm_p50_ms:>10.2f}"
+                f"{r.warm_p95_ms:>10.2f}"
+            )
+            over_budget = r.cold_queries > QUERY_BUDGETS[r.route]
+            self.stdout.write(self.style.ERROR(line) if over_budget else line)
+
+    def run(self, options):
+        seed_portfolio(
+            experiences=options['experiences'],
+            categories=options['categories'],
+            skills_per_category=options['skills_per_category'],
+            projects=options['projects'],
+        )
+        personal_info = PersonalInfo.objects.get()
+        personal_info.resume_file.save(
+            'resume.pdf', ContentFile(os.urandom(256 * 1024)), save=True,
+        )
+        client = Client()
+        return [
+            benchmark_route(client, route, options['iterations'])
+            for route in QUERY_BUDGETS
+        ]
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from portfolio.cache import LOCAL_CACHE_WARNING, is_shared_cache
+from portfolio.images import update_derivatives
+from portfolio.signals import IMAGE_FIELDS, content_changed
+
+
+class Command(BaseCommand):
+    help = "Generate responsive image derivatives for existing media"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help="Regenerate even when the manifest is up to date",
+        )
+
+    def handle(self, *args, **options):
+        updated = 0
+        for model, (field_name, variants_field) in IMAGE_FIELDS.items():
+            for instance in model._default_manager.exclude(
+                **{field_name: ''}
+            ).exclude(**{f'{field_name}__isnull': True}):
+                try:
+                    changed = update_derivatives(
+                        instance, field_name, variants_field,
+                        force=options['force'],
+                    )
+                except Exception as exc:
+                    self.stderr.write(f"{model.__name__} {instance.pk}: {exc}")
+                    continue
+                if changed:
+                    updated += 1
+                    self.stdout.write(f"{model.__name__} {instance.pk}: done")
+        if updated:
+            # Derivatives are saved with update(), which sends no signals.
+            content_changed()
+            if not is_shared_cache():
+                self.stderr.write(self.style.WARNING(LOCAL_CACHE_WARNING))
+        self.stdout.write(self.style.SUCCESS(f"{updated} image(s) processed"))
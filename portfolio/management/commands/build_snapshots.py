@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from portfolio.cache import LOCAL_CACHE_WARNING, is_shared_cache
+from portfolio.snapshots import rebuild_snapshots
+
+
+class Command(BaseCommand):
+    help = "Rebuild the pre-encoded JSON snapshots served by the /api/ views"
+
+    def handle(self, *args, **options):
+        snapshots = rebuild_snapshots()
+        for name, data in snapshots.items():
+            self.stdout.write(f"{name}: {len(data)} bytes")
+        self.stdout.write(self.style.SUCCESS("Snapshots rebuilt"))
+        if not is_shared_cache():
+            self.stderr.write(self.style.WARNING(LOCAL_CACHE_WARNING))
@@ -0,0 +1,36 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from portfolio.transfer import (
+    FORMATS, ImportDataError, export_records, guess_format,
+)
+
+
+class Command(BaseCommand):
+    help = "Export all portfolio content as JSON, JSON Lines, YAML or CSV"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output', '-o', default='-',
+            help="File to write (default: standard output)",
+        )
+        parser.add_argument(
+            '--format', choices=sorted(FORMATS),
+            help="Output format (default: from the file extension, else json)",
+        )
+
+    def handle(self, *args, **options):
+        output = options['output']
+        name = options['format'] or guess_format(output)
+        write = FORMATS[name].write
+        try:
+            if output == '-':
+                write(export_records(), sys.stdout)
+            else:
+                with open(output, 'w', encoding='utf-8', newline='') as stream:
+                    write(export_records(), stream)
+        except ImportDataError as exc:
+            raise CommandError(exc)
+        if output != '-':
+            self.stdout.write(self.style.SUCCESS(f"Exported to {output}"))
@@ -0,0 +1,62 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from portfolio.cache import LOCAL_CACHE_WARNING, is_shared_cache
+from portfolio.transfer import (
+    BATCH_SIZE, FORMATS, ImportDataError, guess_format, import_records,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Create or update portfolio content from a JSON, JSON Lines, YAML "
+        "or CSV export, matching existing objects by natural key"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', help="File to import, or - for standard input",
+        )
+        parser.add_argument(
+            '--format', choices=sorted(FORMATS),
+            help="Input format (default: from the file extension, else json)",
+        )
+        parser.add_argument(
+            '--prune', action='store_true',
+            help="Delete objects missing from the file, for the models it "
+                 "has records of",
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help="Report what would change and roll back",
+        )
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        read = FORMATS[options['format'] or guess_format(path)].read
+        try:
+            if path == '-':
+                report = self.run(read(sys.stdin), options)
+            else:
+                with open(path, encoding='utf-8-sig', newline='') as stream:
+                    report = self.run(read(stream), options)
+        except OSError as exc:
+            raise CommandError(exc)
+        except ImportDataError as exc:
+            raise CommandError(f"Nothing imported: {exc}")
+        for line in report.lines():
+            self.stdout.write(line)
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING("Dry run: rolled back"))
+        else:
+            self.stdout.write(self.style.SUCCESS("Import complete"))
+            if not is_shared_cache():
+                self.stderr.write(self.style.WARNING(LOCAL_CACHE_WARNING))
+
+    def run(self, records, options):
+        return import_records(
+            records, prune=options['prune'], dry_run=options['dry_run'],
+            batch_size=options['batch_size'],
+        )
@@ -0,0 +1,189 @@
+import itertools
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from portfolio.loadtest import (
+    MIXES, PROFILES, database_label, free_port, mix_urls, prepare_database,
+    run_load, server_command, wait_for_server, worker_memory,
+)
+from portfolio.startup import local_host
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the app under gunicorn on localhost in several deployment "
+        "profiles and report throughput, latency percentiles, error rate "
+        "and per-worker memory for a scripted traffic mix"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--profiles', default=','.join(PROFILES),
+            help=f"Comma-separated worker profiles ({', '.join(PROFILES)})",
+        )
+        parser.add_argument(
+            '--cache', default='on,off',
+            help="Comma-separated cache modes: on (the configured cache) "
+                 "and/or off (no caching at all)",
+        )
+        parser.add_argument(
+            '--database', action='append', metavar='URL',
+            help="Database to test against; repeat to compare. 'sqlite' "
+                 "(the default) is a seeded throwaway file. A URL such as "
+                 "postgres://localhost/portfolio_load is migrated and seeded "
+                 "when empty: use a scratch database.",
+        )
+        parser.add_argument('--mix', choices=sorted(MIXES), default='browse')
+        parser.add_argument('--workers', type=int, default=2)
+        parser.add_argument(
+            '--threads', type=int, default=4, help="Threads per gthread worker",
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=16,
+            help="Simultaneous clients",
+        )
+        parser.add_argument(
+            '--duration', type=float, default=15,
+            help="Seconds measured per run",
+        )
+        parser.add_argument(
+            '--warmup', type=float, default=3,
+            help="Seconds of load before measuring starts",
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--json', action='store_true', help="Print results as JSON",
+        )
+
+    def handle(self, *args, **options):
+        if not shutil.which('gunicorn'):
+            raise CommandError("gunicorn isn't installed")
+        profiles = self.split(options['profiles'], PROFILES, '--profiles')
+        caches = self.split(options['cache'], ('on', 'off'), '--cache')
+        if settings.DEBUG:
+            self.stderr.write(
+                "DEBUG is on: every query is kept in memory and the numbers "
+                "won't match production"
+            )
+
+        workdir = tempfile.mkdtemp()
+        results = []
+        try:
+            for database in options['database'] or ['sqlite']:
+                env = self.database_env(database, workdir)
+                try:
+                    prepare_database(env, settings.BASE_DIR)
+                except RuntimeError as exc:
+                    label = database_label(env['DATABASE_URL'])
+                    raise CommandError(f"Preparing {label} failed: {exc}")
+                for cache, name in itertools.product(caches, profiles):
+                    results.append(self.run_profile(
+                        PROFILES[name], cache, env, options,
+                    ))
+        finally:
+            shutil.rmtree(workdir)
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+        else:
+            self.report(results)
+
+    @staticmethod
+    def split(value, allowed, option):
+        names = [name.strip() for name in value.split(',') if name.strip()]
+        unknown = [name for name in names if name not in allowed]
+        if unknown or not names:
+            raise CommandError(
+                f"{option} takes {', '.join(allowed)}, not {value!r}"
+            )
+        return names
+
+    @staticmethod
+    def database_env(database, workdir):
+        env = dict(os.environ)
+        env.setdefault('DJANGO_SETTINGS_MODULE', settings.SETTINGS_MODULE)
+        env['MEDIA_ROOT'] = os.path.join(workdir, 'media')
+        # Local servers don't speak TLS
+        env['DB_SSL_REQUIRE'] = '0'
+        if database == 'sqlite':
+            database = 'sqlite:///' + os.path.join(workdir, 'loadtest.sqlite3')
+        env['DATABASE_URL'] = database
+        # The harness measures what it started, not what the environment
+        # happens to point at
+        env.pop('PORTFOLIO_DISABLE_CACHE', None)
+        for name in list(env):
+            if name.startswith('DATABASE_URL_'):
+                del env[name]
+        return env
+
+    def run_profile(self, profile, cache, env, options):
+        env = {**env, **dict(profile.env)}
+        if cache == 'off':
+            env['PORTFOLIO_DISABLE_CACHE'] = '1'
+        port = free_port()
+        host = local_host()
+        server = subprocess.Popen(
+            server_command(
+                profile, port, options['workers'], options['threads'],
+            ),
+            env=env, cwd=settings.BASE_DIR, stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            try:
+                wait_for_server(port, server, host)
+            except RuntimeError as exc:
+                raise CommandError(f"{profile.name}: {exc}")
+            load = run_load(
+                '127.0.0.1', port, mix_urls(options['mix']),
+                concurrency=options['concurrency'],
+                duration=options['duration'], warmup=options['warmup'],
+                seed=options['seed'],
+                headers={'Host': host, 'Accept-Encoding': 'br, gzip'},
+            )
+            workers = worker_memory(server.pid)
+        finally:
+            server.terminate()
+            server.wait()
+        return {
+            'profile': profile.name,
+            'cache': cache,
+            'database': database_label(env['DATABASE_URL']),
+            'mix': options['mix'],
+            **load.summary(),
+            'statuses': {
+                str(status): count
+                for status, count in sorted(load.statuses.items())
+            },
+            'workers': workers,
+        }
+
+    def report(self, results):
+        header = (
+            f"{'profile':<10}{'cache':<7}{'database':<12}{'req/s':>9}"
+            f"{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}{'errors':>9}"
+            f"{'rss MiB':>10}{'peak MiB':>10}"
+        )
+        self.stdout.write(header)
+        for r in results:
+            rss = [worker['rss_mb'] for worker in r['workers']]
+            peak = [worker['peak_rss_mb'] for worker in r['workers']]
+            line = (
+                f"{r['profile']:<10}{r['cache']:<7}{r['database']:<12}"
+                f"{r['throughput']:>9.1f}{r['p50_ms']:>9.1f}"
+                f"{r['p90_ms']:>9.1f}{r['p99_ms']:>9.1f}{r['max_ms']:>9.1f}"
+                f"{r['error_rate']:>9.2%}"
+                f"{(sum(rss) / len(rss) if rss else 0):>10.1f}"
+                f"{max(peak, default=0):>10.1f}"
+            )
+            self.stdout.write(self.style.ERROR(line) if r['error_rate'] else line)
+        self.stdout.write(
+            "\nLatencies in ms. rss is the mean resident memory per worker "
+            "after the run; peak is the highest any worker reached."
+        )
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from portfolio.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Re-create the full-text search documents behind /api/search/"
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            count = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} documents"))
@@ -0,0 +1,48 @@
+import os
+
+from django.core.management.base import BaseCommand
+
+from portfolio.jobs import Worker, get_queue, jobs_enabled
+
+
+class Command(BaseCommand):
+    help = (
+        "Run queued background jobs (snapshot rebuilds, image derivatives) "
+        "until stopped"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--burst', action='store_true',
+            help="Exit once no job is due instead of waiting for more",
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=1.0,
+            help="Seconds to wait when no job is due",
+        )
+        parser.add_argument(
+            '--max-jobs', type=int, default=None,
+            help="Exit after running this many jobs",
+        )
+        parser.add_argument(
+            '--nice', type=int, default=10,
+            help="Lower the worker's CPU priority by this much, so rebuilds "
+                 "yield to web workers on the same machine",
+        )
+
+    def handle(self, *args, **options):
+        if not jobs_enabled():
+            # Nothing gets queued; don't poll the database for it
+            self.stderr.write(self.style.WARNING(
+                "PORTFOLIO_BACKGROUND_JOBS is off: no jobs to run"
+            ))
+            return
+        if options['nice'] and hasattr(os, 'nice'):
+            os.nice(options['nice'])
+        queue = get_queue()
+        self.stdout.write(f"Running jobs from {type(queue).__name__}")
+        done = Worker(queue).run(
+            burst=options['burst'], sleep=options['sleep'],
+            max_jobs=options['max_jobs'],
+        )
+        self.stdout.write(self.style.SUCCESS(f"{done} job(s) run"))
@@ -0,0 +1,39 @@
+import urllib.request
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from portfolio.staticfiles import VENDOR_SCRIPTS
+
+
+class Command(BaseCommand):
+    help = (
+        "Download the third-party scripts (GSAP) into static/ so they are "
+        "served, hashed and precompressed with the site's own assets"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help="Download again even if a copy already exists",
+        )
+
+    def handle(self, *args, **options):
+        static_dir = Path(settings.STATICFILES_DIRS[0])
+        for script in VENDOR_SCRIPTS.values():
+            target = static_dir / script.path
+            if target.exists() and not options['force']:
+                self.stdout.write(f"{script.path}: already vendored")
+                continue
+            try:
+                with urllib.request.urlopen(script.cdn_url, timeout=30) as response:
+                    data = response.read()
+            except OSError as exc:
+                raise CommandError(f"Could not fetch {script.cdn_url}: {exc}")
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(data)
+            self.stdout.write(f"{script.path}: {len(data)} bytes")
+        self.stdout.write(self.style.SUCCESS(
+            "Vendored scripts updated; commit them and run collectstatic"
+        ))
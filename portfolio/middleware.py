@@ -0,0 +1,290 @@
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import (
+    iscoroutinefunction, markcoroutinefunction, sync_to_async,
+)
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.messages.middleware import MessageMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.db import DatabaseError, connections
+from django.middleware.csrf import CsrfViewMiddleware
+from django.urls import Resolver404, resolve
+from django.utils.cache import patch_cache_control
+
+from .db.router import (
+    choose_replica, current_replica, mark_unhealthy, reading_from,
+    replica_aliases,
+)
+from .instrumentation import end_request, start_request
+
+request_logger = logging.getLogger('portfolio.requests')
+slow_query_logger = logging.getLogger('portfolio.slow_queries')
+
+PUBLIC_NAMESPACE = 'portfolio'
+
+
+def is_public_request(request) -> bool:
+    """Whether ``request`` is a GET/HEAD to the public site.
+
+    The public site is every ``portfolio:`` URL: homepage, fragments,
+    resume and API. The admin is not included. The answer is remembered
+    on the request, so the path is resolved at most once.
+    """
+    public = getattr(request, '_portfolio_public', None)
+    if public is None:
+        public = False
+        if request.method in ('GET', 'HEAD'):
+            try:
+                match = resolve(request.path_info)
+            except Resolver404:
+                pass
+            else:
+                public = match.namespace == PUBLIC_NAMESPACE
+        request._portfolio_public = public
+    return public
+
+
+def lean_public_path(request) -> bool:
+    return (
+        getattr(settings, 'PORTFOLIO_LEAN_PUBLIC_PATH', False)
+        and is_public_request(request)
+    )
+
+
+class AsyncCapableMiddleware:
+    """Base for middleware with a sync ``__call__`` and an async ``__acall__``.
+
+    As with Django's ``MiddlewareMixin``, the instance takes the mode of
+    ``get_response``. Under ASGI, requests to the async views then stay on
+    the event loop instead of going through ``sync_to_async`` at each
+    middleware, which would run every request on the one sync thread.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+
+class PerformanceMiddleware(AsyncCapableMiddleware):
+    """Record where each request's time goes.
+
+    Adds a ``Server-Timing`` header (``PORTFOLIO_SERVER_TIMING``) and logs
+    one JSON line per request to ``portfolio.requests``. Queries slower
+    than ``PORTFOLIO_SLOW_QUERY_MS`` are logged with their SQL to
+    ``portfolio.slow_queries``, sampled at
+    ``PORTFOLIO_SLOW_QUERY_SAMPLE_RATE``.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.server_timing = getattr(settings, 'PORTFOLIO_SERVER_TIMING', True)
+        self.slow_query_ms = getattr(settings, 'PORTFOLIO_SLOW_QUERY_MS', None)
+        self.slow_query_sample_rate = getattr(
+            settings, 'PORTFOLIO_SLOW_QUERY_SAMPLE_RATE', 1.0
+        )
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        metrics, token = start_request()
+        try:
+            started = time.perf_counter()
+            with self.wrap_queries(request, metrics):
+                response = self.get_response(request)
+            return self.finish(request, response, metrics, started)
+        finally:
+            end_request(token)
+
+    async def __acall__(self, request):
+        metrics, token = start_request()
+        try:
+            started = time.perf_counter()
+            # Connections are per thread, and the async ORM runs queries on
+            # the request's sync thread: wrap the connections there.
+            wrappers = await sync_to_async(self.wrap_queries)(request, metrics)
+            try:
+                response = await self.get_response(request)
+            finally:
+                await sync_to_async(wrappers.close)()
+            return self.finish(request, response, metrics, started)
+        finally:
+            end_request(token)
+
+    def wrap_queries(self, request, metrics) -> ExitStack:
+        """Count this thread's queries until the returned stack is closed"""
+        stack = ExitStack()
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(
+                self.make_query_wrapper(request, metrics)
+            ))
+        return stack
+
+    def finish(self, request, response, metrics, started: float):
+        total_ms = (time.perf_counter() - started) * 1000
+        if self.server_timing:
+            response['Server-Timing'] = self.format_server_timing(
+                metrics, total_ms
+            )
+        self.log_request(request, response, metrics, total_ms)
+        return response
+
+    def make_query_wrapper(self, request, metrics):
+        def wrapper(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                elapsed = (time.perf_counter() - started) * 1000
+                metrics.db_queries += 1
+                metrics.db_ms += elapsed
+                if (
+                    self.slow_query_ms is not None
+                    and elapsed >= self.slow_query_ms
+                    and random.random() < self.slow_query_sample_rate
+                ):
+                    slow_query_logger.warning(json.dumps({
+                        'path': request.path,
+                        'alias': context['connection'].alias,
+                        'duration_ms': round(elapsed, 2),
+                        'sql': sql,
+                    }))
+        return wrapper
+
+    @staticmethod
+    def format_server_timing(metrics, total_ms: float) -> str:
+        entries = [
+            f'db;dur={metrics.db_ms:.1f};desc="{metrics.db_queries} queries"',
+            f'tpl;dur={metrics.template_ms:.1f}',
+            f'cache;desc="hit={metrics.cache_hits} miss={metrics.cache_misses}"',
+        ]
+        entries += [
+            f'{name};dur={ms:.1f}' for name, ms in metrics.timings.items()
+        ]
+        entries.append(f'total;dur={total_ms:.1f}')
+        return ', '.join(entries)
+
+    @staticmethod
+    def log_request(request, response, metrics, total_ms: float) -> None:
+        request_logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'total_ms': round(total_ms, 2),
+            'db_queries': metrics.db_queries,
+            'db_ms': round(metrics.db_ms, 2),
+            'template_ms': round(metrics.template_ms, 2),
+            'cache_hits': metrics.cache_hits,
+            'cache_misses': metrics.cache_misses,
+            **{f'{name}_ms': round(ms, 2) for name, ms in metrics.timings.items()},
+        }))
+
+
+class ReplicaMiddleware(AsyncCapableMiddleware):
+    """Read public pages and API responses from a replica.
+
+    Applies to GET and HEAD requests to ``portfolio:`` URLs; see
+    ``portfolio.db.router`` for the primary pin and failover.
+    """
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        alias = choose_replica() if is_public_request(request) else None
+        with reading_from(alias):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        alias = None
+        # Choosing may check a replica's health over the network
+        if replica_aliases() and is_public_request(request):
+            alias = await sync_to_async(choose_replica)()
+        with reading_from(alias):
+            return await self.get_response(request)
+
+    def process_exception(self, request, exception):
+        alias = current_replica()
+        if alias and isinstance(exception, DatabaseError):
+            # Fail over for the following requests
+            mark_unhealthy(alias)
+
+
+class PublicCacheMiddleware(AsyncCapableMiddleware):
+    """Let shared caches and CDNs store public responses.
+
+    With ``PORTFOLIO_LEAN_PUBLIC_PATH``, successful public responses get
+    ``Cache-Control: public, max-age=..., s-maxage=...,
+    stale-while-revalidate=...``. Browsers revalidate with the ETag, and
+    edge caches serve their copy for ``PORTFOLIO_PUBLIC_S_MAXAGE`` seconds.
+    A response that already has a Cache-Control header (such as a
+    ``no-store`` fallback), sets a cookie or is streamed is left alone.
+    """
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    @staticmethod
+    def process_response(request, response):
+        if (
+            lean_public_path(request)
+            and response.status_code in (200, 304)
+            and not response.has_header('Cache-Control')
+            and not response.cookies
+            and not response.streaming
+        ):
+            patch_cache_control(
+                response, public=True,
+                max_age=getattr(settings, 'PORTFOLIO_PUBLIC_MAX_AGE', 0),
+                s_maxage=getattr(settings, 'PORTFOLIO_PUBLIC_S_MAXAGE', 300),
+                stale_while_revalidate=getattr(
+                    settings, 'PORTFOLIO_PUBLIC_STALE_WHILE_REVALIDATE', 86400
+                ),
+            )
+        return response
+
+
+class PublicPathMixin:
+    """Pass public requests straight through this middleware.
+
+    The public pages don't use sessions, users, CSRF tokens or messages.
+    Skipping that middleware saves its work on every hit. It also keeps
+    ``Vary: Cookie`` and ``Set-Cookie`` off responses that shared caches
+    should store. The admin still gets the full stack.
+    """
+
+    def __call__(self, request):
+        if lean_public_path(request):
+            return self.get_response(request)
+        return super().__call__(request)
+
+
+class PublicPathSessionMiddleware(PublicPathMixin, SessionMiddleware):
+    pass
+
+
+class PublicPathCsrfViewMiddleware(PublicPathMixin, CsrfViewMiddleware):
+    pass
+
+
+class PublicPathAuthenticationMiddleware(
+    PublicPathMixin, AuthenticationMiddleware
+):
+    pass
+
+
+class PublicPathMessageMiddleware(PublicPathMixin, MessageMiddleware):
+    pass
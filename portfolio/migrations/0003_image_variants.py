@@ -0,0 +1,33 @@
+# Generated by Django 5.2.4 on 2026-10-18 00:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("portfolio", "0002_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="personalinfo",
+            name="profile_image_variants",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                editable=False,
+                help_text="Responsive derivatives generated from profile_image",
+            ),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="image_variants",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                editable=False,
+                help_text="Responsive derivatives generated from image",
+            ),
+        ),
+    ]
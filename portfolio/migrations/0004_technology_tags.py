@@ -0,0 +1,48 @@
+# Generated by Django 5.2.4 on 2026-10-18 00:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("portfolio", "0003_image_variants"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Technology",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100)),
+                ("key", models.CharField(max_length=100, unique=True)),
+            ],
+            options={
+                "verbose_name_plural": "Technologies",
+                "ordering": ["key"],
+            },
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="technology_list",
+            field=models.JSONField(default=list, editable=False),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="technology_tags",
+            field=models.ManyToManyField(
+                blank=True,
+                editable=False,
+                related_name="projects",
+                to="portfolio.technology",
+            ),
+        ),
+    ]
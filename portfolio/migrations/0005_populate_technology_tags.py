@@ -0,0 +1,40 @@
+from django.db import migrations
+
+
+def parse_technologies(technologies):
+    # Frozen copy of portfolio.models.parse_technologies
+    if not technologies:
+        return []
+    return [tech.strip() for tech in technologies.split(",") if tech.strip()]
+
+
+def populate_technology_tags(apps, schema_editor):
+    Project = apps.get_model("portfolio", "Project")
+    Technology = apps.get_model("portfolio", "Technology")
+
+    technologies = {}
+    for project in Project.objects.all():
+        project.technology_list = parse_technologies(project.technologies)
+        project.save(update_fields=["technology_list"])
+        tags = []
+        for name in project.technology_list:
+            key = name.casefold()
+            if key not in technologies:
+                technologies[key], _ = Technology.objects.get_or_create(
+                    key=key, defaults={"name": name}
+                )
+            tags.append(technologies[key])
+        project.technology_tags.set(tags)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("portfolio", "0004_technology_tags"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            populate_technology_tags, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.4 on 2026-10-18 00:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("portfolio", "0005_populate_technology_tags"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="experience",
+            index=models.Index(
+                fields=["-start_date", "-id"], name="experience_start_keyset"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="project",
+            index=models.Index(
+                fields=["is_featured", "order", "id"], name="project_featured_keyset"
+            ),
+        ),
+    ]
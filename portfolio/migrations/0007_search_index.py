@@ -0,0 +1,163 @@
+# Generated by Django 5.2.4 on 2026-10-18 00:33
+
+from django.db import migrations, models
+
+FTS_TABLE = "portfolio_searchdocument_fts"
+
+SQLITE_FORWARD = [
+    f"""
+    CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        title, body,
+        content='portfolio_searchdocument', content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER portfolio_searchdocument_ai
+    AFTER INSERT ON portfolio_searchdocument BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, body)
+        VALUES (new.id, new.title, new.body);
+    END
+    """,
+    f"""
+    CREATE TRIGGER portfolio_searchdocument_ad
+    AFTER DELETE ON portfolio_searchdocument BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+    END
+    """,
+    f"""
+    CREATE TRIGGER portfolio_searchdocument_au
+    AFTER UPDATE ON portfolio_searchdocument BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+        INSERT INTO {FTS_TABLE}(rowid, title, body)
+        VALUES (new.id, new.title, new.body);
+    END
+    """,
+]
+
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS portfolio_searchdocument_au",
+    "DROP TRIGGER IF EXISTS portfolio_searchdocument_ad",
+    "DROP TRIGGER IF EXISTS portfolio_searchdocument_ai",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+POSTGRESQL_FORWARD = [
+    """
+    ALTER TABLE portfolio_searchdocument ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A')
+        || setweight(to_tsvector('english', coalesce(body, '')), 'B')
+    ) STORED
+    """,
+    """
+    CREATE INDEX portfolio_searchdocument_vector
+    ON portfolio_searchdocument USING GIN (search_vector)
+    """,
+]
+
+POSTGRESQL_REVERSE = [
+    "DROP INDEX IF EXISTS portfolio_searchdocument_vector",
+    "ALTER TABLE portfolio_searchdocument DROP COLUMN IF EXISTS search_vector",
+]
+
+FORWARD = {"sqlite": SQLITE_FORWARD, "postgresql": POSTGRESQL_FORWARD}
+REVERSE = {"sqlite": SQLITE_REVERSE, "postgresql": POSTGRESQL_REVERSE}
+
+
+def create_fulltext_index(apps, schema_editor):
+    # Other backends have no index; portfolio.search falls back to icontains.
+    for sql in FORWARD.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def drop_fulltext_index(apps, schema_editor):
+    for sql in REVERSE.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def populate_search_documents(apps, schema_editor):
+    # Frozen copy of portfolio.search.rebuild_index
+    SearchDocument = apps.get_model("portfolio", "SearchDocument")
+    Project = apps.get_model("portfolio", "Project")
+    Experience = apps.get_model("portfolio", "Experience")
+    Skill = apps.get_model("portfolio", "Skill")
+
+    documents = []
+    for project in Project.objects.all():
+        body = "\n".join([project.description, " ".join(project.technology_list)])
+        documents.append(
+            SearchDocument(
+                kind="project", object_id=project.pk, title=project.title, body=body
+            )
+        )
+    for experience in Experience.objects.all():
+        body = "\n".join([experience.company, experience.description])
+        documents.append(
+            SearchDocument(
+                kind="experience",
+                object_id=experience.pk,
+                title=experience.title,
+                body=body,
+            )
+        )
+    for skill in Skill.objects.select_related("category"):
+        documents.append(
+            SearchDocument(
+                kind="skill",
+                object_id=skill.pk,
+                title=skill.name,
+                body=skill.category.name,
+            )
+        )
+    SearchDocument.objects.bulk_create(documents)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("portfolio", "0006_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SearchDocument",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("project", "Project"),
+                            ("experience", "Experience"),
+                            ("skill", "Skill"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("object_id", models.BigIntegerField()),
+                ("title", models.CharField(max_length=300)),
+                ("body", models.TextField(blank=True)),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("kind", "object_id"),
+                        name="searchdocument_unique_object",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+        migrations.RunPython(populate_search_documents, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.4 on 2026-10-18 01:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("portfolio", "0007_search_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="experience",
+            index=models.Index(
+                fields=["-order", "-start_date"], name="experience_order"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="experience",
+            index=models.Index(
+                fields=["is_current", "-order", "-start_date"],
+                name="experience_current_order",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="project",
+            index=models.Index(fields=["order", "id"], name="project_order"),
+        ),
+        migrations.AddIndex(
+            model_name="skill",
+            index=models.Index(
+                fields=["category", "order"], name="skill_category_order"
+            ),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 # Create your models here.
 
@@ -8,12 +9,17 @@ class PersonalInfo(models.Model):
     title = models.CharField(max_length=200)
     description = models.TextField()
     profile_image = models.ImageField(upload_to='profile/', blank=True, null=True)
+    profile_image_variants = models.JSONField(
+        default=dict, blank=True, editable=False,
+        help_text="Responsive derivatives generated from profile_image",
+    )
     email = models.EmailField()
     phone = models.CharField(max_length=20, blank=True, null=True)
     location = models.CharField(max_length=100, blank=True, null=True)
     github_url = models.URLField(blank=True, null=True)
     linkedin_url = models.URLField(blank=True, null=True)
     resume_file = models.FileField(upload_to='resumes/', blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name_plural = "Personal Info"
@@ -30,9 +36,25 @@ class Experience(models.Model):
     end_date = models.DateField(blank=True, null=True)
     is_current = models.BooleanField(default=False)
     order = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-order', '-start_date']
+        indexes = [
+            # Keyset pagination in the experiences API
+            models.Index(
+                fields=['-start_date', '-id'], name='experience_start_keyset'
+            ),
+            # Admin changelist ordering, alone and under the is_current
+            # filter
+            models.Index(
+                fields=['-order', '-start_date'], name='experience_order'
+            ),
+            models.Index(
+                fields=['is_current', '-order', '-start_date'],
+                name='experience_current_order',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.title} at {self.company}"
@@ -41,6 +63,7 @@ class Experience(models.Model):
 class SkillCategory(models.Model):
     name = models.CharField(max_length=100)
     order = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['order']
@@ -59,37 +82,207 @@ class Skill(models.Model):
         default=0, help_text="Skill proficiency percentage (0-100)"
     )
     order = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['category__order', 'order']
+        indexes = [
+            # Skills of a category in order (API, admin category filter)
+            models.Index(
+                fields=['category', 'order'], name='skill_category_order'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.proficiency}%)"
 
 
+def parse_technologies(technologies):
+    """Split a comma-separated technologies string into a clean list"""
+    if not technologies:
+        return []
+    return [tech.strip() for tech in technologies.split(',') if tech.strip()]
+
+
+class Technology(models.Model):
+    name = models.CharField(max_length=100)
+    # Case-folded name; what ?tech= filters match against
+    key = models.CharField(max_length=100, unique=True)
+
+    class Meta:
+        ordering = ['key']
+        verbose_name_plural = "Technologies"
+
+    def __str__(self):
+        return self.name
+
+
 class Project(models.Model):
     title = models.CharField(max_length=200)
     description = models.TextField()
     image = models.ImageField(upload_to='projects/', blank=True, null=True)
+    image_variants = models.JSONField(
+        default=dict, blank=True, editable=False,
+        help_text="Responsive derivatives generated from image",
+    )
     live_url = models.URLField(blank=True, null=True)
     github_url = models.URLField(blank=True, null=True)
     technologies = models.TextField(
         help_text="Comma-separated list of technologies"
     )
+    # Derived from ``technologies`` on save: the parsed list for display and
+    # indexed tags for filtering and counts.
+    technology_list = models.JSONField(default=list, editable=False)
+    technology_tags = models.ManyToManyField(
+        Technology, related_name='projects', blank=True, editable=False
+    )
     order = models.IntegerField(default=0)
     is_featured = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['order']
+        indexes = [
+            # Keyset pagination over featured projects in the projects API
+            models.Index(
+                fields=['is_featured', 'order', 'id'],
+                name='project_featured_keyset',
+            ),
+            # Admin changelist ordering over all projects
+            models.Index(fields=['order', 'id'], name='project_order'),
+        ]
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        self.technology_list = parse_technologies(self.technologies)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'technologies' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'technology_list'}
+        super().save(*args, **kwargs)
+
     def get_technologies_list(self):
-        if self.technologies:
-            return [
-                tech.strip()
-                for tech in self.technologies.split(',')
-                if tech.strip()
-            ]
-        return []
+        return self.technology_list
+
+    def sync_technology_tags(self):
+        """Point ``technology_tags`` at the technologies in ``technology_list``"""
+        sync_technology_tags([self])
+
+
+def sync_technology_tags(projects):
+    """Rebuild the technology tags of saved ``projects`` in a few queries.
+
+    Works from each project's ``technology_list``, so it also serves
+    projects written with ``bulk_create``/``bulk_update`` (which bypass
+    ``Project.save``) as long as the list was filled in.
+    """
+    names = {}
+    for project in projects:
+        for name in project.technology_list:
+            names.setdefault(name.casefold(), name)
+    Technology.objects.bulk_create(
+        [Technology(name=name, key=key) for key, name in names.items()],
+        ignore_conflicts=True,
+    )
+    technology_ids = dict(
+        Technology.objects.filter(key__in=names).values_list('key', 'pk')
+    )
+    Through = Project.technology_tags.through
+    Through.objects.filter(project__in=projects).delete()
+    Through.objects.bulk_create(
+        [
+            Through(project_id=project.pk, technology_id=technology_ids[key])
+            for project in projects
+            for key in dict.fromkeys(n.casefold() for n in project.technology_list)
+        ],
+        ignore_conflicts=True,
+    )
+
+
+class SearchDocument(models.Model):
+    """Denormalized text of one searchable object.
+
+    The full-text index over these rows (a tsvector column with a GIN index
+    on PostgreSQL, an FTS5 table on SQLite) is created by migration 0007
+    and queried in ``portfolio.search``.
+    """
+
+    KIND_PROJECT = 'project'
+    KIND_EXPERIENCE = 'experience'
+    KIND_SKILL = 'skill'
+    KIND_CHOICES = [
+        (KIND_PROJECT, 'Project'),
+        (KIND_EXPERIENCE, 'Experience'),
+        (KIND_SKILL, 'Skill'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    title = models.CharField(max_length=300)
+    body = models.TextField(blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['kind', 'object_id'], name='searchdocument_unique_object'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}: {self.title}"
+
+
+class Job(models.Model):
+    """A unit of background work, run by ``manage.py run_jobs``.
+
+    See ``portfolio.jobs``. Jobs sharing a ``key`` do the same work, so
+    only one of them may be queued at a time; later requests for it are
+    merged into the queued one and counted in ``coalesced``.
+    """
+
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_SUCCEEDED, 'Succeeded'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    task = models.CharField(max_length=100)
+    args = models.JSONField(default=list, blank=True)
+    key = models.CharField(max_length=200, blank=True)
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED
+    )
+    run_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    coalesced = models.PositiveIntegerField(
+        default=0, help_text="Later requests merged into this job"
+    )
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['-created_at', '-id']
+        indexes = [
+            # The worker's "next due job" lookup
+            models.Index(fields=['status', 'run_at'], name='job_due'),
+            models.Index(fields=['-created_at', '-id'], name='job_created'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['key'],
+                condition=models.Q(status='queued') & ~models.Q(key=''),
+                name='job_unique_queued_key',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.task} ({self.status})"
@@ -0,0 +1,213 @@
+"""Keyset (cursor) pagination and field selection for list endpoints.
+
+Pages are fetched with a ``WHERE (sort keys) < (last row's keys)`` filter
+on an indexed ordering instead of ``OFFSET``, so every page costs the
+same however deep it is. ``fields=`` limits both the selected columns
+(``.values()``) and the serialized output, so list views can skip the
+long ``description`` text.
+"""
+import base64
+import binascii
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from asgiref.sync import sync_to_async
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q, QuerySet
+
+from . import queries
+from .cache import (
+    aget_content_version, aget_or_build, get_content_version, get_or_build,
+    versioned_key,
+)
+from .snapshots import snapshot_timeout
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+
+class PaginationError(ValueError):
+    """Invalid ``limit``, ``cursor`` or ``fields`` parameter"""
+
+
+def _date(value):
+    return value.strftime('%Y-%m-%d') if value else None
+
+
+def _media_url(name):
+    return default_storage.url(name) if name else None
+
+
+@dataclass
+class Resource:
+    name: str
+    queryset: Callable[[], QuerySet]
+    # (field, descending); the last key must be unique
+    keys: Sequence[Tuple[str, bool]]
+    # output name -> (column, formatter)
+    fields: Dict[str, Tuple[str, Optional[Callable[[Any], Any]]]]
+    # output names dropped when their value is empty
+    optional: Sequence[str] = ()
+
+    def serialize(self, row: Dict[str, Any], names: List[str]) -> Dict[str, Any]:
+        data = {}
+        for name in names:
+            column, formatter = self.fields[name]
+            value = row[column]
+            if formatter:
+                value = formatter(value)
+            if value in (None, '') and name in self.optional:
+                continue
+            data[name] = value
+        return data
+
+
+RESOURCES = {
+    'experiences': Resource(
+        name='experiences',
+        queryset=queries.experiences,
+        keys=(('start_date', True), ('id', True)),
+        fields={
+            'title': ('title', None),
+            'company': ('company', None),
+            'description': ('description', None),
+            'start_date': ('start_date', _date),
+            'end_date': ('end_date', _date),
+            'is_current': ('is_current', None),
+        },
+        optional=('end_date',),
+    ),
+    'projects': Resource(
+        name='projects',
+        queryset=queries.featured_projects,
+        keys=(('order', False), ('id', False)),
+        fields={
+            'title': ('title', None),
+            'description': ('description', None),
+            'technologies': ('technology_list', None),
+            'live_url': ('live_url', None),
+            'github_url': ('github_url', None),
+            'image': ('image', _media_url),
+        },
+        optional=('image',),
+    ),
+}
+
+
+def encode_cursor(values: List[Any]) -> str:
+    raw = json.dumps(values, cls=DjangoJSONEncoder).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(resource: Resource, cursor: str) -> List[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, ValueError):
+        raise PaginationError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != len(resource.keys):
+        raise PaginationError("Invalid cursor")
+    model = resource.queryset().model
+    try:
+        return [
+            model._meta.get_field(key).to_python(value)
+            for (key, _), value in zip(resource.keys, values)
+        ]
+    except Exception:
+        raise PaginationError("Invalid cursor")
+
+
+def after(keys: Sequence[Tuple[str, bool]], values: List[Any]) -> Q:
+    """Rows strictly after ``values`` in the ``keys`` ordering"""
+    condition = Q()
+    for i, (key, descending) in enumerate(keys):
+        step = Q(**{f'{key}__{"lt" if descending else "gt"}': values[i]})
+        for (prior, _), value in zip(keys[:i], values[:i]):
+            step &= Q(**{prior: value})
+        condition |= step
+    return condition
+
+
+def parse_params(resource: Resource, params) -> Tuple[int, Optional[str], List[str]]:
+    try:
+        limit = int(params.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        raise PaginationError("limit must be an integer")
+    if not 1 <= limit <= MAX_LIMIT:
+        raise PaginationError(f"limit must be between 1 and {MAX_LIMIT}")
+    names = list(resource.fields)
+    if params.get('fields'):
+        names = [n.strip() for n in params['fields'].split(',') if n.strip()]
+        unknown = set(names) - set(resource.fields)
+        if unknown:
+            raise PaginationError(
+                f"Unknown fields: {', '.join(sorted(unknown))}"
+            )
+    return limit, params.get('cursor') or None, names
+
+
+def build_page(resource: Resource, limit: int, cursor: Optional[str],
+               names: List[str]) -> bytes:
+    key_names = [key for key, _ in resource.keys]
+    queryset = resource.queryset().order_by(
+        *(f'-{key}' if desc else key for key, desc in resource.keys)
+    )
+    if cursor:
+        queryset = queryset.filter(
+            after(resource.keys, decode_cursor(resource, cursor))
+        )
+    columns = {resource.fields[name][0] for name in names} | set(key_names)
+    rows = list(queryset.values(*columns)[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1][key] for key in key_names])
+    return json.dumps(
+        {
+            resource.name: [resource.serialize(row, names) for row in rows],
+            'next_cursor': next_cursor,
+        },
+        cls=DjangoJSONEncoder,
+    ).encode()
+
+
+def _page_key(resource: Resource, limit, cursor, names, version) -> str:
+    digest = hashlib.md5(
+        f'{limit}|{cursor}|{",".join(names)}'.encode(), usedforsecurity=False
+    ).hexdigest()
+    return versioned_key('page', resource.name, digest, version=version)
+
+
+def get_page(resource_name: str, params) -> bytes:
+    """Encoded page of ``resource_name`` for the request's query params.
+
+    Raises PaginationError for invalid parameters.
+    """
+    resource = RESOURCES[resource_name]
+    limit, cursor, names = parse_params(resource, params)
+    version = get_content_version()
+    return get_or_build(
+        _page_key(resource, limit, cursor, names, version),
+        lambda: build_page(resource, limit, cursor, names),
+        snapshot_timeout(),
+    )
+
+
+async def aget_page(resource_name: str, params) -> bytes:
+    """Async ``get_page``"""
+    resource = RESOURCES[resource_name]
+    limit, cursor, names = parse_params(resource, params)
+    version = await aget_content_version()
+    return await aget_or_build(
+        _page_key(resource, limit, cursor, names, version),
+        lambda: sync_to_async(build_page)(resource, limit, cursor, names),
+        snapshot_timeout(),
+    )
+
+
+def wants_page(params) -> bool:
+    """Whether a request opted into pagination or field selection"""
+    return any(name in params for name in ('limit', 'cursor', 'fields'))
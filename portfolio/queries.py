@@ -0,0 +1,92 @@
+"""Data access for the portfolio pages, in sync and async flavours.
+
+The sync loaders return lazy querysets for the template to consume. The
+async loaders evaluate the same querysets with Django's async ORM, so an
+async view never blocks its event loop on a database round trip. The ORM
+runs each query on the request's one sync thread, so the loaders are
+awaited one after another: running them at once would save no time.
+"""
+from typing import Any, Dict, List, Optional
+
+from django.db.models import Count, Prefetch, Q, QuerySet
+
+from .models import (
+    PersonalInfo, Experience, SkillCategory, Skill, Project, Technology,
+)
+
+
+def experiences() -> QuerySet:
+    return Experience.objects.all().order_by('-start_date')
+
+
+def skill_categories() -> QuerySet:
+    return SkillCategory.objects.prefetch_related(
+        Prefetch('skills', queryset=Skill.objects.order_by('order'))
+    ).order_by('order')
+
+
+def featured_projects() -> QuerySet:
+    return Project.objects.filter(is_featured=True).order_by('order')
+
+
+def projects_with_technology(tech: str) -> QuerySet:
+    """Featured projects tagged with ``tech`` (case-insensitive), via the tag index"""
+    return featured_projects().filter(technology_tags__key=tech.casefold())
+
+
+def technology_counts() -> QuerySet:
+    """Technologies used by featured projects, most used first"""
+    return Technology.objects.annotate(
+        count=Count('projects', filter=Q(projects__is_featured=True))
+    ).filter(count__gt=0).order_by('-count', 'key')
+
+
+def home_context(lazy: bool = False) -> Dict[str, Any]:
+    """Template context for the portfolio page.
+
+    With ``lazy`` only the above-the-fold sections are rendered; the rest
+    are fetched as fragments (``portfolio.fragments``).
+    """
+    if lazy:
+        return {'personal_info': PersonalInfo.objects.first()}
+    return {
+        'personal_info': PersonalInfo.objects.first(),
+        'experiences': experiences(),
+        'skill_categories': skill_categories(),
+        'projects': featured_projects(),
+    }
+
+
+# section -> (context name, loader) for sections served as fragments
+SECTION_LOADERS = {
+    'experience': ('experiences', experiences),
+    'skills': ('skill_categories', skill_categories),
+    'projects': ('projects', featured_projects),
+    'resume': ('personal_info', lambda: PersonalInfo.objects.first()),
+}
+
+
+def section_context(section: str) -> Dict[str, Any]:
+    """Template context for one page section rendered on its own"""
+    name, loader = SECTION_LOADERS[section]
+    return {name: loader()}
+
+
+async def aget_personal_info() -> Optional[PersonalInfo]:
+    return await PersonalInfo.objects.afirst()
+
+
+async def _alist(queryset: QuerySet) -> List[Any]:
+    return [obj async for obj in queryset]
+
+
+async def ahome_context(lazy: bool = False) -> Dict[str, Any]:
+    """Async ``home_context`` with every query already evaluated"""
+    if lazy:
+        return {'personal_info': await aget_personal_info()}
+    return {
+        'personal_info': await aget_personal_info(),
+        'experiences': await _alist(experiences()),
+        'skill_categories': await _alist(skill_categories()),
+        'projects': await _alist(featured_projects()),
+    }
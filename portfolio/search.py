@@ -0,0 +1,306 @@
+"""Full-text search over projects, experience and skills.
+
+Each searchable object is mirrored into a ``SearchDocument`` row (kept up
+to date by signals). Migration 0007 indexes those rows with the
+database's own full-text engine:
+
+* PostgreSQL: a generated, weighted ``tsvector`` column with a GIN index,
+  queried with ``to_tsquery``/``ts_rank``/``ts_headline``.
+* SQLite: an external-content FTS5 table maintained by triggers, queried
+  with ``MATCH``/``bm25()``/``snippet()``.
+
+Any other backend falls back to ``icontains`` without ranking.
+"""
+import hashlib
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+
+from .cache import (
+    aget_content_version, aget_or_build, get_content_version, get_or_build,
+    versioned_key,
+)
+from .models import Experience, Project, SearchDocument, Skill
+from .snapshots import snapshot_timeout
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+MAX_TERMS = 8
+# Longer queries are cut to this length. Only queries up to
+# MAX_CACHED_QUERY_LENGTH (after normalising) have their results cached, so
+# arbitrary input can't fill the cache; the index lookup is cheap anyway.
+MAX_QUERY_LENGTH = 200
+MAX_CACHED_QUERY_LENGTH = 40
+SNIPPET_WORDS = 24
+
+# Highlight markers passed to the database; swapped for <mark> once the
+# rest of the text has been escaped.
+START, STOP = '\ue000', '\ue001'
+
+FTS_TABLE = 'portfolio_searchdocument_fts'
+
+# model -> SearchDocument kind
+KINDS = {
+    Project: SearchDocument.KIND_PROJECT,
+    Experience: SearchDocument.KIND_EXPERIENCE,
+    Skill: SearchDocument.KIND_SKILL,
+}
+
+
+def document_text(instance) -> Tuple[str, str]:
+    """``(title, body)`` indexed for ``instance``"""
+    if isinstance(instance, Project):
+        return instance.title, '\n'.join(
+            [instance.description, ' '.join(instance.technology_list)]
+        )
+    if isinstance(instance, Experience):
+        return instance.title, '\n'.join(
+            [instance.company, instance.description]
+        )
+    if isinstance(instance, Skill):
+        return instance.name, instance.category.name
+    raise TypeError(f"{type(instance).__name__} is not searchable")
+
+
+def index_object(instance) -> None:
+    """Create or refresh the search document for ``instance``"""
+    title, body = document_text(instance)
+    SearchDocument.objects.update_or_create(
+        kind=KINDS[type(instance)], object_id=instance.pk,
+        defaults={'title': title, 'body': body},
+    )
+
+
+def remove_object(model, pk) -> None:
+    SearchDocument.objects.filter(kind=KINDS[model], object_id=pk).delete()
+
+
+def rebuild_index() -> int:
+    """Re-create every search document; returns how many were written"""
+    documents = []
+    for instances in (
+        Project.objects.all(),
+        Experience.objects.all(),
+        Skill.objects.select_related('category'),
+    ):
+        for instance in instances:
+            title, body = document_text(instance)
+            documents.append(SearchDocument(
+                kind=KINDS[type(instance)], object_id=instance.pk,
+                title=title, body=body,
+            ))
+    SearchDocument.objects.all().delete()
+    SearchDocument.objects.bulk_create(documents)
+    return len(documents)
+
+
+def terms(query: str) -> List[str]:
+    """Words of ``query``, lower-cased and de-duplicated.
+
+    Only word characters survive, so the terms can be quoted into FTS5 and
+    tsquery syntax without any operator leaking through.
+    """
+    words = re.findall(r'\w+', query.casefold())
+    return list(dict.fromkeys(words))[:MAX_TERMS]
+
+
+def highlight(text: str) -> str:
+    """Escape database highlighted ``text`` and turn markers into <mark>"""
+    return (
+        escape(text)
+        .replace(START, '<mark>')
+        .replace(STOP, '</mark>')
+    )
+
+
+def _fts5_match(words) -> str:
+    # Every term must match; each one is a prefix so "djan" finds "Django".
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def _tsquery(words) -> str:
+    return ' & '.join(f"'{word}':*" for word in words)
+
+
+def _sqlite_search(words, kind, limit):
+    match = _fts5_match(words)
+    sql = f"""
+        SELECT d.kind, d.object_id,
+               highlight({FTS_TABLE}, 0, %s, %s),
+               snippet({FTS_TABLE}, 1, %s, %s, '…', {SNIPPET_WORDS}),
+               bm25({FTS_TABLE}, 10.0, 1.0) AS rank
+        FROM {FTS_TABLE}
+        JOIN portfolio_searchdocument d ON d.id = {FTS_TABLE}.rowid
+        WHERE {FTS_TABLE} MATCH %s {'AND d.kind = %s' if kind else ''}
+        ORDER BY rank
+        LIMIT %s
+    """
+    params = [START, STOP, START, STOP, match, *([kind] if kind else []), limit]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        # bm25() is "lower is better"; flip it so callers always sort desc.
+        return [(k, pk, t, s, -r) for k, pk, t, s, r in cursor.fetchall()]
+
+
+def _postgresql_search(words, kind, limit):
+    tsquery = _tsquery(words)
+    options = (
+        f'StartSel={START}, StopSel={STOP}, '
+        f'MaxWords={SNIPPET_WORDS}, MinWords=8, ShortWord=2'
+    )
+    sql = f"""
+        SELECT d.kind, d.object_id,
+               ts_headline('english', d.title, q, %s),
+               ts_headline('english', d.body, q, %s),
+               ts_rank(d.search_vector, q) AS rank
+        FROM portfolio_searchdocument d, to_tsquery('english', %s) q
+        WHERE d.search_vector @@ q {'AND d.kind = %s' if kind else ''}
+        ORDER BY rank DESC
+        LIMIT %s
+    """
+    params = [
+        options + ', HighlightAll=true', options, tsquery,
+        *([kind] if kind else []), limit,
+    ]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def _fallback_documents(words, kind):
+    documents = SearchDocument.objects.all()
+    if kind:
+        documents = documents.filter(kind=kind)
+    for word in words:
+        documents = documents.filter(
+            Q(title__icontains=word) | Q(body__icontains=word)
+        )
+    return documents
+
+
+def _fallback_search(words, kind, limit):
+    documents = _fallback_documents(words, kind)
+    return [
+        (d.kind, d.object_id, d.title, d.body[:200], 0.0)
+        for d in documents.order_by('kind', 'title')[:limit]
+    ]
+
+
+BACKENDS = {
+    'sqlite': _sqlite_search,
+    'postgresql': _postgresql_search,
+}
+
+
+def search(query: str, kind: Optional[str] = None,
+           limit: int = DEFAULT_LIMIT) -> List[Dict[str, Any]]:
+    """Ranked search results for ``query``, best first.
+
+    ``title`` and ``snippet`` are HTML with matches wrapped in ``<mark>``.
+    """
+    words = terms(query)
+    if not words:
+        return []
+    backend = BACKENDS.get(connection.vendor, _fallback_search)
+    return [
+        {
+            'kind': kind_,
+            'id': object_id,
+            'title': highlight(title),
+            'snippet': highlight(snippet),
+            'rank': round(rank, 4),
+        }
+        for kind_, object_id, title, snippet, rank in backend(words, kind, limit)
+    ]
+
+
+def matching_ids(model, query: str):
+    """Primary keys of ``model`` objects matching ``query``, for the admin.
+
+    A subquery for ``pk__in``, unranked and without a limit, so a broad
+    search in a large changelist isn't cut short.
+    """
+    words = terms(query)
+    if not words:
+        return []
+    kind = KINDS[model]
+    if connection.vendor == 'sqlite':
+        return RawSQL(
+            f"""
+            SELECT d.object_id FROM {FTS_TABLE}
+            JOIN portfolio_searchdocument d ON d.id = {FTS_TABLE}.rowid
+            WHERE {FTS_TABLE} MATCH %s AND d.kind = %s
+            """,
+            [_fts5_match(words), kind],
+        )
+    if connection.vendor == 'postgresql':
+        return RawSQL(
+            """
+            SELECT object_id FROM portfolio_searchdocument
+            WHERE search_vector @@ to_tsquery('english', %s) AND kind = %s
+            """,
+            [_tsquery(words), kind],
+        )
+    return _fallback_documents(words, kind).values('object_id')
+
+
+def parse_limit(value) -> int:
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        return DEFAULT_LIMIT
+    return max(1, min(limit, MAX_LIMIT))
+
+
+def normalize_query(query: str) -> str:
+    """``query`` case-folded, with whitespace collapsed, and capped"""
+    return ' '.join(query.casefold().split())[:MAX_QUERY_LENGTH]
+
+
+def _cacheable(query: str) -> bool:
+    return len(query) <= MAX_CACHED_QUERY_LENGTH
+
+
+def _results_key(query: str, limit: int, version: int) -> str:
+    digest = hashlib.md5(
+        query.encode(), usedforsecurity=False
+    ).hexdigest()
+    return versioned_key('search', digest, str(limit), version=version)
+
+
+def build_results(query: str, limit: int) -> bytes:
+    return json.dumps({
+        'query': query,
+        'results': search(query, limit=limit),
+    }).encode()
+
+
+def get_results(query: str, limit: int) -> bytes:
+    """Encoded search response for the normalised ``query``.
+
+    Cached per content version when the query is short.
+    """
+    query = normalize_query(query)
+    if not _cacheable(query):
+        return build_results(query, limit)
+    return get_or_build(
+        _results_key(query, limit, get_content_version()),
+        lambda: build_results(query, limit), snapshot_timeout(),
+    )
+
+
+async def aget_results(query: str, limit: int) -> bytes:
+    """Async ``get_results``"""
+    query = normalize_query(query)
+    if not _cacheable(query):
+        return await sync_to_async(build_results)(query, limit)
+    return await aget_or_build(
+        _results_key(query, limit, await aget_content_version()),
+        lambda: sync_to_async(build_results)(query, limit), snapshot_timeout(),
+    )
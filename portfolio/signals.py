@@ -0,0 +1,160 @@
+import logging
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from .cache import bump_content_version
+from .db.router import pin_primary
+from .images import update_derivatives
+from .jobs import coalesce_seconds, enqueue, jobs_enabled
+from .models import PersonalInfo, Experience, SkillCategory, Skill, Project
+from .search import KINDS as SEARCH_MODELS, index_object, remove_object
+from .snapshots import rebuild_snapshots
+
+logger = logging.getLogger(__name__)
+
+CONTENT_MODELS = (PersonalInfo, Experience, SkillCategory, Skill, Project)
+
+# model -> (image field, derivative manifest field)
+IMAGE_FIELDS = {
+    PersonalInfo: ('profile_image', 'profile_image_variants'),
+    Project: ('image', 'image_variants'),
+}
+
+
+def content_changed():
+    """Move to a new content version and rebuild its API snapshots"""
+    # Before the bump: nothing may read a lagging replica under the new
+    # version and cache what it read.
+    pin_primary()
+    version = bump_content_version()
+    if jobs_enabled():
+        # Requests build what they need for the new version on demand;
+        # the job builds the rest, once for a burst of saves.
+        enqueue(
+            'rebuild_snapshots', key='rebuild_snapshots',
+            delay=coalesce_seconds(),
+        )
+    else:
+        rebuild_snapshots(version)
+
+
+def schedule_on_commit(func):
+    """Run ``func`` once when the current transaction commits.
+
+    Saving many rows in one transaction (an admin inline formset, say)
+    queues a single callback rather than one per row.
+    """
+    connection = transaction.get_connection()
+    pending = connection.__dict__.setdefault('portfolio_on_commit', {})
+    queued = pending.get(func)
+    # A rolled-back savepoint drops its callbacks, so only trust the
+    # bookkeeping while the callback is still actually queued.
+    if queued and any(c is queued for _, c, _ in connection.run_on_commit):
+        return
+
+    def callback():
+        pending.pop(func, None)
+        func()
+
+    pending[func] = callback
+    transaction.on_commit(callback)
+
+
+def invalidate_content(sender, **kwargs):
+    """Bump the content version whenever portfolio content changes"""
+    # Bump after commit so a concurrent request can't cache the old rows
+    # under the new version.
+    schedule_on_commit(content_changed)
+
+
+def refresh_image_derivatives(sender, instance, raw=False, **kwargs):
+    """Generate responsive derivatives when an image is uploaded or changed"""
+    if raw:
+        return
+    field_name, variants_field = IMAGE_FIELDS[sender]
+    if jobs_enabled():
+        field_file = getattr(instance, field_name)
+        variants = getattr(instance, variants_field) or {}
+        if field_file:
+            current = variants.get('source') == field_file.name
+        else:
+            current = not variants
+        if not current:
+            label, pk = sender._meta.label, instance.pk
+            transaction.on_commit(lambda: enqueue(
+                'image_derivatives', label, pk,
+                key=f'image_derivatives:{label}:{pk}',
+            ))
+        return
+    try:
+        update_derivatives(instance, field_name, variants_field)
+    except Exception:
+        # A bad upload shouldn't block the save; the template falls back
+        # to the original image when there is no manifest.
+        logger.exception(
+            "Could not generate image derivatives for %s %s",
+            sender.__name__, instance.pk,
+        )
+
+
+def sync_technology_tags(sender, instance, raw=False, **kwargs):
+    """Keep the indexed technology tags in step with ``technologies``"""
+    if not raw:
+        instance.sync_technology_tags()
+
+
+def update_search_document(sender, instance, raw=False, **kwargs):
+    """Re-index a searchable object in the same transaction as its save"""
+    if not raw:
+        index_object(instance)
+
+
+def remove_search_document(sender, instance, **kwargs):
+    remove_object(sender, instance.pk)
+
+
+def reindex_category_skills(sender, instance, raw=False, **kwargs):
+    """Skill documents include their category's name"""
+    if raw:
+        return
+    for skill in instance.skills.all():
+        skill.category = instance
+        index_object(skill)
+
+
+post_save.connect(
+    sync_technology_tags, sender=Project,
+    dispatch_uid='portfolio-technology-tags',
+)
+
+for model in SEARCH_MODELS:
+    post_save.connect(
+        update_search_document, sender=model,
+        dispatch_uid=f'portfolio-search-save-{model.__name__}',
+    )
+    post_delete.connect(
+        remove_search_document, sender=model,
+        dispatch_uid=f'portfolio-search-delete-{model.__name__}',
+    )
+
+post_save.connect(
+    reindex_category_skills, sender=SkillCategory,
+    dispatch_uid='portfolio-search-category',
+)
+
+for model in IMAGE_FIELDS:
+    post_save.connect(
+        refresh_image_derivatives, sender=model,
+        dispatch_uid=f'portfolio-image-derivatives-{model.__name__}',
+    )
+
+for model in CONTENT_MODELS:
+    post_save.connect(
+        invalidate_content, sender=model,
+        dispatch_uid=f'portfolio-invalidate-save-{model.__name__}',
+    )
+    post_delete.connect(
+        invalidate_content, sender=model,
+        dispatch_uid=f'portfolio-invalidate-delete-{model.__name__}',
+    )
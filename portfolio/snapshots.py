@@ -0,0 +1,257 @@
+"""Pre-encoded JSON snapshots of the portfolio API payloads.
+
+All payloads are built together, once per content version, and stored in
+the cache as ready-to-send bytes. API views only look the bytes up, so the
+request path does no ORM work and no JSON encoding.
+"""
+import hashlib
+import json
+from typing import Any, Dict, FrozenSet, List, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+from . import queries
+from .cache import (
+    aget_content_version, aget_or_build, get_content_version, get_or_build,
+    store_many, versioned_key,
+)
+from .conditional import content_state
+from .instrumentation import timed
+from .models import PersonalInfo, Experience, SkillCategory, Skill, Project
+
+# The content tables each snapshot is built from
+SNAPSHOT_MODELS = {
+    'personal_info': (PersonalInfo,),
+    'experiences': (Experience,),
+    'skills': (SkillCategory, Skill),
+    'projects': (Project,),
+    # Tags only change when a project is saved
+    'technologies': (Project,),
+    'portfolio': (PersonalInfo, Experience, SkillCategory, Skill, Project),
+}
+
+# Stored in place of a payload that doesn't exist (no PersonalInfo yet),
+# since the cache can't tell a stored None from a miss.
+MISSING = b''
+
+
+def serialize_personal_info(personal_info: PersonalInfo) -> Dict[str, Any]:
+    data: Dict[str, Any] = {
+        'name': personal_info.name,
+        'title': personal_info.title,
+        'description': personal_info.description,
+        'email': personal_info.email,
+        'phone': personal_info.phone,
+        'location': personal_info.location,
+        'github_url': personal_info.github_url,
+        'linkedin_url': personal_info.linkedin_url,
+    }
+    if personal_info.profile_image:
+        data['profile_image'] = personal_info.profile_image.url
+    return data
+
+
+def serialize_experience(exp: Experience) -> Dict[str, Any]:
+    data: Dict[str, Any] = {
+        'title': exp.title,
+        'company': exp.company,
+        'description': exp.description,
+        'start_date': exp.start_date.strftime('%Y-%m-%d'),
+        'is_current': exp.is_current,
+    }
+    if exp.end_date:
+        data['end_date'] = exp.end_date.strftime('%Y-%m-%d')
+    return data
+
+
+def serialize_skill_category(category: SkillCategory) -> Dict[str, Any]:
+    return {
+        'name': category.name,
+        'skills': [
+            {'name': skill.name, 'proficiency': skill.proficiency}
+            for skill in category.skills.all()
+        ],
+    }
+
+
+def serialize_project(project: Project) -> Dict[str, Any]:
+    data: Dict[str, Any] = {
+        'title': project.title,
+        'description': project.description,
+        'technologies': project.get_technologies_list(),
+        'live_url': project.live_url,
+        'github_url': project.github_url,
+    }
+    if project.image:
+        data['image'] = project.image.url
+    return data
+
+
+def build_payloads() -> Dict[str, Optional[Dict[str, Any]]]:
+    """Query and serialize every API payload"""
+    personal_info = PersonalInfo.objects.first()
+    experiences: List[Dict[str, Any]] = [
+        serialize_experience(exp) for exp in queries.experiences()
+    ]
+    # skill_categories() orders inside its Prefetch, so the prefetched rows
+    # are used as-is instead of one ordered query per category.
+    skill_categories = [
+        serialize_skill_category(c) for c in queries.skill_categories()
+    ]
+    projects = [
+        serialize_project(project) for project in queries.featured_projects()
+    ]
+    technologies = [
+        {'name': tech.name, 'key': tech.key, 'count': tech.count}
+        for tech in queries.technology_counts()
+    ]
+    personal_info_data = (
+        serialize_personal_info(personal_info) if personal_info else None
+    )
+    return {
+        'personal_info': personal_info_data,
+        'experiences': {'experiences': experiences},
+        'skills': {'skill_categories': skill_categories},
+        'projects': {'projects': projects},
+        'technologies': {'technologies': technologies},
+        'portfolio': {
+            'personal_info': personal_info_data,
+            'experiences': experiences,
+            'skill_categories': skill_categories,
+            'projects': projects,
+        },
+    }
+
+
+def snapshot_timeout() -> int:
+    return getattr(settings, 'PORTFOLIO_SNAPSHOT_TIMEOUT', 60 * 60 * 24)
+
+
+def encode(payload: Any) -> bytes:
+    return json.dumps(payload, cls=DjangoJSONEncoder).encode()
+
+
+def rebuild_snapshots(version: Optional[int] = None) -> Dict[str, bytes]:
+    """Build, encode and store every snapshot for a content version.
+
+    The conditional GET validators for each snapshot are computed at the
+    same time, so serving or revalidating a snapshot needs no queries.
+    """
+    if version is None:
+        version = get_content_version()
+    with timed('snapshot'):
+        for models in SNAPSHOT_MODELS.values():
+            content_state(*models, version=version)
+        snapshots = {
+            name: encode(payload) if payload is not None else MISSING
+            for name, payload in build_payloads().items()
+        }
+    store_many(
+        {
+            versioned_key('snapshot', name, version=version): data
+            for name, data in snapshots.items()
+        },
+        snapshot_timeout(),
+    )
+    return snapshots
+
+
+def get_snapshot(name: str) -> Optional[bytes]:
+    """Return the encoded snapshot ``name``, or None if it has no content"""
+    version = get_content_version()
+    data: bytes = get_or_build(
+        versioned_key('snapshot', name, version=version),
+        lambda: rebuild_snapshots(version)[name],
+        snapshot_timeout(),
+    )
+    return data or None
+
+
+# Shared response for ?tech= values that no featured project uses
+NO_PROJECTS = encode({'projects': []})
+
+
+def _technology_keys_key(version: int) -> str:
+    return versioned_key('technology-keys', version=version)
+
+
+def _technology_keys(snapshot: bytes) -> FrozenSet[str]:
+    return frozenset(
+        tech['key'] for tech in json.loads(snapshot)['technologies']
+    )
+
+
+def technology_keys() -> FrozenSet[str]:
+    """Keys of the technologies featured projects use, from the snapshot"""
+    return get_or_build(
+        _technology_keys_key(get_content_version()),
+        lambda: _technology_keys(get_snapshot('technologies')),
+        snapshot_timeout(),
+    )
+
+
+async def atechnology_keys() -> FrozenSet[str]:
+    """Async ``technology_keys``"""
+    async def build() -> FrozenSet[str]:
+        return _technology_keys(await aget_snapshot('technologies'))
+
+    return await aget_or_build(
+        _technology_keys_key(await aget_content_version()), build,
+        snapshot_timeout(),
+    )
+
+
+def _tech_key(tech: str, version: int) -> str:
+    digest = hashlib.md5(
+        tech.casefold().encode(), usedforsecurity=False
+    ).hexdigest()
+    return versioned_key('snapshot', 'projects', 'tech', digest, version=version)
+
+
+def build_projects_with_technology(tech: str) -> bytes:
+    return encode({'projects': [
+        serialize_project(project)
+        for project in queries.projects_with_technology(tech)
+    ]})
+
+
+def get_projects_with_technology(tech: str) -> bytes:
+    """Encoded ``projects`` payload filtered to one technology.
+
+    Only technologies in use get a cached payload of their own, so
+    arbitrary ``?tech=`` values can't fill the cache.
+    """
+    if tech.casefold() not in technology_keys():
+        return NO_PROJECTS
+    return get_or_build(
+        _tech_key(tech, get_content_version()),
+        lambda: build_projects_with_technology(tech),
+        snapshot_timeout(),
+    )
+
+
+async def aget_projects_with_technology(tech: str) -> bytes:
+    """Async ``get_projects_with_technology``"""
+    if tech.casefold() not in await atechnology_keys():
+        return NO_PROJECTS
+    return await aget_or_build(
+        _tech_key(tech, await aget_content_version()),
+        lambda: sync_to_async(build_projects_with_technology)(tech),
+        snapshot_timeout(),
+    )
+
+
+async def aget_snapshot(name: str) -> Optional[bytes]:
+    """Async ``get_snapshot``"""
+    version = await aget_content_version()
+
+    async def rebuild() -> bytes:
+        return (await sync_to_async(rebuild_snapshots)(version))[name]
+
+    data: bytes = await aget_or_build(
+        versioned_key('snapshot', name, version=version), rebuild,
+        snapshot_timeout(),
+    )
+    return data or None
@@ -0,0 +1,137 @@
+"""Work done once per process so the first request isn't the slow one.
+
+With ``PORTFOLIO_WARM_START`` enabled, ``wsgi.py``/``asgi.py`` call
+``warm()`` right after loading the application. It
+
+* compiles every template under ``templates/portfolio/`` into the cached
+  template loader,
+* builds the URL resolver and its reverse lookup tables (which imports
+  every view module),
+* requests the homepage and the portfolio API once, filling the page,
+  fragment and snapshot caches and the content validators.
+
+Under gunicorn with ``preload_app`` (see ``gunicorn.conf.py``) this runs
+once in the master. Workers are forked with the templates already
+compiled and, for the local-memory cache, the entries already present.
+The database connections it opened, and any psycopg pool, are closed
+afterwards so no worker inherits their sockets.
+``manage.py benchmark_cold_start`` measures the effect.
+"""
+import logging
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from django.conf import settings
+from django.db import connections
+from django.template import engines
+from django.test import Client
+from django.urls import get_resolver, reverse
+
+from .fragments import LAZY_SECTIONS
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_DIRECTORY = 'portfolio'
+
+
+def template_names() -> List[str]:
+    """Names of the templates under ``portfolio/`` in every template dir"""
+    names = set()
+    for engine in engines.all():
+        for directory in getattr(engine, 'template_dirs', ()):
+            root = Path(directory)
+            for path in (root / TEMPLATE_DIRECTORY).rglob('*.html'):
+                names.add(path.relative_to(root).as_posix())
+    return sorted(names)
+
+
+def warm_templates() -> int:
+    """Compile the portfolio templates; returns how many were loaded"""
+    names = template_names()
+    for engine in engines.all():
+        for name in names:
+            engine.get_template(name)
+    return len(names)
+
+
+def warm_urls() -> None:
+    resolver = get_resolver()
+    # Both are built lazily on first use
+    resolver.url_patterns
+    reverse('portfolio:home')
+
+
+def local_host() -> str:
+    """A host name ``ALLOWED_HOSTS`` accepts, for in-process requests"""
+    for host in settings.ALLOWED_HOSTS:
+        if host and '*' not in host and not host.startswith('.'):
+            return host
+    return 'localhost'
+
+
+def prime_urls() -> List[str]:
+    urls = [reverse('portfolio:home'), reverse('portfolio:api_portfolio')]
+    if getattr(settings, 'PORTFOLIO_LAZY_SECTIONS', False):
+        urls += [
+            reverse('portfolio:section_fragment', args=[section])
+            for section, _ in LAZY_SECTIONS
+        ]
+    return urls
+
+
+def prime_caches() -> None:
+    """Render the public pages once so their caches are filled"""
+    client = Client(HTTP_HOST=local_host())
+    secure = getattr(settings, 'SECURE_SSL_REDIRECT', False)
+    for url in prime_urls():
+        response = client.get(url, secure=secure)
+        if response.streaming:
+            # A streamed page is only cached once it has been sent
+            b''.join(response.streaming_content)
+        if response.status_code != 200:
+            logger.warning(
+                "Priming %s returned %s", url, response.status_code
+            )
+
+
+STEPS = (
+    ('templates', warm_templates),
+    ('urls', warm_urls),
+    ('caches', prime_caches),
+)
+
+
+def close_connections() -> None:
+    """Close every database connection, and the pools too.
+
+    ``close()`` only returns a pooled connection to its pool. A pool
+    opened in the gunicorn master would be inherited by every worker
+    without its maintenance threads, and workers would share its sockets.
+    """
+    for connection in connections.all(initialized_only=True):
+        connection.close()
+        if connection.settings_dict.get('OPTIONS', {}).get('pool'):
+            connection.close_pool()
+
+
+def warm() -> Dict[str, float]:
+    """Run every warm-up step; returns the time each took in ms.
+
+    A failing step (the database still asleep, say) is logged and skipped:
+    the process must start regardless.
+    """
+    timings = {}
+    for name, step in STEPS:
+        started = time.perf_counter()
+        try:
+            step()
+        except Exception:
+            logger.exception("Warm-up step %r failed", name)
+        timings[name] = (time.perf_counter() - started) * 1000
+    close_connections()
+    logger.info(
+        "Warm start: %s",
+        ', '.join(f'{name} {ms:.0f}ms' for name, ms in timings.items()),
+    )
+    return timings
@@ -0,0 +1,306 @@
+"""Static asset pipeline: minification, critical CSS and vendored scripts.
+
+``PortfolioStaticFilesStorage`` plugs into ``collectstatic``. Before
+WhiteNoise hashes and compresses the collected files it
+
+* minifies the app's own CSS and JS under ``portfolio/`` (conservatively:
+  comments and indentation only, so no parser is needed and nothing can
+  change meaning); admin and vendored files are left as shipped,
+* extracts the rules the first screen needs (navbar, hero, about) from
+  the main stylesheet into ``critical.css``, which ``base.html`` inlines.
+
+WhiteNoise then writes ``.gz``/``.br`` siblings and serves the hashed
+names with ``Cache-Control: max-age=315360000, public, immutable``.
+
+Third-party scripts (GSAP) are served from ``static/portfolio/vendor/``
+once fetched with ``manage.py vendor_static`` and from the CDN until then.
+"""
+import functools
+import re
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.files.base import ContentFile
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+STYLESHEET = 'portfolio/css/style.css'
+# Minification is limited to the app's own assets
+MINIFIED_PREFIX = 'portfolio/'
+VENDOR_PREFIX = 'portfolio/vendor/'
+CRITICAL_CSS = 'portfolio/css/critical.css'
+
+# Selector prefixes of above-the-fold rules
+CRITICAL_SELECTORS = (
+    ':root', '[data-theme', '*', 'html', 'body', '.scroll-indicator',
+    '.navbar', '.nav-', '.logo', '.theme-toggle', '.mobile-menu-btn',
+    '.section', '.container', '.hero', '.btn', '.about', '.profile-image',
+    '.floating-elements',
+)
+
+
+@dataclass(frozen=True)
+class VendorScript:
+    name: str
+    version: str
+    filename: str
+
+    @property
+    def path(self) -> str:
+        return f'portfolio/vendor/{self.name}/{self.version}/{self.filename}'
+
+    @property
+    def cdn_url(self) -> str:
+        return (
+            f'https://cdnjs.cloudflare.com/ajax/libs/'
+            f'{self.name}/{self.version}/{self.filename}'
+        )
+
+
+GSAP_VERSION = '3.11.4'
+
+VENDOR_SCRIPTS = {
+    'gsap': VendorScript('gsap', GSAP_VERSION, 'gsap.min.js'),
+    'scrolltrigger': VendorScript('gsap', GSAP_VERSION, 'ScrollTrigger.min.js'),
+}
+
+
+# Strings (either quote), comments, or anything else up to the next one
+_CSS_TOKENS = re.compile(
+    r'''("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')|(/\*.*?\*/)|([^"'/]+|/)''',
+    re.S,
+)
+
+
+def minify_css(css: str) -> str:
+    """Strip comments and redundant whitespace from a stylesheet"""
+    out = []
+    for string, comment, code in _CSS_TOKENS.findall(css):
+        if string:
+            out.append(string)
+        elif code:
+            code = re.sub(r'\s+', ' ', code)
+            code = re.sub(r'\s*([{};,>])\s*', r'\1', code)
+            # Only after ':' -- "a :hover" and "a:hover" differ
+            code = re.sub(r':\s+', ':', code)
+            out.append(code)
+    return re.sub(r';}', '}', ''.join(out)).strip()
+
+
+# Preceding characters after which "/" starts a regex literal, not division
+_REGEX_CONTEXT = set('(,=:[!&|?{};+-*%<>~^') | {''}
+
+
+def minify_js(js: str) -> str:
+    """Strip comments, indentation and blank lines from a script.
+
+    Line breaks are kept so automatic semicolon insertion behaves exactly
+    as before; strings, template literals and regex literals are copied
+    verbatim, including the line breaks and indentation inside them.
+    """
+    # (text, is_literal) pairs; whitespace is only collapsed in code
+    out: List[Tuple[str, bool]] = []
+    i, n = 0, len(js)
+
+    def last_significant() -> str:
+        for chunk, _ in reversed(out):
+            stripped = chunk.rstrip()
+            if stripped:
+                return stripped[-1]
+        return ''
+
+    while i < n:
+        c = js[i]
+        if c in '"\'`':
+            j = i + 1
+            while j < n and js[j] != c:
+                j += 2 if js[j] == '\\' else 1
+            out.append((js[i:j + 1], True))
+            i = j + 1
+        elif js.startswith('//', i):
+            j = js.find('\n', i)
+            i = n if j == -1 else j
+        elif js.startswith('/*', i):
+            j = js.find('*/', i + 2)
+            i = n if j == -1 else j + 2
+        elif c == '/' and last_significant() in _REGEX_CONTEXT:
+            j, in_class = i + 1, False
+            while j < n and js[j] != '\n':
+                if js[j] == '\\':
+                    j += 2
+                    continue
+                if js[j] == '[':
+                    in_class = True
+                elif js[j] == ']':
+                    in_class = False
+                elif js[j] == '/' and not in_class:
+                    break
+                j += 1
+            out.append((js[i:j + 1], True))
+            i = j + 1
+        else:
+            j = i + 1
+            while j < n and js[j] not in '"\'`/':
+                j += 1
+            out.append((js[i:j], False))
+            i = j
+
+    minified: List[str] = []
+    code: List[str] = []
+
+    def flush() -> None:
+        # Trailing spaces, blank lines and the next line's indentation
+        minified.append(re.sub(r'[ \t\r]*\n\s*', '\n', ''.join(code)))
+        code.clear()
+
+    for chunk, is_literal in out:
+        if is_literal:
+            flush()
+            minified.append(chunk)
+        else:
+            code.append(chunk)
+    flush()
+    return ''.join(minified).strip() + '\n'
+
+
+def _blocks(css: str) -> Iterator[Tuple[str, str]]:
+    """``(prelude, body)`` of each top-level rule in minified ``css``"""
+    i, n = 0, len(css)
+    while i < n:
+        start = css.find('{', i)
+        if start == -1:
+            return
+        depth, j, quote = 1, start + 1, None
+        while j < n and depth:
+            c = css[j]
+            if quote:
+                if c == '\\':
+                    j += 1
+                elif c == quote:
+                    quote = None
+            elif c in '"\'':
+                quote = c
+            elif c == '{':
+                depth += 1
+            elif c == '}':
+                depth -= 1
+            j += 1
+        yield css[i:start].strip(), css[start + 1:j - 1]
+        i = j
+
+
+def _is_critical(selectors: str) -> bool:
+    return any(
+        selector.strip().startswith(CRITICAL_SELECTORS)
+        for selector in selectors.split(',')
+    )
+
+
+def extract_critical_css(css: str) -> str:
+    """Rules of minified ``css`` needed to paint the first screen.
+
+    Keeps rules with a selector starting with one of CRITICAL_SELECTORS,
+    media queries reduced to such rules, and the keyframes they animate.
+    """
+    rules: List[str] = []
+    keyframes = {}
+    for prelude, body in _blocks(css):
+        if prelude.startswith('@keyframes'):
+            keyframes[prelude.split()[1]] = f'{prelude}{{{body}}}'
+        elif prelude.startswith('@media'):
+            inner = extract_critical_css(body)
+            if inner:
+                rules.append(f'{prelude}{{{inner}}}')
+        elif not prelude.startswith('@') and _is_critical(prelude):
+            rules.append(f'{prelude}{{{body}}}')
+    critical = ''.join(rules)
+    used = [
+        frames for name, frames in keyframes.items()
+        if re.search(rf'animation(?:-name)?:[^;}}]*\b{re.escape(name)}\b', critical)
+    ]
+    return critical + ''.join(used)
+
+
+class PortfolioStaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """WhiteNoise's compressed manifest storage plus minification and
+    critical CSS extraction"""
+
+    minifiers = {'.css': minify_css, '.js': minify_js}
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            self.minify(paths)
+            self.write_critical_css(paths)
+        yield from super().post_process(paths, dry_run, **options)
+
+    def minify(self, paths) -> None:
+        for name, (storage, path) in list(paths.items()):
+            suffix = name[name.rfind('.'):]
+            if suffix not in self.minifiers or not self.minifies(name):
+                continue
+            with storage.open(path) as source:
+                text = source.read().decode('utf-8')
+            self._replace(name, self.minifiers[suffix](text))
+            # Hash and compress the minified copy, not the source file
+            paths[name] = (self, name)
+
+    @staticmethod
+    def minifies(name: str) -> bool:
+        """Only the app's own assets: admin and vendored files are
+        collected as shipped"""
+        return (
+            name.startswith(MINIFIED_PREFIX)
+            and not name.startswith(VENDOR_PREFIX)
+            and '.min.' not in name
+        )
+
+    def write_critical_css(self, paths) -> None:
+        if STYLESHEET not in paths:
+            return
+        storage, path = paths[STYLESHEET]
+        with storage.open(path) as source:
+            css = source.read().decode('utf-8')
+        self._replace(CRITICAL_CSS, extract_critical_css(css))
+        paths[CRITICAL_CSS] = (self, CRITICAL_CSS)
+
+    def _replace(self, name: str, content: str) -> None:
+        if self.exists(name):
+            self.delete(name)
+        self._save(name, ContentFile(content.encode('utf-8')))
+
+
+def _load_critical_css() -> str:
+    try:
+        with staticfiles_storage.open(CRITICAL_CSS) as collected:
+            return collected.read().decode('utf-8')
+    except (OSError, ValueError):
+        pass
+    # Not collected (development): derive it from the source stylesheet
+    path = finders.find(STYLESHEET)
+    if not path:
+        return ''
+    with open(path, encoding='utf-8') as source:
+        return extract_critical_css(minify_css(source.read()))
+
+
+_cached_critical_css = functools.lru_cache(maxsize=None)(_load_critical_css)
+
+
+def critical_css() -> str:
+    """Critical CSS to inline; read once per process outside DEBUG"""
+    if settings.DEBUG:
+        return _load_critical_css()
+    return _cached_critical_css()
+
+
+@functools.lru_cache(maxsize=None)
+def _vendored(path: str) -> bool:
+    return bool(finders.find(path)) or staticfiles_storage.exists(path)
+
+
+def vendor_script_path(name: str) -> Optional[str]:
+    """Static path of the vendored copy of ``name``, if it was fetched"""
+    script = VENDOR_SCRIPTS[name]
+    return script.path if _vendored(script.path) else None
@@ -0,0 +1,107 @@
+"""Streamed rendering of the portfolio homepage.
+
+With ``PORTFOLIO_STREAM_HOME`` enabled, a homepage that isn't cached yet
+is sent as it renders: first the ``<head>`` (so the browser starts on the
+stylesheet and scripts), navbar, hero and about sections, then each
+below-the-fold section as its queries finish, then the closing markup.
+The sections are the cached fragments from ``portfolio.fragments``, and
+the assembled page is stored in the page cache once the last chunk has
+gone out, so later requests get a plain cached response.
+
+Once the first chunk is sent the status code can't change. An error in a
+later section is logged, the rest of the page is replaced by a short
+notice and the document is closed properly; that page is not cached.
+"""
+import logging
+from typing import Any, AsyncIterator, Dict, Iterator, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.template.loader import render_to_string
+
+from .cache import astore, page_cache_timeout, store
+from .fragments import LAZY_SECTIONS, aget_fragment, get_fragment
+
+logger = logging.getLogger(__name__)
+
+STREAM_MARKER = '<!--portfolio:stream-->'
+
+
+def streaming_enabled(lazy: bool) -> bool:
+    # Lazy pages leave the sections to the browser; nothing to stream
+    return getattr(settings, 'PORTFOLIO_STREAM_HOME', False) and not lazy
+
+
+def split_shell(html: str) -> Tuple[str, str]:
+    """Split the rendered page shell around the streamed sections"""
+    head, _, tail = html.partition(STREAM_MARKER)
+    return head, tail
+
+
+def render_shell(request, context: Dict[str, Any]) -> Tuple[str, str]:
+    html = render_to_string(
+        'portfolio/portfolio.html', {**context, 'streaming': True}, request
+    )
+    return split_shell(html)
+
+
+def error_notice() -> str:
+    return render_to_string('portfolio/components/stream_error.html')
+
+
+def _response(content) -> StreamingHttpResponse:
+    response = StreamingHttpResponse(content)
+    # Ask nginx and similar proxies not to buffer the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def _stream(head: str, tail: str, cache_key: str) -> Iterator[str]:
+    chunks = [head]
+    yield head
+    try:
+        for section, _ in LAZY_SECTIONS:
+            chunk = get_fragment(section)
+            chunks.append(chunk)
+            yield chunk
+    except Exception:
+        logger.exception("Streaming the portfolio page failed")
+        yield error_notice()
+        yield tail
+        return
+    yield tail
+    chunks.append(tail)
+    store(cache_key, ''.join(chunks), page_cache_timeout())
+
+
+async def _astream(head: str, tail: str, cache_key: str) -> AsyncIterator[str]:
+    chunks = [head]
+    yield head
+    try:
+        for section, _ in LAZY_SECTIONS:
+            chunk = await aget_fragment(section)
+            chunks.append(chunk)
+            yield chunk
+    except Exception:
+        logger.exception("Streaming the portfolio page failed")
+        yield await sync_to_async(error_notice)()
+        yield tail
+        return
+    yield tail
+    chunks.append(tail)
+    await astore(cache_key, ''.join(chunks), page_cache_timeout())
+
+
+def stream_page(head: str, tail: str, cache_key: str) -> StreamingHttpResponse:
+    """Response streaming the page under WSGI"""
+    return _response(_stream(head, tail, cache_key))
+
+
+def astream_page(head: str, tail: str, cache_key: str) -> StreamingHttpResponse:
+    """Response streaming the page under ASGI.
+
+    Django only streams an async iterator asynchronously; a sync one would
+    be buffered in full first.
+    """
+    return _response(_astream(head, tail, cache_key))
@@ -0,0 +1,34 @@
+"""The job tasks behind ``portfolio.jobs``; imported by the app config"""
+from django.apps import apps
+from django.db import transaction
+
+from .images import update_derivatives
+from .jobs import task
+from .search import rebuild_index
+from .signals import IMAGE_FIELDS, content_changed
+from .snapshots import rebuild_snapshots
+
+
+@task('rebuild_snapshots')
+def rebuild_snapshots_task():
+    # For whatever version is current by the time the job runs, which
+    # covers every change merged into it
+    rebuild_snapshots()
+
+
+@task('image_derivatives')
+def image_derivatives(model_label: str, pk: int):
+    model = apps.get_model(model_label)
+    instance = model._default_manager.filter(pk=pk).first()
+    if instance is None:
+        return  # Deleted since
+    field_name, variants_field = IMAGE_FIELDS[model]
+    if update_derivatives(instance, field_name, variants_field):
+        # Saved with update(), which sends no signals
+        content_changed()
+
+
+@task('rebuild_search_index')
+def rebuild_search_index():
+    with transaction.atomic():
+        rebuild_index()
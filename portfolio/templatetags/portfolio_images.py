@@ -0,0 +1,49 @@
+from django import template
+from django.core.files.storage import default_storage
+from django.utils.html import format_html, format_html_join
+
+register = template.Library()
+
+
+def _srcset(candidates):
+    return ', '.join(
+        f'{default_storage.url(name)} {width}w' for name, width in candidates
+    )
+
+
+@register.simple_tag
+def responsive_image(image, variants, alt='', sizes='100vw'):
+    """Render ``image`` as a lazy-loaded <picture> using its derivatives.
+
+    ``variants`` is the manifest written by ``portfolio.images``. Without
+    one (derivatives not generated yet) the original upload is used.
+    """
+    if not image:
+        return ''
+    if not variants or variants.get('source') != image.name:
+        return format_html(
+            '<img src="{}" alt="{}" loading="lazy" decoding="async">',
+            image.url, alt,
+        )
+    sources = variants['sources']
+    fallback = sources.get('image/jpeg', [])
+    modern = format_html_join(
+        '', '<source type="{}" srcset="{}" sizes="{}">',
+        (
+            (mime, _srcset(candidates), sizes)
+            for mime, candidates in sources.items()
+            if mime != 'image/jpeg'
+        ),
+    )
+    # Smallest JPEG that is at least 640px wide for browsers without srcset.
+    src_name = next(
+        (name for name, width in fallback if width >= 640),
+        fallback[-1][0] if fallback else image.name,
+    )
+    return format_html(
+        '<picture>{}<img src="{}" srcset="{}" sizes="{}" width="{}" '
+        'height="{}" alt="{}" loading="lazy" decoding="async" '
+        'style="background:url({}) center/cover no-repeat"></picture>',
+        modern, default_storage.url(src_name), _srcset(fallback), sizes,
+        variants['width'], variants['height'], alt, variants['placeholder'],
+    )
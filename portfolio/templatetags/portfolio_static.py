@@ -0,0 +1,37 @@
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+from ..staticfiles import VENDOR_SCRIPTS, critical_css, vendor_script_path
+
+register = template.Library()
+
+
+@register.simple_tag
+def inline_critical_css():
+    """Inline the above-the-fold rules extracted from the main stylesheet"""
+    css = critical_css()
+    if not css:
+        return ''
+    # Built from our own stylesheet; "</" can't appear in it unescaped
+    return mark_safe('<style>' + css.replace('</', '<\\/') + '</style>')
+
+
+@register.simple_tag
+def vendor_script(name):
+    """Deferred <script> for a vendored library, or its CDN copy if the
+    library hasn't been fetched with ``manage.py vendor_static``"""
+    path = vendor_script_path(name)
+    src = static(path) if path else VENDOR_SCRIPTS[name].cdn_url
+    return format_html('<script src="{}" defer></script>', src)
+
+
+@register.simple_tag
+def cdn_preconnect():
+    """Preconnect to the CDN only while some script is still served from it"""
+    if all(vendor_script_path(name) for name in VENDOR_SCRIPTS):
+        return ''
+    return mark_safe(
+        '<link rel="preconnect" href="https://cdnjs.cloudflare.com">'
+    )
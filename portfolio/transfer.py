@@ -0,0 +1,477 @@
+"""Bulk import and export of portfolio content.
+
+The portfolio is exchanged as a flat sequence of records, one per object,
+each tagged with its ``model``::
+
+    {"model": "skill", "category": "Backend", "name": "Django", ...}
+
+Objects are matched by natural key, not primary key, so a file exported
+from one database imports into another, and importing it again updates
+rows in place:
+
+==============  =========================
+personal_info   email
+skill_category  name
+skill           category, name
+experience      company, title, start_date
+project         title
+==============  =========================
+
+A skill refers to its category by name. A category that doesn't exist
+yet is created.
+
+Records are parsed one at a time: JSON arrays and JSON Lines are decoded
+incrementally and CSV row by row. ``import_records`` then writes each
+model with ``bulk_create``/``bulk_update`` inside a single transaction.
+Bulk writes skip model signals, so technology tags, the search index and
+the content version are updated once at the end rather than once per row.
+Uploaded files (profile image, resume, project images) aren't exported
+or imported.
+"""
+import csv
+import json
+import os
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import (
+    Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple,
+    Type,
+)
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
+from django.utils import timezone
+
+from .models import (
+    PersonalInfo, Experience, SkillCategory, Skill, Project,
+    parse_technologies, sync_technology_tags,
+)
+from .search import rebuild_index
+from .signals import content_changed, schedule_on_commit
+
+try:
+    import yaml
+except ImportError:  # pragma: no cover - optional dependency
+    yaml = None
+
+BATCH_SIZE = 500
+READ_CHUNK = 64 * 1024
+
+
+class ImportDataError(ValueError):
+    """A record that can't be imported, or a file that can't be parsed"""
+
+
+@dataclass(frozen=True)
+class Spec:
+    model: Type[models.Model]
+    # Exchanged fields, natural key included
+    fields: Tuple[str, ...]
+    natural_key: Tuple[str, ...]
+    # Foreign key -> (related model, its natural key field)
+    related: Dict[str, Tuple[Type[models.Model], str]] = field(
+        default_factory=dict
+    )
+    # Fields the model derives on save(), which bulk writes bypass
+    derived: Dict[str, Callable[[Any], Any]] = field(default_factory=dict)
+
+
+# In write order: categories before the skills that refer to them
+SPECS: Dict[str, Spec] = {
+    'personal_info': Spec(
+        PersonalInfo,
+        fields=(
+            'name', 'title', 'description', 'email', 'phone', 'location',
+            'github_url', 'linkedin_url',
+        ),
+        natural_key=('email',),
+    ),
+    'skill_category': Spec(
+        SkillCategory, fields=('name', 'order'), natural_key=('name',),
+    ),
+    'skill': Spec(
+        Skill,
+        fields=('category', 'name', 'proficiency', 'order'),
+        natural_key=('category', 'name'),
+        related={'category': (SkillCategory, 'name')},
+    ),
+    'experience': Spec(
+        Experience,
+        fields=(
+            'title', 'company', 'description', 'start_date', 'end_date',
+            'is_current', 'order',
+        ),
+        natural_key=('company', 'title', 'start_date'),
+    ),
+    'project': Spec(
+        Project,
+        fields=(
+            'title', 'description', 'live_url', 'github_url', 'technologies',
+            'order', 'is_featured',
+        ),
+        natural_key=('title',),
+        derived={
+            'technology_list': lambda p: parse_technologies(p.technologies),
+        },
+    ),
+}
+
+# Every field of every model, for the shared CSV header
+CSV_FIELDS: List[str] = ['model'] + list(dict.fromkeys(
+    name for spec in SPECS.values() for name in spec.fields
+))
+
+
+# "app_label.Model" -> record model name
+LABELS = {spec.model._meta.label: name for name, spec in SPECS.items()}
+
+
+def spec_name(model: Type[models.Model]) -> str:
+    return LABELS[model._meta.label]
+
+
+# Export
+
+def _natural_value(obj, spec: Spec, name: str):
+    value = getattr(obj, name)
+    if name in spec.related:
+        value = getattr(value, spec.related[name][1])
+    return value
+
+
+def export_records(
+    querysets: Optional[Dict[str, models.QuerySet]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Records for the objects in ``querysets`` (by default all content)"""
+    for name, spec in SPECS.items():
+        if querysets is None:
+            queryset = spec.model.objects.all()
+        elif name in querysets:
+            queryset = querysets[name]
+        else:
+            continue
+        queryset = queryset.select_related(*spec.related).order_by('pk')
+        for obj in queryset.iterator(chunk_size=BATCH_SIZE):
+            record = {'model': name}
+            for field_name in spec.fields:
+                record[field_name] = _natural_value(obj, spec, field_name)
+            yield record
+
+
+def write_json(records: Iterable[Dict[str, Any]], stream: TextIO) -> None:
+    separator = '[\n'
+    for record in records:
+        stream.write(separator)
+        stream.write(json.dumps(record, cls=DjangoJSONEncoder))
+        separator = ',\n'
+    stream.write('[]\n' if separator == '[\n' else '\n]\n')
+
+
+def write_jsonl(records: Iterable[Dict[str, Any]], stream: TextIO) -> None:
+    for record in records:
+        stream.write(json.dumps(record, cls=DjangoJSONEncoder) + '\n')
+
+
+def write_yaml(records: Iterable[Dict[str, Any]], stream: TextIO) -> None:
+    _require_yaml()
+    empty = True
+    for record in records:
+        # One single-item list per record; concatenated they form one list
+        stream.write(
+            yaml.safe_dump([record], sort_keys=False, allow_unicode=True)
+        )
+        empty = False
+    if empty:
+        stream.write('[]\n')
+
+
+def write_csv(records: Iterable[Dict[str, Any]], stream: TextIO) -> None:
+    writer = csv.DictWriter(stream, CSV_FIELDS)
+    writer.writeheader()
+    for record in records:
+        writer.writerow({
+            key: '' if value is None else value
+            for key, value in record.items()
+        })
+
+
+# Import
+
+def _fill(stream: TextIO, buffer: str) -> Tuple[str, bool]:
+    chunk = stream.read(READ_CHUNK)
+    return buffer + chunk, bool(chunk)
+
+
+def read_json(stream: TextIO) -> Iterator[Dict[str, Any]]:
+    """Records of a JSON array or of JSON Lines, decoded one at a time"""
+    decoder = json.JSONDecoder()
+    buffer, more = '', True
+    while not buffer.lstrip() and more:
+        buffer, more = _fill(stream, buffer)
+    buffer = buffer.lstrip()
+    if not buffer:
+        return
+    # An array is "[rec, rec]"; JSON Lines is "rec\nrec"
+    in_array = buffer.startswith('[')
+    if in_array:
+        buffer = buffer[1:]
+    expect_value = True
+    while True:
+        buffer = buffer.lstrip()
+        if not buffer:
+            if not more:
+                if in_array:
+                    raise ImportDataError("Unterminated JSON array")
+                return
+            buffer, more = _fill(stream, buffer)
+            continue
+        if in_array and buffer[0] == ']':
+            return
+        if in_array and not expect_value:
+            if buffer[0] != ',':
+                raise ImportDataError("Expected ',' between JSON records")
+            buffer, expect_value = buffer[1:], True
+            continue
+        try:
+            record, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError as exc:
+            if not more:
+                raise ImportDataError(f"Invalid JSON: {exc}") from None
+            # The record continues in the next chunk
+            buffer, more = _fill(stream, buffer)
+            continue
+        buffer, expect_value = buffer[end:], False
+        yield record
+
+
+def read_yaml(stream: TextIO) -> Iterator[Dict[str, Any]]:
+    """Records of a YAML list (parsed whole, unlike the other formats)"""
+    _require_yaml()
+    try:
+        records = yaml.safe_load(stream)
+    except yaml.YAMLError as exc:
+        raise ImportDataError(f"Invalid YAML: {exc}") from None
+    if records is None:
+        return iter(())
+    if not isinstance(records, list):
+        raise ImportDataError("Expected a YAML list of records")
+    return iter(records)
+
+
+def read_csv(stream: TextIO) -> Iterator[Dict[str, Any]]:
+    for row in csv.DictReader(stream):
+        # Columns of the other models are empty
+        yield {
+            key: value for key, value in row.items()
+            if value not in ('', None)
+        }
+
+
+def _require_yaml() -> None:
+    if yaml is None:
+        raise ImportDataError("YAML support needs PyYAML installed")
+
+
+@dataclass(frozen=True)
+class Format:
+    read: Callable[[TextIO], Iterator[Dict[str, Any]]]
+    write: Callable[[Iterable[Dict[str, Any]], TextIO], None]
+    content_type: str
+
+
+FORMATS: Dict[str, Format] = {
+    'json': Format(read_json, write_json, 'application/json'),
+    'jsonl': Format(read_json, write_jsonl, 'application/x-ndjson'),
+    'yaml': Format(read_yaml, write_yaml, 'application/yaml'),
+    'csv': Format(read_csv, write_csv, 'text/csv'),
+}
+
+EXTENSIONS = {'.yml': 'yaml', '.ndjson': 'jsonl'}
+
+
+def guess_format(filename: str, default: str = 'json') -> str:
+    extension = os.path.splitext(filename)[1].lower()
+    name = EXTENSIONS.get(extension, extension[1:])
+    return name if name in FORMATS else default
+
+
+def _clean_value(model_field, value):
+    if value is None or value == '':
+        if model_field.null:
+            return None
+        if model_field.has_default():
+            return model_field.get_default()
+    if isinstance(model_field, models.BooleanField) and isinstance(value, str):
+        value = value.strip().lower() in ('1', 'true', 't', 'yes', 'y')
+    return model_field.clean(value, None)
+
+
+def clean_record(data: Dict[str, Any],
+                 number: int) -> Tuple[str, Dict[str, Any]]:
+    """``(model name, field values)`` of one parsed record"""
+    if not isinstance(data, dict):
+        raise ImportDataError(f"Record {number}: expected an object")
+    name = data.get('model')
+    if name not in SPECS:
+        raise ImportDataError(f"Record {number}: unknown model {name!r}")
+    spec = SPECS[name]
+    unknown = set(data) - set(spec.fields) - {'model'}
+    if unknown:
+        raise ImportDataError(
+            f"Record {number}: unknown fields {', '.join(sorted(unknown))}"
+        )
+    values = {}
+    for field_name in spec.fields:
+        value = data.get(field_name)
+        if field_name in spec.related:
+            value = str(value or '').strip()
+            if not value:
+                raise ImportDataError(
+                    f"Record {number}: {field_name} is required"
+                )
+            values[field_name] = value
+            continue
+        try:
+            values[field_name] = _clean_value(
+                spec.model._meta.get_field(field_name), value
+            )
+        except ValidationError as exc:
+            raise ImportDataError(
+                f"Record {number}: {field_name}: {' '.join(exc.messages)}"
+            ) from None
+    return name, values
+
+
+@dataclass
+class ImportReport:
+    created: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    updated: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    unchanged: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    deleted: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+
+    @property
+    def changed(self) -> bool:
+        return any(
+            sum(counts.values())
+            for counts in (self.created, self.updated, self.deleted)
+        )
+
+    def lines(self) -> List[str]:
+        return [
+            f"{name}: {self.created[name]} created, "
+            f"{self.updated[name]} updated, {self.unchanged[name]} unchanged, "
+            f"{self.deleted[name]} deleted"
+            for name in SPECS
+            if self.created[name] or self.updated[name]
+            or self.unchanged[name] or self.deleted[name]
+        ]
+
+
+def _related_objects(spec: Spec, rows, report: ImportReport):
+    """Related objects by natural key, creating any that are missing"""
+    resolved = {}
+    for field_name, (model, key) in spec.related.items():
+        wanted = {values[field_name] for values in rows}
+        found = {}
+        queryset = model.objects.filter(**{f'{key}__in': wanted})
+        for obj in queryset.order_by('pk'):
+            found.setdefault(getattr(obj, key), obj)
+        missing = [
+            model(**{key: value}) for value in wanted if value not in found
+        ]
+        if missing:
+            model.objects.bulk_create(missing)
+            report.created[spec_name(model)] += len(missing)
+            found.update((getattr(obj, key), obj) for obj in missing)
+        resolved[field_name] = found
+    return resolved
+
+
+def _write(name: str, rows: Dict[tuple, Dict[str, Any]], now,
+           batch_size: int, report: ImportReport) -> List[models.Model]:
+    """Create or update the rows of one model; returns every object written"""
+    spec = SPECS[name]
+    if not rows:
+        return []
+    existing = {}
+    for obj in spec.model.objects.select_related(*spec.related).order_by('pk'):
+        key = tuple(_natural_value(obj, spec, f) for f in spec.natural_key)
+        existing.setdefault(key, obj)
+    related = _related_objects(spec, rows.values(), report)
+
+    to_create, to_update, kept = [], [], []
+    for key, values in rows.items():
+        obj = existing.get(key)
+        if obj is None:
+            obj = spec.model()
+            to_create.append(obj)
+        changed = False
+        for field_name, value in values.items():
+            if field_name in spec.related:
+                value = related[field_name][value]
+            if obj.pk is None or getattr(obj, field_name) != value:
+                setattr(obj, field_name, value)
+                changed = True
+        for field_name, derive in spec.derived.items():
+            setattr(obj, field_name, derive(obj))
+        if obj.pk is not None:
+            if changed:
+                to_update.append(obj)
+            else:
+                report.unchanged[name] += 1
+        obj.updated_at = now
+        kept.append(obj)
+
+    spec.model.objects.bulk_create(to_create, batch_size=batch_size)
+    spec.model.objects.bulk_update(
+        to_update, [*spec.fields, *spec.derived, 'updated_at'],
+        batch_size=batch_size,
+    )
+    report.created[name] += len(to_create)
+    report.updated[name] += len(to_update)
+    return kept
+
+
+def import_records(records: Iterable[Dict[str, Any]], prune: bool = False,
+                   dry_run: bool = False,
+                   batch_size: int = BATCH_SIZE) -> ImportReport:
+    """Create or update portfolio content from ``records``.
+
+    Later records win over earlier ones with the same natural key. With
+    ``prune``, objects missing from the file are deleted, but only for
+    models the file has records of. Everything happens in one
+    transaction; ``dry_run`` rolls it back after counting.
+    """
+    pending: Dict[str, Dict[tuple, Dict[str, Any]]] = {
+        name: {} for name in SPECS
+    }
+    for number, data in enumerate(records, 1):
+        name, values = clean_record(data, number)
+        spec = SPECS[name]
+        pending[name][tuple(values[f] for f in spec.natural_key)] = values
+
+    report = ImportReport()
+    now = timezone.now()
+    with transaction.atomic():
+        written = {
+            name: _write(name, rows, now, batch_size, report)
+            for name, rows in pending.items()
+        }
+        if prune:
+            # Children first, so cascades don't count as their own deletes
+            for name in reversed(SPECS):
+                if pending[name]:
+                    _, deleted = SPECS[name].model.objects.exclude(
+                        pk__in=[obj.pk for obj in written[name]]
+                    ).delete()
+                    for label, count in deleted.items():
+                        if label in LABELS:
+                            report.deleted[LABELS[label]] += count
+        if report.changed:
+            sync_technology_tags(written['project'])
+            rebuild_index()
+            schedule_on_commit(content_changed)
+        if dry_run:
+            transaction.set_rollback(True)
+    return report
@@ -1,13 +1,23 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
 app_name = 'portfolio'
 
+if getattr(settings, 'PORTFOLIO_ASYNC_VIEWS', False):
+    from . import async_views as public_views
+else:
+    public_views = views
+
 urlpatterns = [
-    path('', views.portfolio_home, name='home'),
+    path('', public_views.portfolio_home, name='home'),
+    path('fragments/<slug:section>/', public_views.section_fragment, name='section_fragment'),
     path('download-resume/', views.download_resume, name='download_resume'),
-    path('api/personal-info/', views.api_personal_info, name='api_personal_info'),
-    path('api/experiences/', views.api_experiences, name='api_experiences'),
-    path('api/skills/', views.api_skills, name='api_skills'),
-    path('api/projects/', views.api_projects, name='api_projects'),
+    path('api/personal-info/', public_views.api_personal_info, name='api_personal_info'),
+    path('api/experiences/', public_views.api_experiences, name='api_experiences'),
+    path('api/skills/', public_views.api_skills, name='api_skills'),
+    path('api/projects/', public_views.api_projects, name='api_projects'),
+    path('api/technologies/', public_views.api_technologies, name='api_technologies'),
+    path('api/portfolio/', public_views.api_portfolio, name='api_portfolio'),
+    path('api/search/', public_views.api_search, name='api_search'),
 ]
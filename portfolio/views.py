@@ -1,31 +1,77 @@
 from django.shortcuts import render
-from django.http import JsonResponse, HttpResponse
+from django.http import Http404, JsonResponse, HttpResponse
+from django.template.loader import render_to_string
+from django.utils.cache import add_never_cache_headers
 import os
-from typing import List, Dict, Any, Optional
-from .models import PersonalInfo, Experience, SkillCategory, Project
+from typing import Dict, Any, Optional
+from . import queries
+from .cache import get_or_build, page_cache_key, page_cache_timeout, peek
+from .compression import repeats
+from .conditional import conditional_content
+from .downloads import serve_file
+from .fragments import (
+    LAZY_SECTIONS, SECTIONS, get_fragment, lazy_sections_enabled,
+)
+from .models import PersonalInfo
+from .pagination import PaginationError, get_page, wants_page
+from .search import get_results, parse_limit
+from .snapshots import (
+    SNAPSHOT_MODELS, get_projects_with_technology, get_snapshot,
+)
+from .streaming import render_shell, stream_page, streaming_enabled
 
 
+@conditional_content(*SNAPSHOT_MODELS['portfolio'])
 def portfolio_home(request):
     """Main portfolio view that renders the complete portfolio page"""
+    # Resolve the key before touching the database: an edit committed while
+    # we render bumps the version, so this render can't shadow it.
+    lazy = lazy_sections_enabled(request)
+    cache_key = page_cache_key(request, variant='lazy' if lazy else '')
+
+    if streaming_enabled(lazy):
+        html: Optional[str] = peek(cache_key)
+        if html is not None:
+            return repeats(HttpResponse(html))
+        try:
+            # The shell holds only the above-the-fold sections
+            head, tail = render_shell(request, queries.home_context(lazy=True))
+        except Exception:
+            return fallback_home(request)
+        return stream_page(head, tail, cache_key)
+
+    def render_page() -> str:
+        context: Dict[str, Any] = queries.home_context(lazy=lazy)
+        if lazy:
+            context['lazy_sections'] = LAZY_SECTIONS
+        return render_to_string('portfolio/portfolio.html', context, request)
+
     try:
-        context: Dict[str, Any] = {
-            'personal_info': PersonalInfo.objects.first(),
-            'experiences': Experience.objects.all().order_by('-start_date'),
-            'skill_categories': SkillCategory.objects.prefetch_related('skills').order_by(
-                'order'
-            ),
-            'projects': Project.objects.filter(is_featured=True).order_by('order'),
-        }
-        return render(request, 'portfolio/portfolio.html', context)
+        html = get_or_build(cache_key, render_page, page_cache_timeout())
     except Exception:
-        # Fallback to simple template if there's an issue
-        context: Dict[str, Any] = {
-            'personal_info': None,
-            'experiences': [],
-            'skill_categories': [],
-            'projects': [],
-        }
-        return render(request, 'portfolio/simple.html', context)
+        return fallback_home(request)
+    return repeats(HttpResponse(html))
+
+
+@conditional_content(*SNAPSHOT_MODELS['portfolio'])
+def section_fragment(request, section):
+    """HTML of one below-the-fold section, loaded by main.js"""
+    if section not in SECTIONS:
+        raise Http404('Unknown section')
+    return repeats(HttpResponse(get_fragment(section)))
+
+
+def fallback_home(request):
+    """Simple page used when the portfolio content can't be loaded"""
+    context: Dict[str, Any] = {
+        'personal_info': None,
+        'experiences': [],
+        'skill_categories': [],
+        'projects': [],
+    }
+    response = render(request, 'portfolio/simple.html', context)
+    add_never_cache_headers(response)
+    return response
 
 
 def download_resume(request):
@@ -34,86 +80,81 @@ def download_resume(request):
     if personal_info and personal_info.resume_file:
         file_path = personal_info.resume_file.path
         if os.path.exists(file_path):
-            with open(file_path, 'rb') as f:
-                response = HttpResponse(
-                    f.read(), content_type='application/pdf'
-                )
-                response['Content-Disposition'] = (
-                    f'attachment; filename="{os.path.basename(file_path)}"'
-                )
-                return response
+            return serve_file(
+                request, file_path, media_url=personal_info.resume_file.name
+            )
     return JsonResponse({'error': 'Resume not found'}, status=404)
 
 
+def api_page(resource_name, params):
+    """Keyset-paginated, field-selected list response"""
+    try:
+        data = get_page(resource_name, params)
+    except PaginationError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+    return HttpResponse(data, content_type='application/json')
+
+
+@conditional_content(*SNAPSHOT_MODELS['personal_info'])
 def api_personal_info(request):
     """API endpoint for personal information"""
-    personal_info: Optional[PersonalInfo] = PersonalInfo.objects.first()
-    if personal_info:
-        data: Dict[str, Any] = {
-            'name': personal_info.name,
-            'title': personal_info.title,
-            'description': personal_info.description,
-            'email': personal_info.email,
-            'phone': personal_info.phone,
-            'location': personal_info.location,
-            'github_url': personal_info.github_url,
-            'linkedin_url': personal_info.linkedin_url,
-        }
-        if personal_info.profile_image:
-            data['profile_image'] = personal_info.profile_image.url
-        return JsonResponse(data)
+    data: Optional[bytes] = get_snapshot('personal_info')
+    if data:
+        return repeats(HttpResponse(data, content_type='application/json'))
     return JsonResponse({'error': 'Personal info not found'}, status=404)
 
 
+@conditional_content(*SNAPSHOT_MODELS['experiences'])
 def api_experiences(request):
     """API endpoint for experience data"""
-    experiences: List[Experience] = Experience.objects.all().order_by('-start_date')
-    data: List[Dict[str, Any]] = []
-    for exp in experiences:
-        experience_data: Dict[str, Any] = {
-            'title': exp.title,
-            'company': exp.company,
-            'description': exp.description,
-            'start_date': exp.start_date.strftime('%Y-%m-%d'),
-            'is_current': exp.is_current,
-        }
-        if exp.end_date:
-            experience_data['end_date'] = exp.end_date.strftime('%Y-%m-%d')
-        data.append(experience_data)
-    return JsonResponse({'experiences': data})
+    if wants_page(request.GET):
+        return api_page('experiences', request.GET)
+    return repeats(HttpResponse(
+        get_snapshot('experiences'), content_type='application/json'
+    ))
 
 
+@conditional_content(*SNAPSHOT_MODELS['skills'])
 def api_skills(request):
     """API endpoint for skills data"""
-    categories: List[SkillCategory] = SkillCategory.objects.prefetch_related('skills').order_by('order')
-    data: List[Dict[str, Any]] = []
-    for category in categories:
-        category_data: Dict[str, Any] = {
-            'name': category.name,
-            'skills': []
-        }
-        for skill in category.skills.all().order_by('order'):
-            category_data['skills'].append({
-                'name': skill.name,
-                'proficiency': skill.proficiency
-            })
-        data.append(category_data)
-    return JsonResponse({'skill_categories': data})
+    return repeats(HttpResponse(
+        get_snapshot('skills'), content_type='application/json'
+    ))
 
 
+@conditional_content(*SNAPSHOT_MODELS['projects'])
 def api_projects(request):
-    """API endpoint for projects data"""
-    projects: List[Project] = Project.objects.filter(is_featured=True).order_by('order')
-    data: List[Dict[str, Any]] = []
-    for project in projects:
-        project_data: Dict[str, Any] = {
-            'title': project.title,
-            'description': project.description,
-            'technologies': project.get_technologies_list(),
-            'live_url': project.live_url,
-            'github_url': project.github_url,
-        }
-        if project.image:
-            project_data['image'] = project.image.url
-        data.append(project_data)
-    return JsonResponse({'projects': data})
+    """API endpoint for projects data, optionally filtered by ``?tech=``"""
+    if wants_page(request.GET):
+        return api_page('projects', request.GET)
+    tech = request.GET.get('tech', '').strip()
+    if tech:
+        data = get_projects_with_technology(tech)
+    else:
+        data = get_snapshot('projects')
+    return repeats(HttpResponse(data, content_type='application/json'))
+
+
+@conditional_content(*SNAPSHOT_MODELS['technologies'])
+def api_technologies(request):
+    """API endpoint for technology tag counts (tag cloud)"""
+    return repeats(HttpResponse(
+        get_snapshot('technologies'), content_type='application/json'
+    ))
+
+
+@conditional_content(*SNAPSHOT_MODELS['portfolio'])
+def api_portfolio(request):
+    """API endpoint returning every portfolio payload in one response"""
+    return repeats(HttpResponse(
+        get_snapshot('portfolio'), content_type='application/json'
+    ))
+
+
+@conditional_content(*SNAPSHOT_MODELS['portfolio'])
+def api_search(request):
+    """Full-text search over projects, experience and skills (``?q=``)"""
+    data = get_results(
+        request.GET.get('q', '').strip(), parse_limit(request.GET.get('limit'))
+    )
+    return HttpResponse(data, content_type='application/json')
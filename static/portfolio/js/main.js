@@ -161,19 +161,12 @@ window.addEventListener('scroll', () => {
     }
 });
 
-// Download PDF Button Functionality
-const downloadPdfBtn = document.getElementById('downloadPdfBtn');
-if (downloadPdfBtn) {
-    downloadPdfBtn.addEventListener('click', function(e) {
+// Resume buttons (delegated: the resume section may be loaded lazily)
+document.addEventListener('click', (e) => {
+    if (e.target.closest('#downloadPdfBtn')) {
         e.preventDefault();
         alert('Please upload your resume file through the Django admin panel.');
-    });
-}
-
-// Email Resume Button Functionality
-const emailResumeBtn = document.getElementById('emailResumeBtn');
-if (emailResumeBtn) {
-    emailResumeBtn.addEventListener('click', function(e) {
+    } else if (e.target.closest('#emailResumeBtn')) {
         e.preventDefault();
         
         // Get email from Django template context or use default
@@ -183,12 +176,60 @@ if (emailResumeBtn) {
         const emailBody = 'Hello,\n\nI came across your portfolio and was very impressed. Could you please send me a copy of your resume?\n\nThank you,\n[Your Name]';
         
         window.location.href = `mailto:${toEmail}?subject=${encodeURIComponent(emailSubject)}&body=${encodeURIComponent(emailBody)}`;
-    });
+    }
+});
+
+// Lazy sections: placeholders with data-fragment are replaced by the
+// server-rendered section once they come within a screen of the viewport
+function loadFragment(placeholder) {
+    const url = placeholder.dataset.fragment;
+    delete placeholder.dataset.fragment;
+    fetch(url, { credentials: 'same-origin' })
+        .then(response => response.ok ? response.text() : Promise.reject(response.status))
+        .then(html => {
+            const template = document.createElement('template');
+            template.innerHTML = html.trim();
+            const section = template.content.firstElementChild;
+            section.querySelectorAll('.skill-progress').forEach(bar => {
+                bar.style.width = '0%';
+            });
+            placeholder.replaceWith(section);
+            requestAnimationFrame(() => {
+                handleScroll();
+                animateSkillBars();
+            });
+        })
+        .catch(() => {
+            // Same fallback as without JavaScript: the fully rendered page
+            const link = document.createElement('a');
+            link.href = `?full=1#${placeholder.id}`;
+            link.className = 'btn btn-secondary';
+            link.textContent = 'Show section';
+            placeholder.querySelector('.container').appendChild(link);
+        });
+}
+
+function initLazySections() {
+    const placeholders = document.querySelectorAll('[data-fragment]');
+    if (!('IntersectionObserver' in window)) {
+        placeholders.forEach(loadFragment);
+        return;
+    }
+    const observer = new IntersectionObserver((entries) => {
+        entries.forEach(entry => {
+            if (entry.isIntersecting) {
+                observer.unobserve(entry.target);
+                loadFragment(entry.target);
+            }
+        });
+    }, { rootMargin: '100% 0px' });
+    placeholders.forEach(placeholder => observer.observe(placeholder));
 }
 
 // Initialize on DOMContentLoaded
 document.addEventListener('DOMContentLoaded', () => {
     createFloatingElements();
+    initLazySections();
     handleScroll(); // Initial call to set colors and active links
     
     // Set initial skill bar widths to 0 for animation